@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+
+from xg_modeling import to_numeric
+
+# ----------------------------
+# AGRÉGATS PARTAGÉS
+# ----------------------------
+# Agrégats sans dépendance à Streamlit, partagés par les vues de app.py et par api.py
+OVERVIEW_COLUMNS = ['Gls', 'Ast', 'xG', 'xAG', 'Min', 'MP']
+UCL_TOTAL_COLUMNS = ['Gls', 'Ast', 'xG', 'xAG', 'Sh', 'SoT', 'SCA', 'GCA', 'Min']
+UCL_PER90_COLUMNS = ['Gls', 'Ast', 'xG', 'xAG', 'SCA', 'GCA']
+UCL_MIN_MINUTES = 90
+
+# Classements UCL : colonne de tri et colonnes exposées
+UCL_LEADERBOARDS = {
+    'scorers': ('Gls', ['Player', 'Gls', 'Gls/90', 'xG', 'xG/90']),
+    'assists': ('Ast', ['Player', 'Ast', 'Ast/90', 'xAG', 'xAG/90']),
+    'creators': ('SCA', ['Player', 'SCA', 'GCA', 'SCA/90', 'GCA/90'])
+}
+
+GOALKEEPER_COLUMNS = [
+    'GA', 'GA90', 'SoTA', 'Saves', 'Save%', 'W', 'D', 'L', 'CS', 'CS%',
+    'PKatt', 'PKA', 'PKsv', 'PKm', 'Save%.1'
+]
+
+
+def field_player_stats(data):
+    """Statistiques des joueurs de champ avec buts et passes décisives par 90 minutes"""
+    field_player_data = data['field_players_standard'].copy()
+    for col in OVERVIEW_COLUMNS:
+        if col in field_player_data.columns:
+            # Séparateurs de milliers de FBref (« 4,133 » minutes) convertis, pas remplacés par NaN
+            field_player_data[col] = to_numeric(field_player_data[col])
+
+    minutes = field_player_data['Min'].replace(0, np.nan)
+    field_player_data['Gls/90'] = (field_player_data['Gls'] * 90) / minutes
+    field_player_data['Ast/90'] = (field_player_data['Ast'] * 90) / minutes
+    return field_player_data
+
+
+def overview_totals(field_player_data):
+    """Totaux et moyennes de l'effectif affichés dans la vue d'ensemble"""
+    return {
+        'total_goals': int(field_player_data['Gls'].sum()),
+        'total_assists': int(field_player_data['Ast'].sum()),
+        'avg_xg': float(field_player_data['xG'].mean()),
+        'avg_xag': float(field_player_data['xAG'].mean()),
+        'total_minutes': int(field_player_data['Min'].sum()),
+        'total_matches': int(field_player_data['MP'].sum())
+    }
+
+
+def ucl_player_totals(ucl_data, min_minutes=UCL_MIN_MINUTES):
+    """Statistiques cumulées et par 90 minutes des joueurs en Ligue des Champions"""
+    matches = pd.concat(ucl_data.values(), ignore_index=True)
+    for col in UCL_TOTAL_COLUMNS:
+        matches[col] = to_numeric(matches[col])
+
+    # Regroupement par identifiant stable (voir entity_resolution.py), nom canonique conservé
+    grouped = matches.groupby('player_id', sort=False)
+    key_players_df = grouped[UCL_TOTAL_COLUMNS].sum()
+    key_players_df.insert(0, 'Player', grouped['Player'].first())
+    key_players_df['Matches'] = grouped.size()
+    key_players_df = key_players_df.reset_index(drop=True)
+
+    for col in UCL_PER90_COLUMNS:
+        key_players_df[f'{col}/90'] = (key_players_df[col] * 90) / key_players_df['Min']
+
+    return key_players_df[key_players_df['Min'] >= min_minutes]
+
+
+def ucl_leaderboards(key_players_df, n=5):
+    """Classements UCL (buteurs, passeurs, créateurs de chances)"""
+    return {
+        name: key_players_df.nlargest(n, sort_col)[columns]
+        for name, (sort_col, columns) in UCL_LEADERBOARDS.items()
+    }
+
+
+def goalkeeper_stats(data):
+    """Statistiques des gardiens converties en numérique"""
+    goalkeepers = data['goalkeeping'].copy()
+    for col in GOALKEEPER_COLUMNS:
+        if col in goalkeepers.columns:
+            goalkeepers[col] = pd.to_numeric(goalkeepers[col], errors='coerce').fillna(0)
+    # Minutes et matchs peuvent contenir des séparateurs de milliers ("3,561")
+    for col in ['MP', 'Min']:
+        goalkeepers[col] = to_numeric(goalkeepers[col]).fillna(0).astype(int)
+    return goalkeepers
+
+
+def goalkeeper_totals(goalkeepers):
+    """Totaux et moyennes des gardiens affichés dans l'analyse des gardiens"""
+    return {
+        'total_matches': int(goalkeepers['MP'].sum()),
+        'total_minutes': int(goalkeepers['Min'].sum()),
+        'total_clean_sheets': int(goalkeepers['CS'].sum()),
+        'avg_clean_sheets': float(goalkeepers['CS'].sum() / len(goalkeepers)) if len(goalkeepers) else 0.0,
+        'total_saves': int(goalkeepers['Saves'].sum()),
+        'avg_save_percentage': float(goalkeepers['Save%'].mean())
+    }
+
+
+# ----------------------------
+# AGRÉGATS PAR OPTION
+# ----------------------------
+# Résultats d'une option des sélecteurs (joueur, position, match), mis en cache par option
+# dans le cache partagé et préchauffés par le parcours de prewarm.py
+UCL_MATCH_TOTAL_COLUMNS = ['Gls', 'xG', 'Ast', 'xAG', 'Sh', 'SoT']
+
+
+def player_profile(data, player_id):
+    """Lignes standard (avec possession), tir et passe d'un joueur de champ"""
+    standard = data['field_players_standard']
+    possession = data['field_players_possession']
+    player_data = standard[standard['player_id'] == player_id]
+    player_possession = possession[possession['player_id'] == player_id]
+    has_possession = not player_data.empty and not player_possession.empty
+    if has_possession:
+        player_data = pd.merge(player_data, player_possession.drop(columns='Player'), on='player_id', how='left',
+                               suffixes=('_standard', '_possession'))
+    return {
+        'standard': player_data.reset_index(drop=True),
+        'has_possession': has_possession,
+        'shooting': data['field_players_shooting'][data['field_players_shooting']['player_id'] == player_id],
+        'passing': data['field_players_passing'][data['field_players_passing']['player_id'] == player_id]
+    }
+
+
+def position_players(data, position, column='Position'):
+    """Joueurs d'une position : valeur exacte de Position, ou Pos contenant le code (« DF,MF »)"""
+    standard = data['standard']
+    if column == 'Pos':
+        mask = standard['Pos'].str.contains(position, na=False)
+    else:
+        mask = standard[column] == position
+    players = standard[mask].copy()
+    for col in OVERVIEW_COLUMNS:
+        if col in players.columns:
+            players[col] = to_numeric(players[col])
+    return players
+
+
+def ucl_match_summary(ucl_data, match):
+    """Score, phase et totaux de l'équipe pour un match de Ligue des Champions"""
+    match_data = ucl_data[match]
+    totals = {col: float(to_numeric(match_data[col]).sum()) for col in UCL_MATCH_TOTAL_COLUMNS}
+    return {'score': match_data['Score'].iloc[0], 'phase': match_data['Phase'].iloc[0], 'totals': totals}
+
+
+# ----------------------------
+# CUBE D'AGRÉGATS DE L'ÉQUIPE
+# ----------------------------
+# Moyenne, somme, écart-type et effectifs de chaque métrique numérique des tables
+# FBref, par regroupement de joueurs, saison et compétition. Les regroupements
+# reprennent les filtres des vues collectives :
+#   équipe   : tous les joueurs de la table
+#   position : Pos contient FW, MF, DF ou GK (un « DF,MF » compte dans les deux)
+#   poste    : valeur exacte de Pos
+TEAM_CUBE_TABLES = ['standard', 'shooting', 'passing', 'possession']
+TEAM_CUBE_STATS = ['mean', 'sum', 'std', 'count', 'size']
+POSITION_GROUPS = ['FW', 'MF', 'DF', 'GK']
+TEAM_GROUP = 'Équipe'
+# Les exports FBref couvrent une saison toutes compétitions confondues ; une table
+# portant des colonnes Season / Comp est découpée selon leurs valeurs
+SEASON = '2024-2025'
+COMPETITION = 'Toutes compétitions'
+TEAM_CUBE_INDEX = ['Saison', 'Compétition', 'Regroupement', 'Groupe', 'Table', 'Métrique']
+
+
+def _cube_groups(pos):
+    """Appartenance de chaque ligne aux regroupements (une ligne peut figurer dans plusieurs groupes)"""
+    pos = pos.astype('category')
+    labels = pos.cat.categories.astype(str)
+    groups = [('équipe', TEAM_GROUP, np.ones(len(pos), dtype=bool))]
+    codes = pos.cat.codes.to_numpy()
+    for group in POSITION_GROUPS:
+        # Test effectué une fois par valeur distincte de Pos, puis propagé par les codes
+        matches = np.append(labels.str.contains(group, regex=False), False)
+        groups.append(('position', group, matches[codes]))
+    for code, label in enumerate(labels):
+        groups.append(('poste', label, codes == code))
+    return groups
+
+
+def build_team_cube(data, tables=TEAM_CUBE_TABLES, season=SEASON, competition=COMPETITION):
+    """Cube métrique × regroupement × saison × compétition des tables FBref"""
+    cubes = []
+    for table in tables:
+        df = data[table]
+        numeric = df.select_dtypes('number')
+        metrics = list(numeric.columns)
+        groups = [(level, group, np.flatnonzero(mask)) for level, group, mask in _cube_groups(df['Pos']) if mask.any()]
+        # Une copie des lignes par regroupement : une seule agrégation couvre toute la table
+        rows = np.concatenate([index for _, _, index in groups])
+        sizes = [len(index) for _, _, index in groups]
+        stacked = numeric.take(rows).reset_index(drop=True).assign(
+            Saison=df['Season'].astype(str).to_numpy()[rows] if 'Season' in df.columns else season,
+            Compétition=df['Comp'].astype(str).to_numpy()[rows] if 'Comp' in df.columns else competition,
+            Regroupement=np.repeat([level for level, _, _ in groups], sizes),
+            Groupe=np.repeat([group for _, group, _ in groups], sizes)
+        )
+        grouped = stacked.groupby(TEAM_CUBE_INDEX[:4], sort=False)[metrics]
+        stats = pd.concat({stat: getattr(grouped, stat)().stack(future_stack=True) for stat in TEAM_CUBE_STATS[:-1]},
+                          axis=1)
+        stats.index = stats.index.set_names('Métrique', level=-1)
+        stats = stats.join(grouped.size().rename('size'))
+        cubes.append(stats.assign(Table=table).set_index('Table', append=True))
+    return pd.concat(cubes).reorder_levels(TEAM_CUBE_INDEX).sort_index()
+
+
+def team_metric(cube, table, metric, stat='mean', group=TEAM_GROUP, season=SEASON, competition=COMPETITION,
+                default=np.nan):
+    """Valeur du cube pour l'équipe ou un groupe de positions (FW, MF, DF, GK)"""
+    level = 'équipe' if group == TEAM_GROUP else 'position'
+    try:
+        return float(cube.at[(season, competition, level, group, table, metric), stat])
+    except KeyError:
+        return default
+
+
+def team_cube_slice(cube, level, table, metrics, stat='mean', season=SEASON, competition=COMPETITION):
+    """Tableau groupes × métriques d'un regroupement (une ligne par groupe)"""
+    values = cube.loc[(season, competition, level, slice(None), table), stat]
+    values = values.droplevel(['Saison', 'Compétition', 'Regroupement', 'Table']).unstack('Métrique')
+    return values.reindex(columns=metrics)
@@ -0,0 +1,304 @@
+"""API REST/JSON en lecture seule sur les agrégats du PSG Data Center
+
+Service ASGI (Starlette) indépendant de Streamlit : les chargeurs et agrégats sont
+ceux de data_loader.py et analytics.py. Les réponses portent un ETag dérivé du
+snapshot des données (requêtes conditionnelles If-None-Match -> 304) et sont mises
+en cache en mémoire pendant PSG_API_CACHE_TTL secondes. Les tableaux sont servis en
+JSON compact (colonnes + lignes) ou en flux Arrow IPC (?format=arrow ou en-tête
+Accept: application/vnd.apache.arrow.stream).
+
+Lancement :
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+
+import analytics
+import shared_data
+from data_snapshot import data_snapshot
+
+DATA_DIR = os.environ.get('PSG_DATA_DIR', 'data')
+# Durée de vie des réponses en cache (secondes)
+CACHE_TTL = float(os.environ.get('PSG_API_CACHE_TTL', '60'))
+# Intervalle minimal entre deux calculs du snapshot (parcours du répertoire de données)
+SNAPSHOT_TTL = float(os.environ.get('PSG_API_SNAPSHOT_TTL', '2'))
+# Nombre maximal d'entrées du cache de réponses
+CACHE_MAX_ENTRIES = int(os.environ.get('PSG_API_CACHE_MAX_ENTRIES', '1024'))
+
+JSON_MEDIA_TYPE = 'application/json'
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+
+# ----------------------------
+# SNAPSHOT ET CACHES
+# ----------------------------
+class TTLCache:
+    """Cache mémoire à durée de vie limitée, sûr entre threads"""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Purge des entrées expirées puis, si besoin, des plus anciennes
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] >= now}
+                while len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_responses = TTLCache(CACHE_TTL, CACHE_MAX_ENTRIES)
+_datasets = TTLCache(CACHE_TTL, 4)
+_snapshot = {'value': None, 'checked': 0.0}
+_inflight = {}
+_dataset_lock = threading.Lock()
+
+
+def current_snapshot():
+    """Snapshot des données, recalculé au plus toutes les SNAPSHOT_TTL secondes"""
+    now = time.monotonic()
+    if _snapshot['value'] is None or now - _snapshot['checked'] > SNAPSHOT_TTL:
+        _snapshot['value'] = data_snapshot(DATA_DIR)
+        _snapshot['checked'] = now
+    return _snapshot['value']
+
+
+def load_dataset(snapshot):
+    """Charge les données FBref et UCL une seule fois par snapshot"""
+    with _dataset_lock:
+        dataset = _datasets.get(snapshot)
+        if dataset is None:
+            # Tables partagées avec les répliques Streamlit via le cache du nœud
+            dataset = {
+                'fbref': shared_data.fbref_data(DATA_DIR, snapshot),
+                'ucl': shared_data.ucl_data(DATA_DIR, snapshot)
+            }
+            _datasets.set(snapshot, dataset)
+        return dataset
+
+
+# ----------------------------
+# SÉRIALISATION
+# ----------------------------
+def _native(value):
+    """Convertit un scalaire numpy/pandas en valeur JSON (NaN -> null)"""
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def frame_to_json(df):
+    """Tableau compact : noms de colonnes puis lignes"""
+    return {
+        'columns': [str(col) for col in df.columns],
+        'data': [[_native(value) for value in row] for row in df.itertuples(index=False, name=None)]
+    }
+
+
+def _to_jsonable(payload):
+    if isinstance(payload, pd.DataFrame):
+        return frame_to_json(payload)
+    if isinstance(payload, dict):
+        return {key: _to_jsonable(value) for key, value in payload.items()}
+    return _native(payload)
+
+
+def encode_json(payload):
+    return json.dumps(_to_jsonable(payload), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_arrow(df):
+    """Flux Arrow IPC d'un tableau"""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def wants_arrow(request):
+    fmt = request.query_params.get('format')
+    if fmt is not None:
+        if fmt not in ('json', 'arrow'):
+            raise HTTPException(400, f"Format inconnu : {fmt}")
+        return fmt == 'arrow'
+    return ARROW_MEDIA_TYPE in request.headers.get('accept', '')
+
+
+# ----------------------------
+# AGRÉGATS EXPOSÉS
+# ----------------------------
+def _int_param(params, name, default, low=1, high=100):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise HTTPException(400, f"Paramètre {name} invalide")
+    return min(max(value, low), high)
+
+
+def overview(dataset, params):
+    """Totaux de la vue d'ensemble et top buteurs / passeurs"""
+    n = _int_param(params, 'n', 5)
+    field_player_data = analytics.field_player_stats(dataset['fbref'])
+    return {
+        'totals': analytics.overview_totals(field_player_data),
+        'top_scorers': field_player_data.nlargest(n, 'Gls')[['Player', 'Gls', 'xG', 'Gls/90']],
+        'top_assists': field_player_data.nlargest(n, 'Ast')[['Player', 'Ast', 'xAG', 'Ast/90']]
+    }
+
+
+def ucl_leaderboards(dataset, params):
+    """Classements UCL ; ?board=scorers|assists|creators pour un seul tableau"""
+    n = _int_param(params, 'n', 5)
+    boards = analytics.ucl_leaderboards(analytics.ucl_player_totals(dataset['ucl']), n=n)
+    board = params.get('board')
+    if board is None:
+        return boards
+    if board not in boards:
+        raise HTTPException(404, f"Classement inconnu : {board}")
+    return boards[board]
+
+
+def ucl_players(dataset, params):
+    """Statistiques cumulées UCL de tous les joueurs"""
+    return analytics.ucl_player_totals(dataset['ucl'], min_minutes=_int_param(params, 'min_minutes', 0, 0, 10_000))
+
+
+def goalkeepers(dataset, params):
+    """Statistiques des gardiens et totaux"""
+    stats = analytics.goalkeeper_stats(dataset['fbref'])
+    if params.get('table') is not None:
+        return stats
+    return {'totals': analytics.goalkeeper_totals(stats), 'goalkeepers': stats}
+
+
+ENDPOINTS = {
+    '/api/overview': overview,
+    '/api/ucl/leaderboards': ucl_leaderboards,
+    '/api/ucl/players': ucl_players,
+    '/api/goalkeepers': goalkeepers
+}
+
+
+# ----------------------------
+# REQUÊTES
+# ----------------------------
+def _etag(snapshot, request, arrow):
+    key = f"{snapshot}|{request.url.path}|{sorted(request.query_params.multi_items())}|{arrow}"
+    return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest() + '"'
+
+
+def _render(endpoint, snapshot, params, arrow):
+    payload = endpoint(load_dataset(snapshot), params)
+    if arrow:
+        if not isinstance(payload, pd.DataFrame):
+            raise HTTPException(406, "Le format Arrow n'est disponible que pour un tableau unique")
+        return encode_arrow(payload), ARROW_MEDIA_TYPE
+    return encode_json(payload), JSON_MEDIA_TYPE
+
+
+async def _render_and_store(endpoint, snapshot, params, arrow, etag):
+    result = await run_in_threadpool(_render, endpoint, snapshot, params, arrow)
+    _responses.set(etag, result)
+    return result
+
+
+def _render_done(etag, task):
+    if _inflight.get(etag) is task:
+        del _inflight[etag]
+    # Exception lue même si tous les demandeurs sont partis : pas d'avertissement « never retrieved »
+    if not task.cancelled():
+        task.exception()
+
+
+async def _cached_render(endpoint, snapshot, params, arrow, etag):
+    """Réponse en cache, ou calculée une seule fois même sous requêtes concurrentes
+
+    Le calcul tourne dans une tâche indépendante des requêtes, attendue par toutes via
+    asyncio.shield : l'annulation d'une requête (client déconnecté) ne l'interrompt pas et
+    ne laisse aucune autre requête en attente d'un résultat qui ne viendrait jamais.
+    """
+    cached = _responses.get(etag)
+    if cached is not None:
+        return cached
+    task = _inflight.get(etag)
+    if task is None:
+        task = asyncio.ensure_future(_render_and_store(endpoint, snapshot, params, arrow, etag))
+        _inflight[etag] = task
+        task.add_done_callback(functools.partial(_render_done, etag))
+    return await asyncio.shield(task)
+
+
+async def serve(request):
+    endpoint = ENDPOINTS[request.url.path]
+    arrow = wants_arrow(request)
+    snapshot = await run_in_threadpool(current_snapshot)
+    etag = _etag(snapshot, request, arrow)
+    headers = {'ETag': etag, 'Cache-Control': f'public, max-age={int(CACHE_TTL)}', 'Vary': 'Accept'}
+
+    if etag in [tag.strip() for tag in request.headers.get('if-none-match', '').split(',')]:
+        return Response(status_code=304, headers=headers)
+
+    body, media_type = await _cached_render(endpoint, snapshot, dict(request.query_params), arrow, etag)
+    return Response(body, media_type=media_type, headers=headers)
+
+
+async def health(request):
+    snapshot = await run_in_threadpool(current_snapshot)
+    return Response(encode_json({'status': 'ok', 'snapshot': snapshot}), media_type=JSON_MEDIA_TYPE)
+
+
+app = Starlette(
+    routes=[Route('/health', health)] + [Route(path, serve) for path in ENDPOINTS],
+    middleware=[Middleware(GZipMiddleware, minimum_size=1024)]
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host=os.environ.get('PSG_API_HOST', '127.0.0.1'), port=int(os.environ.get('PSG_API_PORT', '8000')))
@@ -4,8 +4,24 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 import base64
+import hmac
 import os
 from streamlit_card import card
+import simulation
+from data_snapshot import data_snapshot
+import telemetry
+import shared_data
+import data_loader
+import analytics
+import charts
+import lineups
+import pass_profiles
+import progression
+import shot_creation
+import workload
+import player_roles
+import player_search
+import image_cache
  
 # Configuration de la page
 st.set_page_config(
@@ -21,112 +37,118 @@ try:
 except FileNotFoundError:
     st.error("Le fichier styles.css est introuvable. Assurez-vous qu'il est dans le même répertoire que app.py.")
 
+# Répertoire des données (surchargeable via la variable d'environnement PSG_DATA_DIR)
+DATA_DIR = os.environ.get('PSG_DATA_DIR', 'data')
+# Photos des joueurs (décodées une fois par nœud dans le cache d'images, voir image_cache.py)
+PHOTO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'player_photos')
+
+# Télémétrie des vues : activée par PSG_TELEMETRY=1 ou depuis le panneau d'administration (?admin=<PSG_ADMIN_TOKEN>),
+# qui n'existe pas tant que PSG_ADMIN_TOKEN n'est pas défini
+ADMIN_TOKEN = os.environ.get('PSG_ADMIN_TOKEN')
+if telemetry.is_enabled():
+    telemetry.install(st)
+
 # ----------------------------
 # FONCTIONS FBREF
 # ----------------------------
-def get_player_position(pos):
-    """Détermine la position principale d'un joueur"""
-    if pd.isna(pos):
-        return 'Unknown'
-    
-    pos = str(pos).strip()
-    
-    # Gardiens
-    if 'GK' in pos:
-        return 'GK'
-    
-    # Défenseurs
-    if 'DF' in pos or 'CB' in pos or 'LB' in pos or 'RB' in pos or 'WB' in pos:
-        return 'DF'
-    
-    # Milieux
-    if 'MF' in pos or 'DM' in pos or 'CM' in pos or 'AM' in pos:
-        return 'MF'
-    
-    # Attaquants
-    if 'FW' in pos or 'ST' in pos or 'LW' in pos or 'RW' in pos or 'CF' in pos:
-        return 'FW'
-    
-    return 'Unknown'
-
-def get_detailed_position(pos):
-    """Détermine la position détaillée d'un joueur"""
-    if pd.isna(pos):
-        return 'Unknown'
-    
-    pos = str(pos).strip()
-    
-    # Gardiens
-    if 'GK' in pos:
-        return 'Gardien'
-    
-    # Défenseurs
-    if 'CB' in pos:
-        return 'Défenseur Central'
-    if 'LB' in pos:
-        return 'Latéral Gauche'
-    if 'RB' in pos:
-        return 'Latéral Droit'
-    if 'WB' in pos:
-        return 'Arrière Latéral'
-    if 'DF' in pos:
-        return 'Défenseur'
-    
-    # Milieux
-    if 'DM' in pos:
-        return 'Milieu Défensif'
-    if 'CM' in pos:
-        return 'Milieu Central'
-    if 'AM' in pos:
-        return 'Milieu Offensif'
-    if 'MF' in pos:
-        return 'Milieu'
-    
-    # Attaquants
-    if 'ST' in pos:
-        return 'Attaquant'
-    if 'LW' in pos:
-        return 'Ailier Gauche'
-    if 'RW' in pos:
-        return 'Ailier Droit'
-    if 'CF' in pos:
-        return 'Attaquant de Pointe'
-    if 'FW' in pos:
-        return 'Attaquant'
-    
-    return 'Unknown'
-
+@telemetry.instrument(kind='loader')
 @st.cache_data
+@telemetry.cache_miss
 def load_fbref_data():
     """Charge les données FBref du PSG pour la saison 2024-2025"""
-    standard_stats = pd.read_csv('data/PSG Standard Stats.csv')
-    shooting_stats = pd.read_csv('data/PSG Shooting.csv')
-    passing_stats = pd.read_csv('data/PSG Passing.csv')
-    possession_stats = pd.read_csv('data/PSG Possession.csv')
-    playing_time = pd.read_csv('data/PSG Playing Time.csv')
-    goalkeeping_stats = pd.read_csv('data/PSG Goalkeeping.csv')
-    
-    # Nettoyage des données
-    for df in [standard_stats, shooting_stats, passing_stats, possession_stats, playing_time, goalkeeping_stats]:
-        df['Player'] = df['Player'].str.strip()
-        if 'Pos' in df.columns:
-            df['Pos'] = df['Pos'].str.strip()
-            # Ajout des colonnes de position
-            df['Position'] = df['Pos'].apply(get_player_position)
-            df['Position_Detail'] = df['Pos'].apply(get_detailed_position)
-    
-    return {
-        'standard': standard_stats,
-        'shooting': shooting_stats,
-        'passing': passing_stats,
-        'possession': possession_stats,
-        'playing_time': playing_time,
-        'goalkeeping': goalkeeping_stats,
-        'field_players_standard': standard_stats[standard_stats['Position'] != 'GK'].copy(),
-        'field_players_shooting': shooting_stats[shooting_stats['Pos'].str.contains('GK') == False].copy(),
-        'field_players_passing': passing_stats[passing_stats['Pos'].str.contains('GK') == False].copy(),
-        'field_players_possession': possession_stats[possession_stats['Pos'].str.contains('GK') == False].copy()
-    }
+    return shared_data.fbref_data(DATA_DIR)
+
+@telemetry.instrument(kind='loader')
+@st.cache_resource
+@telemetry.cache_miss
+def load_search_index(snapshot):
+    """Index de recherche des joueurs, construit une fois par snapshot des données et partagé sans copie"""
+    return player_search.build_search_index(load_fbref_data(), load_ucl_data())
+
+@telemetry.instrument(kind='loader')
+@st.cache_resource
+@telemetry.cache_miss
+def load_player_timeseries(snapshot):
+    """Historique match par match des joueurs en Ligue des Champions, contigu par joueur et partagé sans copie"""
+    return shared_data.player_timeseries_store(DATA_DIR, snapshot, ucl=load_ucl_data())
+
+@telemetry.instrument(kind='loader')
+@st.cache_resource
+@telemetry.cache_miss
+def load_lineup_combinations(snapshot):
+    """Duos et trios de la Ligue des Champions, calculés une fois par snapshot des données"""
+    return shared_data.lineup_combinations(DATA_DIR, snapshot, ucl=load_ucl_data())
+
+@telemetry.instrument(kind='loader')
+@st.cache_resource
+@telemetry.cache_miss
+def load_goalkeeper_matrix(snapshot):
+    """Matrices des gardiens (toutes saisons et compétitions), normalisées une fois par snapshot des données"""
+    return shared_data.goalkeeper_matrix(DATA_DIR, snapshot)
+
+@telemetry.instrument(kind='loader')
+@st.cache_resource
+@telemetry.cache_miss
+def load_image_cache(signature):
+    """Photos décodées, redimensionnées et encodées, projetées en mémoire depuis le fichier d'images partagé du nœud"""
+    return image_cache.open_image_cache(PHOTO_DIR, signature)
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_photo_signature(snapshot):
+    """Empreinte du répertoire des photos, calculée une fois par snapshot des données"""
+    return image_cache.directory_signature(PHOTO_DIR)
+
+@telemetry.instrument(kind='loader')
+@st.cache_resource
+@telemetry.cache_miss
+def load_player_registry(snapshot):
+    """Référentiel des joueurs (identifiants stables), construit une fois par snapshot des données"""
+    return shared_data.player_registry(DATA_DIR, snapshot)
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_player_photos(snapshot):
+    """Fichiers photo des joueurs indexés par identifiant"""
+    registry = load_player_registry(snapshot)
+    return {registry.resolve(name): photo_name for name, photo_name in PLAYER_PHOTOS.items()}
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_player_profile(snapshot, player_id):
+    """Lignes standard, possession, tir et passe d'un joueur de champ, une fois par joueur et snapshot des données"""
+    return shared_data.player_profile(DATA_DIR, player_id, snapshot, fbref=load_fbref_data())
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_position_players(snapshot, position, column='Position'):
+    """Joueurs d'une position, filtrés une fois par position et snapshot des données"""
+    return shared_data.position_players(DATA_DIR, position, column, snapshot, fbref=load_fbref_data())
+
+def player_id_of(player_name, snapshot):
+    """Identifiant stable d'un joueur, quelle que soit l'orthographe de son nom"""
+    return load_player_registry(snapshot).resolve(player_name)
+
+def select_players(label, player_names, key, snapshot, multiple=False, **kwargs):
+    """Recherche (sans tenir compte des accents) puis sélection parmi les joueurs classés par pertinence"""
+    query = st.text_input("Rechercher un joueur", key=f"{key}_search", placeholder="Nom, nation ou club")
+    options = player_names
+    if query.strip():
+        matches = load_search_index(snapshot).search(query, among=player_names)
+        if matches:
+            options = matches
+        else:
+            st.caption("Aucun joueur ne correspond à la recherche.")
+    if multiple:
+        # Les joueurs déjà choisis restent proposés quand la recherche change
+        selected = [name for name in st.session_state.get(key, []) if name in player_names]
+        options = selected + [name for name in options if name not in selected]
+        return st.multiselect(label, options, key=key, **kwargs)
+    return st.selectbox(label, options, key=key, **kwargs)
 
 def create_scatter_plot(data, x_col, y_col, color_col, size_col, title, hover_data=None):
     """Crée un graphique de dispersion personnalisé"""
@@ -201,43 +223,29 @@ def display_position_metrics(position_players):
         st.metric("Minutes jouées moyennes", round(position_players['Min'].mean(), 2))
         st.metric("Matches joués moyens", round(position_players['MP'].mean(), 2))
 
+@telemetry.instrument()
 def render_overview():
     """Affiche la vue d'ensemble des performances de l'équipe"""
     data = load_fbref_data()
     
-    # Utiliser les données des joueurs de champ
-    field_player_data = data['field_players_standard'].copy()
-    
-    # Conversion des colonnes numériques
-    numeric_columns = ['Gls', 'Ast', 'xG', 'xAG', 'Min', 'MP']
-    for col in numeric_columns:
-        if col in field_player_data.columns:
-            field_player_data[col] = pd.to_numeric(field_player_data[col], errors='coerce')
-    
-    # Calcul des statistiques par 90 minutes
-    field_player_data['Gls/90'] = (field_player_data['Gls'] * 90) / field_player_data['Min'].replace(0, np.nan)
-    field_player_data['Ast/90'] = (field_player_data['Ast'] * 90) / field_player_data['Min'].replace(0, np.nan)
+    # Joueurs de champ avec statistiques par 90 minutes
+    field_player_data = analytics.field_player_stats(data)
+    totals = analytics.overview_totals(field_player_data)
     
     # Statistiques globales 
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        total_goals = field_player_data['Gls'].sum()
-        total_assists = field_player_data['Ast'].sum()
-        st.metric("Buts marqués ", int(total_goals))
-        st.metric("Passes décisives ", int(total_assists))
+        st.metric("Buts marqués ", totals['total_goals'])
+        st.metric("Passes décisives ", totals['total_assists'])
     
     with col2:
-        avg_xg = field_player_data['xG'].mean()
-        avg_xag = field_player_data['xAG'].mean()
-        st.metric("xG moyen par joueur ", round(avg_xg, 2))
-        st.metric("xAG moyen par joueur ", round(avg_xag, 2))
+        st.metric("xG moyen par joueur ", round(totals['avg_xg'], 2))
+        st.metric("xAG moyen par joueur ", round(totals['avg_xag'], 2))
     
     with col3:
-        total_minutes = field_player_data['Min'].sum()
-        total_matches = field_player_data['MP'].sum()
-        st.metric("Minutes jouées ", int(total_minutes))
-        st.metric("Matches joués ", int(total_matches))
+        st.metric("Minutes jouées ", totals['total_minutes'])
+        st.metric("Matches joués ", totals['total_matches'])
     
     # Top 5 buteurs 
     st.markdown("""<h2 style='color: white; font-size: 1.8rem; font-weight: 700; font-family: \"Poppins\", sans-serif;'>Top 5 Buteurs </h2>""", unsafe_allow_html=True)
@@ -257,43 +265,62 @@ def render_overview():
                         color_continuous_scale='Greens')
     st.plotly_chart(fig_assists, use_container_width=True)
 
-def get_player_photo(player_name):
+    # Significativité de la finition (G - xG)
+    st.markdown("""<h2 style='color: white; font-size: 1.8rem; font-weight: 700; font-family: \"Poppins\", sans-serif;'>Finition vs xG </h2>""", unsafe_allow_html=True)
+    significance = load_xg_significance(data_snapshot(DATA_DIR))
+    squad_model = significance['squad']
+    if squad_model is None:
+        st.info("Pas assez de données pour modéliser la finition.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Ratio buts / xG (effectif)", f"{squad_model['negbin_ratio']:.2f}")
+        with col2:
+            st.metric("p-valeur (effectif)", f"{squad_model['negbin_pvalue']:.3f}")
+        with col3:
+            st.metric("Sur-dispersion (alpha)", f"{squad_model['alpha']:.3f}")
+        st.dataframe(
+            significance['table'][['Player', 'Gls', 'xG', 'G-xG', 'Ratio', 'Ratio_bas', 'Ratio_haut', 'p_negbin', 'Tendance']],
+            use_container_width=True,
+            hide_index=True
+        )
+
+# Photos des joueurs, indexées par identifiant au chargement (variantes de noms comprises)
+PLAYER_PHOTOS = {
+    'Arnau Tenas': 'profile_23-24_0000_tenas.png',
+    'Gianluigi Donnarumma': 'profile_24-25_donnarumma.png',
+    'Matvei Safonov': 'profile_24-25_safonov.png',
+    'Achraf Hakimi': 'profile_23-24_0017_hakimi.png',
+    'Presnel Kimpembe': 'profile_23-24_0016_kimpembe.png',
+    'Marquinhos': 'profile_23-24_0004_marquinhos.png',
+    'Lucas Hernández': 'profile_23-24_lucashernandez2.png',
+    'Nuno Mendes': 'profile_23-24_0003_nuno.png',
+    'Lucas Beraldo': 'profile_23-24_0020_beraldo.png',
+    'Yoram Zague': 'profile_24-25_zague.png',
+    'Naoufel El Hannach': 'profile_24-25-elhannach-25.png',
+    'Warren Zaïre-Emery': 'profile_23-24_0005_zaire.png',
+    'Vitinha': 'profile_23-24_0006_vitinha.png',
+    'Fabián Ruiz Peña': 'profile_23-24_0010_ruiz.png',
+    'Gonçalo Ramos': 'profile_23-24_0011_ramos.png',
+    'Ousmane Dembélé': 'profile_23-24_0018_dembele.png',
+    'Lee Kang-in': 'profile_23-24_0014_lee.png',
+    'João Neves': 'profile_23-24_neves.png',
+    'Ibrahim Mbaye': 'profile_24-25_mbaye.png',
+    'Bradley Barcola': 'profile_24-25_barcolav2.png',
+    'Désiré Doué': 'profile_24-25_doue.png',
+    'Khvicha Kvaratskhelia': 'khvicha-2425-profile.png',
+    'Willian Pacho': 'profile_23-24_wpacho.png',
+    'Senny Mayulu': 'profile_23-24_mayuluv2.png'
+}
+
+def get_player_photo(player_name, snapshot):
     """Récupère le chemin de la photo d'un joueur"""
     import os
     
-    # Mapping des noms de joueurs vers les noms de fichiers
-    player_photo_mapping = {
-        'Arnau Tenas': 'profile_23-24_0000_tenas.png',
-        'Gianluigi Donnarumma': 'profile_24-25_donnarumma.png',
-        'Matvei Safonov': 'profile_24-25_safonov.png',
-        'Achraf Hakimi': 'profile_23-24_0017_hakimi.png',
-        'Presnel Kimpembe': 'profile_23-24_0016_kimpembe.png',
-        'Marquinhos': 'profile_23-24_0004_marquinhos.png',
-        'Lucas Hernández': 'profile_23-24_lucashernandez2.png',
-        'Nuno Mendes': 'profile_23-24_0003_nuno.png',
-        'Lucas Beraldo': 'profile_23-24_0020_beraldo.png',
-        'Yoram Zague': 'profile_24-25_zague.png',
-        'Naoufel El Hannach': 'profile_24-25-elhannach-25.png',
-        'Warren Zaïre-Emery': 'profile_23-24_0005_zaire.png',
-        'Vitinha': 'profile_23-24_0006_vitinha.png',
-        'Fabián Ruiz Peña': 'profile_23-24_0010_ruiz.png',
-        'Gonçalo Ramos': 'profile_23-24_0011_ramos.png',
-        'Ousmane Dembélé': 'profile_23-24_0018_dembele.png',
-        'Lee Kang-in': 'profile_23-24_0014_lee.png',
-        'João Neves': 'profile_23-24_neves.png',
-        'Ibrahim Mbaye': 'profile_24-25_mbaye.png',
-        'Bradley Barcola': 'profile_24-25_barcolav2.png',
-        'Désiré Doué': 'profile_24-25_doue.png',
-        'Khvicha Kvaratskhelia': 'khvicha-2425-profile.png',
-        'Willian Pacho': 'profile_23-24_wpacho.png',
-        'Senny Mayulu': 'profile_23-24_mayuluv2.png'
-    }
-    
-    photo_name = player_photo_mapping.get(player_name)
+    photo_name = load_player_photos(snapshot).get(player_id_of(player_name, snapshot))
     if photo_name:
         # Utilisation d'un chemin absolu
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        photo_path = os.path.join(base_path, 'assets', 'player_photos', photo_name)
+        photo_path = os.path.join(PHOTO_DIR, photo_name)
         
         # Vérification de l'existence du fichier
         if os.path.exists(photo_path):
@@ -303,48 +330,54 @@ def get_player_photo(player_name):
             return None
     return None
 
+def photo_image(photo_path, snapshot):
+    """Rendu d'une photo depuis le cache d'images (le chemin si l'image n'a pas pu y être décodée)"""
+    try:
+        signature = load_photo_signature(snapshot)
+        rendered = load_image_cache(signature).rendered(os.path.basename(photo_path))
+    except (OSError, ValueError, ImportError):
+        rendered = None
+    return bytes(rendered) if rendered is not None else photo_path
+
+@telemetry.instrument()
 def render_player_analysis():
     """Affiche l'analyse détaillée par joueur"""
+    snapshot = data_snapshot(DATA_DIR)
     data = load_fbref_data()
 
     # Utiliser les données des joueurs de champ
     field_players_standard = data['field_players_standard'].copy()
-    field_players_shooting = data['field_players_shooting'].copy()
-    field_players_passing = data['field_players_passing'].copy()
-    field_players_possession = data['field_players_possession'].copy()
 
     # Sélection du joueur (parmi les joueurs de champ)
     player_names = field_players_standard['Player'].tolist()
-    selected_player = st.selectbox("Sélectionnez un joueur", player_names, key="player_analysis_select")
+    selected_player = select_players("Sélectionnez un joueur", player_names, key="player_analysis_select", snapshot=snapshot)
 
     # Affichage de la photo du joueur et des métriques de base
-    photo_path = get_player_photo(selected_player)
+    player_id = player_id_of(selected_player, snapshot)
+    photo_path = get_player_photo(selected_player, snapshot)
     if photo_path:
         try:
             col1, col2, col3, col4 = st.columns([2, 0.5, 3, 1])
             with col1:
-                st.image(photo_path, width=800, use_container_width=True)
+                st.image(photo_image(photo_path, snapshot), width=800, use_container_width=True)
             with col3:
                 st.markdown(f'''<h2 style='color: white; font-size: 1.8rem; font-weight: 700; font-family: "Poppins", sans-serif;'>Analyse de {selected_player}</h2>''', unsafe_allow_html=True)
                 
-                # Informations de base
-                player_data = field_players_standard[field_players_standard['Player'] == selected_player]
+                # Informations de base, fusionnées avec les données de possession (une entrée du cache partagé par joueur)
+                profile = load_player_profile(snapshot, player_id)
+                player_data = profile['standard']
 
                 if player_data.empty:
                     st.warning(f"Aucune donnée trouvée pour {selected_player} dans les statistiques standard.")
                     return
 
-                # Fusionner avec les données de possession pour avoir toutes les métriques
-                player_possession_data = field_players_possession[field_players_possession['Player'] == selected_player]
-                if not player_possession_data.empty:
-                    player_data = pd.merge(player_data, player_possession_data, on='Player', how='left', suffixes=('_standard', '_possession'))
-                else:
+                if not profile['has_possession']:
                     st.warning(f"Aucune donnée de possession trouvée pour {selected_player}.")
 
                 player_data = player_data.iloc[0] # Récupérer la ligne unique si elle existe
 
-                player_shooting_data = field_players_shooting[field_players_shooting['Player'] == selected_player]
-                player_passing_data = field_players_passing[field_players_passing['Player'] == selected_player]
+                player_shooting_data = profile['shooting']
+                player_passing_data = profile['passing']
 
                 # Affichage des métriques
                 col_metrics1, col_metrics2, col_metrics3 = st.columns(3)
@@ -411,6 +444,24 @@ def render_player_analysis():
 
     st.plotly_chart(fig_offensive, use_container_width=True)
 
+    # Significativité de la finition du joueur
+    significance_table = load_xg_significance(snapshot)['table']
+    player_finishing = significance_table[significance_table['player_id'] == player_id]
+    if not player_finishing.empty:
+        player_finishing = player_finishing.iloc[0]
+        col_fin1, col_fin2, col_fin3 = st.columns(3)
+        with col_fin1:
+            st.metric("Buts - xG", f"{player_finishing['G-xG']:+.1f}", player_finishing['Tendance'], delta_color="off")
+        with col_fin2:
+            st.metric("Ratio buts / xG (IC 95%)", f"{player_finishing['Ratio']:.2f}",
+                      f"{player_finishing['Ratio_bas']:.2f} - {player_finishing['Ratio_haut']:.2f}", delta_color="off")
+        with col_fin3:
+            if 'UCL_G-xG' in player_finishing and pd.notna(player_finishing['UCL_G-xG']):
+                st.metric("Buts - xG en LDC (bootstrap IC 95%)", f"{player_finishing['UCL_G-xG']:+.1f}",
+                          f"{player_finishing['UCL_IC_bas']:+.1f} / {player_finishing['UCL_IC_haut']:+.1f}", delta_color="off")
+            else:
+                st.text("Buts - xG en LDC : N/A")
+
     # Graphique radar des performances défensives
     st.markdown('''<h2 style='color: white; font-size: 1.8rem; font-weight: 700; font-family: "Poppins", sans-serif;'>Performance défensive</h2>''', unsafe_allow_html=True)
     
@@ -478,15 +529,10 @@ def render_player_analysis():
     - Touches totales : Nombre total de touches du ballon
     """)
 
+@telemetry.instrument()
 def render_position_analysis():
     """Affiche l'analyse par position"""
-    data = load_fbref_data()
-    
-    # Conversion des colonnes numériques
-    numeric_columns = ['Gls', 'Ast', 'xG', 'xAG', 'Min', 'MP']
-    for col in numeric_columns:
-        if col in data['standard'].columns:
-            data['standard'][col] = pd.to_numeric(data['standard'][col], errors='coerce')
+    snapshot = data_snapshot(DATA_DIR)
     
     # Sélection de la position
     positions = ['FW', 'MF', 'DF', 'GK']
@@ -498,8 +544,8 @@ def render_position_analysis():
     }
     selected_position = st.selectbox("Sélectionnez une position", positions, key="position_analysis_select", format_func=lambda x: position_names[x])
     
-    # Filtrage des joueurs par position
-    position_players = data['standard'][data['standard']['Position'] == selected_position]
+    # Filtrage des joueurs par position (colonnes numériques converties)
+    position_players = load_position_players(snapshot, selected_position)
 
     if position_players.empty:
         st.info(f"Aucune donnée trouvée pour la position {position_names[selected_position]}.")
@@ -519,8 +565,10 @@ def render_position_analysis():
 
     st.plotly_chart(fig, use_container_width=True)
 
+@telemetry.instrument()
 def render_comparisons():
     """Affiche les comparaisons entre joueurs"""
+    snapshot = data_snapshot(DATA_DIR)
     data = load_fbref_data()
     
     st.header("Comparaison de joueurs")
@@ -530,11 +578,13 @@ def render_comparisons():
     
     # Sélection des joueurs à comparer (parmi les joueurs de champ)
     player_names = field_players_standard['Player'].tolist()
-    selected_players = st.multiselect("Sélectionnez les joueurs à comparer", player_names, max_selections=3, key="comparison_select")
+    selected_players = select_players("Sélectionnez les joueurs à comparer", player_names, key="comparison_select",
+                                      snapshot=snapshot, multiple=True, max_selections=3)
     
     if len(selected_players) > 0:
         # Filtrage des données pour les joueurs sélectionnés (utilisant les données complètes pour les métriques)
-        comparison_data = data['standard'][data['standard']['Player'].isin(selected_players)].copy()
+        selected_ids = [player_id_of(player, snapshot) for player in selected_players]
+        comparison_data = data['standard'][data['standard']['player_id'].isin(selected_ids)].copy()
         
         if comparison_data.empty:
              st.info("Aucune donnée trouvée pour les joueurs sélectionnés.")
@@ -544,10 +594,10 @@ def render_comparisons():
         cols = st.columns(len(selected_players))
         for i, player in enumerate(selected_players):
             with cols[i]:
-                photo_path = get_player_photo(player)
+                photo_path = get_player_photo(player, snapshot)
                 if photo_path:
                     try:
-                        st.image(photo_path, width=300, use_container_width='auto')
+                        st.image(photo_image(photo_path, snapshot), width=300, use_container_width='auto')
                     except Exception as e:
                         st.error(f"Erreur lors de l'affichage de la photo de {player}: {str(e)}")
                 st.subheader(player)
@@ -558,17 +608,17 @@ def render_comparisons():
         
         # Récupérer les données des joueurs sélectionnés avec les métriques nécessaires
         # Assurez-vous que toutes les métriques existent pour éviter les erreurs
-        comparison_metrics_data = comparison_data[['Player'] + [m for m in metrics if m in comparison_data.columns]]
+        comparison_metrics_data = comparison_data[['Player', 'player_id'] + [m for m in metrics if m in comparison_data.columns]]
 
         # Gérer les valeurs NaN pour le graphique
         for col in comparison_metrics_data.columns:
-            if col != 'Player':
+            if col not in ('Player', 'player_id'):
                  comparison_metrics_data[col] = pd.to_numeric(comparison_metrics_data[col], errors='coerce').fillna(0)
 
         fig_comparison = go.Figure()
         
-        for i, player in enumerate(selected_players):
-            player_metrics_row = comparison_metrics_data[comparison_metrics_data['Player'] == player]
+        for i, (player, player_id) in enumerate(zip(selected_players, selected_ids)):
+            player_metrics_row = comparison_metrics_data[comparison_metrics_data['player_id'] == player_id]
             if not player_metrics_row.empty:
                 player_metrics = player_metrics_row.iloc[0]
                 # S'assurer que les métriques existent avant de les utiliser pour y et text
@@ -593,9 +643,11 @@ def render_comparisons():
     else:
         st.info("Sélectionnez des joueurs pour afficher la comparaison.")
 
+@telemetry.instrument()
 def analyze_tactical_performance():
     """Analyse des performances tactiques de l'équipe"""
-    data = load_fbref_data()
+    snapshot = data_snapshot(DATA_DIR)
+    cube = load_team_cube(snapshot)
     
     st.header("Analyse Tactique")
     
@@ -605,10 +657,10 @@ def analyze_tactical_performance():
     with col1:
         st.subheader("Possession et Progression")
         possession_metrics = {
-            "Passes progressives": f"{data['passing']['PrgP'].mean():.1f}",
-            "Passes complétées": f"{data['passing']['Cmp'].mean():.1f}",
-            "Précision des passes": f"{data['passing']['Cmp%'].mean():.1f}%",
-            "Distance totale des passes": f"{data['passing']['TotDist'].mean():.1f}"
+            "Passes progressives": f"{analytics.team_metric(cube, 'passing', 'PrgP'):.1f}",
+            "Passes complétées": f"{analytics.team_metric(cube, 'passing', 'Cmp'):.1f}",
+            "Précision des passes": f"{analytics.team_metric(cube, 'passing', 'Cmp%'):.1f}%",
+            "Distance totale des passes": f"{analytics.team_metric(cube, 'passing', 'TotDist'):.1f}"
         }
         for metric, value in possession_metrics.items():
             st.metric(metric, value)
@@ -616,10 +668,10 @@ def analyze_tactical_performance():
     with col2:
         st.subheader("Efficacité offensive")
         offensive_metrics = {
-            "xG par match": f"{data['standard']['xG'].mean():.2f}",
-            "Précision des tirs": f"{data['shooting']['SoT%'].mean():.1f}%",
-            "Passes clés": f"{data['passing']['KP'].mean():.1f}",
-            "Centres réussis": f"{data['passing']['CrsPA'].mean():.1f}"
+            "xG par match": f"{analytics.team_metric(cube, 'standard', 'xG'):.2f}",
+            "Précision des tirs": f"{analytics.team_metric(cube, 'shooting', 'SoT%'):.1f}%",
+            "Passes clés": f"{analytics.team_metric(cube, 'passing', 'KP'):.1f}",
+            "Centres réussis": f"{analytics.team_metric(cube, 'passing', 'CrsPA'):.1f}"
         }
         for metric, value in offensive_metrics.items():
             st.metric(metric, value)
@@ -631,18 +683,21 @@ def analyze_tactical_performance():
     positions = ['FW', 'MF', 'DF']
     selected_pos = st.selectbox("Sélectionnez une position pour l'analyse des profils", positions)
     
-    position_players = data['standard'][data['standard']['Pos'].str.contains(selected_pos, na=False)]
+    position_players = load_position_players(snapshot, selected_pos, 'Pos')
     
     # Calcul des métriques normalisées pour chaque joueur
     metrics = ['Gls', 'Ast', 'xG', 'xAG', 'PrgP', 'PrgC']
     metric_names = ['Buts', 'Passes', 'xG', 'xAG', 'Progression', 'Création']
+    # Moyenne et écart-type de la position lus dans le cube plutôt que recalculés pour chaque joueur
+    position_mean = {metric: analytics.team_metric(cube, 'standard', metric, 'mean', selected_pos) for metric in metrics}
+    position_std = {metric: analytics.team_metric(cube, 'standard', metric, 'std', selected_pos) for metric in metrics}
     
     for _, player in position_players.iterrows():
         values = []
         for metric in metrics:
             if metric in player:
                 # Normalisation par rapport à la moyenne de la position
-                normalized_value = (player[metric] - position_players[metric].mean()) / position_players[metric].std()
+                normalized_value = (player[metric] - position_mean[metric]) / position_std[metric]
                 values.append(max(0, normalized_value + 2))  # Ajustement pour avoir des valeurs positives
         
         fig = go.Figure()
@@ -666,9 +721,10 @@ def analyze_tactical_performance():
 
         st.plotly_chart(fig, use_container_width=True)
 
+@telemetry.instrument()
 def analyze_team_strengths():
     """Analyse des forces et faiblesses de l'équipe"""
-    data = load_fbref_data()
+    cube = load_team_cube(data_snapshot(DATA_DIR))
     
     st.header("Analyse des Forces et Faiblesses")
     
@@ -677,12 +733,12 @@ def analyze_team_strengths():
     
     # Création d'un graphique en barres pour les statistiques clés
     key_stats = {
-        'Buts': data['standard']['Gls'].sum(),
-        'xG': data['standard']['xG'].sum(),
-        'Passes décisives': data['standard']['Ast'].sum(),
-        'xAG': data['standard']['xAG'].sum(),
-        'Passes progressives': data['passing']['PrgP'].sum(),
-        'Dribbles réussis': data['possession']['Succ'].sum()
+        'Buts': analytics.team_metric(cube, 'standard', 'Gls', 'sum'),
+        'xG': analytics.team_metric(cube, 'standard', 'xG', 'sum'),
+        'Passes décisives': analytics.team_metric(cube, 'standard', 'Ast', 'sum'),
+        'xAG': analytics.team_metric(cube, 'standard', 'xAG', 'sum'),
+        'Passes progressives': analytics.team_metric(cube, 'passing', 'PrgP', 'sum'),
+        'Dribbles réussis': analytics.team_metric(cube, 'possession', 'Succ', 'sum')
     }
     
     fig_strengths = go.Figure(data=[
@@ -705,19 +761,13 @@ def analyze_team_strengths():
     st.subheader("Faiblesses de l'Équipe")
     
     # Création d'un graphique en barres pour les statistiques clés de faiblesse
-    # Récupération des données nécessaires
-    shooting_data = data['shooting']
-    passing_data = data['passing']
-    possession_data = data['possession']
-    standard_data = data['standard']
-    
-    # Calcul des métriques de faiblesse (moyennes ou sommes selon la métrique)
+    # Métriques de faiblesse (moyennes ou sommes selon la métrique), 0 si la colonne est absente
     weakness_stats = {
-        '% Tirs cadrés (moyen)': shooting_data['SoT%'].mean() if 'SoT%' in shooting_data.columns else 0,
-        '% Passes réussies (moyen)': passing_data['Cmp%'].mean() if 'Cmp%' in passing_data.columns else 0,
-        'Ballons perdus (total)': possession_data['Dis'].sum() if 'Dis' in possession_data.columns else 0,
-        'Cartons jaunes (total)': standard_data['CrdY'].sum() if 'CrdY' in standard_data.columns else 0,
-        'Cartons rouges (total)': standard_data['CrdR'].sum() if 'CrdR' in standard_data.columns else 0
+        '% Tirs cadrés (moyen)': analytics.team_metric(cube, 'shooting', 'SoT%', default=0),
+        '% Passes réussies (moyen)': analytics.team_metric(cube, 'passing', 'Cmp%', default=0),
+        'Ballons perdus (total)': analytics.team_metric(cube, 'possession', 'Dis', 'sum', default=0),
+        'Cartons jaunes (total)': analytics.team_metric(cube, 'standard', 'CrdY', 'sum', default=0),
+        'Cartons rouges (total)': analytics.team_metric(cube, 'standard', 'CrdR', 'sum', default=0)
     }
     
     # Convertir les pourcentages en valeurs pour une meilleure visualisation si nécessaire, ou adapter le graphique
@@ -744,16 +794,14 @@ def analyze_team_strengths():
     
     positions = ['FW', 'MF', 'DF']
     for pos in positions:
-        pos_players = data['standard'][data['standard']['Pos'].str.contains(pos, na=False)]
-        
         st.write(f"### {pos}")
         
-        # Calcul des moyennes par position
+        # Moyennes par position
         pos_metrics = {
-            'Buts': pos_players['Gls'].mean(),
-            'Passes décisives': pos_players['Ast'].mean(),
-            'xG': pos_players['xG'].mean(),
-            'xAG': pos_players['xAG'].mean()
+            'Buts': analytics.team_metric(cube, 'standard', 'Gls', group=pos),
+            'Passes décisives': analytics.team_metric(cube, 'standard', 'Ast', group=pos),
+            'xG': analytics.team_metric(cube, 'standard', 'xG', group=pos),
+            'xAG': analytics.team_metric(cube, 'standard', 'xAG', group=pos)
         }
         
         col1, col2, col3, col4 = st.columns(4)
@@ -761,41 +809,43 @@ def analyze_team_strengths():
             with col:
                 st.metric(metric, f"{value:.2f}")
 
+@telemetry.instrument()
 def analyze_player_roles():
     """Analyse des rôles et profils des joueurs"""
+    snapshot = data_snapshot(DATA_DIR)
     data = load_fbref_data()
 
     st.header("Analyse des Rôles et Profils")
 
     # Utiliser les données des joueurs de champ
     field_players_standard = data['field_players_standard'].copy()
-    field_players_shooting = data['field_players_shooting'].copy()
-    field_players_passing = data['field_players_passing'].copy()
 
     # Sélection du joueur (parmi les joueurs de champ)
     player_names = field_players_standard['Player'].tolist()
-    selected_player = st.selectbox("Sélectionnez un joueur", player_names, key="player_roles_select")
+    selected_player = select_players("Sélectionnez un joueur", player_names, key="player_roles_select", snapshot=snapshot)
 
     # Récupération des données du joueur
-    player_data = field_players_standard[field_players_standard['Player'] == selected_player]
+    player_id = player_id_of(selected_player, snapshot)
+    profile = load_player_profile(snapshot, player_id)
+    player_data = profile['standard']
 
     if player_data.empty:
         st.warning(f"Aucune donnée standard trouvée pour {selected_player}.")
         return
 
     player_data = player_data.iloc[0]
-    player_passing_data = field_players_passing[field_players_passing['Player'] == selected_player]
-    player_shooting_data = field_players_shooting[field_players_shooting['Player'] == selected_player]
+    player_passing_data = profile['passing']
+    player_shooting_data = profile['shooting']
 
     # --- Affichage de la photo et du graphique radar côte à côte ---
     col_photo, space, col_radar = st.columns([1, 1, 2]) # Ajuster les proportions si nécessaire
 
     with col_photo:
         # Affichage de la photo du joueur
-        photo_path = get_player_photo(selected_player)
+        photo_path = get_player_photo(selected_player, snapshot)
         if photo_path:
             try:
-                st.image(photo_path, width=200, use_container_width=True)
+                st.image(photo_image(photo_path, snapshot), width=200, use_container_width=True)
             except Exception as e:
                 st.error(f"Erreur lors de l'affichage de la photo : {str(e)}")
         st.subheader(selected_player)
@@ -894,31 +944,140 @@ def analyze_player_roles():
         else:
              st.text("Centres : N/A")
 
+    # --- Rôle du joueur (ACP et k-means sur l'ensemble des joueurs de champ) ---
+    st.markdown('''<h3 style='color: white; font-size: 1.4rem; font-weight: 700; font-family: "Poppins", sans-serif;'>Rôle</h3>''', unsafe_allow_html=True)
+    role_data = load_player_roles(snapshot)
+    roles, centroids, explained = role_data['roles'], role_data['centroids'], role_data['explained']
+    player_role = roles[roles['player_id'] == player_id]
+    if player_role.empty:
+        st.info(f"Rôle attribué à partir de {player_roles.MIN_NINETIES:.0f} matchs complets joués.")
+        return
+    player_role = player_role.iloc[0]
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Rôle", player_role['Rôle'])
+    with col2:
+        st.metric("Second rôle", player_role['Second rôle'])
+    with col3:
+        st.metric("Joueur type du rôle", player_role['Archétype'])
+
+    # Carte des rôles : deux premières composantes principales
+    fig_roles = px.scatter(roles, x='CP1', y='CP2', color='Rôle', hover_name='Player',
+                           hover_data={'Pos': True, 'Second rôle': True, 'CP1': ':.2f', 'CP2': ':.2f'},
+                           labels={'CP1': f'Composante 1 ({explained[0]:.0%} de la variance)',
+                                   'CP2': f'Composante 2 ({explained[1]:.0%} de la variance)'},
+                           title='Carte des rôles des joueurs de champ')
+    fig_roles.add_trace(go.Scatter(
+        x=[player_role['CP1']],
+        y=[player_role['CP2']],
+        mode='markers+text',
+        text=[selected_player],
+        textposition='top center',
+        marker=dict(size=16, color='rgba(0,0,0,0)', line=dict(color='white', width=2)),
+        name=selected_player,
+        hoverinfo='skip'
+    ))
+    st.plotly_chart(fig_roles, use_container_width=True)
+
+    # Profil du joueur face au profil moyen de son rôle (écarts-types par rapport aux joueurs de champ)
+    features = [label for _, _, label, _ in player_roles.ROLE_FEATURES]
+    role_profile = centroids.set_index('Rôle').loc[player_role['Rôle'], features]
+    fig_profile = go.Figure()
+    fig_profile.add_trace(go.Bar(
+        name=selected_player,
+        y=features,
+        x=player_role[features].astype(float),
+        orientation='h',
+        marker_color='#1f77b4'
+    ))
+    fig_profile.add_trace(go.Bar(
+        name=f"Rôle : {player_role['Rôle']}",
+        y=features,
+        x=role_profile.astype(float),
+        orientation='h',
+        marker_color='#ff7f0e'
+    ))
+    fig_profile.update_layout(
+        title='Profil centré-réduit du joueur et de son rôle',
+        barmode='group',
+        xaxis_title='Écart à la moyenne (écarts-types)',
+        yaxis=dict(autorange='reversed'),
+        height=600
+    )
+    st.plotly_chart(fig_profile, use_container_width=True)
+
+@telemetry.instrument()
 def analyze_team_dynamics():
     """Analyse des dynamiques d'équipe"""
-    data = load_fbref_data()
+    snapshot = data_snapshot(DATA_DIR)
     
     st.header("Dynamiques d'Équipe")
     
-    # Conversion des colonnes numériques
-    numeric_columns = ['Gls', 'Ast', 'xG', 'xAG', 'Min', 'MP']
-    for col in numeric_columns:
-        if col in data['standard'].columns:
-            data['standard'][col] = pd.to_numeric(data['standard'][col], errors='coerce')
-    
-    # Analyse des duos
+    # Analyse des duos et trios (Ligue des Champions)
     st.subheader("Duos les Plus Efficaces")
+    combinations = load_lineup_combinations(snapshot)
+    st.caption(
+        "Matchs de Ligue des Champions. Minutes communes estimées à partir des minutes de chaque joueur "
+        "(exactes lorsque l'un d'eux a joué tout le match), xG et xGA de l'équipe répartis au prorata."
+    )
     
-    # Création d'un graphique en barres pour les meilleurs buteurs
-    top_scorers = data['standard'].nlargest(5, 'Gls')[['Player', 'Gls', 'Ast']]
-    fig_scorers = px.bar(top_scorers, 
-                        x='Player', 
-                        y=['Gls', 'Ast'],
-                        title='Top 5 buteurs et leurs passes décisives',
-                        barmode='group',
-                        color_discrete_sequence=['#1f77b4', '#ff7f0e'])
+    col1, col2 = st.columns(2)
+    with col1:
+        size = st.radio("Combinaison", ["Duos", "Trios"], horizontal=True, key="lineup_size")
+    with col2:
+        min_minutes = st.slider("Minutes communes minimales", 0, 900, lineups.MIN_SHARED_MINUTES, 30,
+                                key="lineup_min_minutes")
+    table = combinations.pairs(min_minutes) if size == "Duos" else combinations.trios(min_minutes)
+    player_columns = [column for column in table.columns if column.startswith('Joueur ')]
     
-    st.plotly_chart(fig_scorers, use_container_width=True)
+    if table.empty:
+        st.info("Aucune combinaison n'atteint ce temps de jeu commun.")
+    else:
+        top = pd.concat([table.head(10), table.tail(5)]).drop_duplicates(subset=player_columns)
+        top = top.assign(Combinaison=top[player_columns].agg(' + '.join, axis=1))
+        fig_combinations = go.Figure(go.Bar(
+            x=top['Net/90'],
+            y=top['Combinaison'],
+            orientation='h',
+            marker_color=np.where(top['Net/90'] >= 0, '#2ca02c', '#d62728'),
+            customdata=top[['Matchs', 'Min', 'xG/90', 'xGA/90']].to_numpy(),
+            hovertemplate=(
+                "%{y}<br>Écart net: %{x:+.2f} / 90<br>%{customdata[0]} matchs, %{customdata[1]:.0f} minutes<br>"
+                "xG: %{customdata[2]:.2f} / 90, xGA: %{customdata[3]:.2f} / 90<extra></extra>"
+            )
+        ))
+        fig_combinations.update_layout(
+            title=f'{size} : écart xG - xGA par 90 minutes ensemble (10 meilleurs, 5 derniers)',
+            xaxis_title='Écart net par 90 minutes',
+            yaxis=dict(autorange='reversed'),
+            height=max(400, 30 * len(top))
+        )
+        st.plotly_chart(fig_combinations, use_container_width=True)
+        st.dataframe(
+            table[player_columns + ['Matchs', 'Min', 'xG', 'xGA', 'xG/90', 'xGA/90', 'Net/90']].round(2),
+            use_container_width=True, hide_index=True
+        )
+    
+    # Impact sur / hors du terrain en Ligue des Champions
+    singles = combinations.singles(min_minutes)
+    if not singles.empty:
+        fig_singles = go.Figure(go.Bar(
+            x=singles['Joueur 1'],
+            y=singles['Impact_net/90'],
+            marker_color=np.where(singles['Impact_net/90'] >= 0, '#2ca02c', '#d62728'),
+            customdata=singles[['Min', 'Net/90', 'xG_hors/90', 'xGA_hors/90']].to_numpy(),
+            hovertemplate=(
+                "%{x}<br>Impact net: %{y:+.2f} / 90<br>%{customdata[0]:.0f} minutes, écart sur le terrain: "
+                "%{customdata[1]:+.2f}<br>Hors du terrain: %{customdata[2]:.2f} xG / %{customdata[3]:.2f} xGA<extra></extra>"
+            )
+        ))
+        fig_singles.update_layout(
+            title='Impact sur / hors du terrain en Ligue des Champions (écart net par 90 minutes)',
+            xaxis=dict(tickangle=45),
+            yaxis_title='Impact net par 90 minutes'
+        )
+        st.plotly_chart(fig_singles, use_container_width=True)
     
     # Analyse des profils de position
     st.subheader("Profils par Position")
@@ -926,7 +1085,7 @@ def analyze_team_dynamics():
     positions = ['FW', 'MF', 'DF']
     selected_position = st.selectbox("Sélectionnez une position", positions, key="position_dynamics_select")
     
-    pos_players = data['standard'][data['standard']['Pos'].str.contains(selected_position, na=False)]
+    pos_players = load_position_players(snapshot, selected_position, 'Pos')
     
     st.write(f"### {selected_position}")
     display_position_metrics(pos_players)
@@ -941,9 +1100,11 @@ def analyze_team_dynamics():
     
     st.plotly_chart(fig, use_container_width=True)
 
+@telemetry.instrument()
 def analyze_tactical_patterns():
     """Analyse des patterns tactiques de l'équipe"""
-    data = load_fbref_data()
+    snapshot = data_snapshot(DATA_DIR)
+    cube = load_team_cube(snapshot)
 
     st.header("Analyse Tactique Avancée")
 
@@ -955,10 +1116,10 @@ def analyze_tactical_patterns():
         # Calcul des métriques de pressing avec les colonnes disponibles
         # Arrondissement des valeurs
         pressing_metrics = {
-            "Passes complétées": round(data['passing']['Cmp'].mean(), 2),
-            "Précision des passes": f"{data['passing']['Cmp%'].mean():.1f}%",
-            "Passes progressives": round(data['passing']['PrgP'].mean(), 2),
-            "Passes clés": round(data['passing']['KP'].mean(), 2)
+            "Passes complétées": round(analytics.team_metric(cube, 'passing', 'Cmp'), 2),
+            "Précision des passes": f"{analytics.team_metric(cube, 'passing', 'Cmp%'):.1f}%",
+            "Passes progressives": round(analytics.team_metric(cube, 'passing', 'PrgP'), 2),
+            "Passes clés": round(analytics.team_metric(cube, 'passing', 'KP'), 2)
         }
 
         for metric, value in pressing_metrics.items():
@@ -968,10 +1129,10 @@ def analyze_tactical_patterns():
         st.subheader("Progression du Jeu")
         # Arrondissement des valeurs
         progression_metrics = {
-            "Passes progressives": round(data['passing']['PrgP'].mean(), 2),
-            "Progression portée": round(data['standard']['PrgC'].mean(), 2),
-            "Progression reçue": round(data['standard']['PrgR'].mean(), 2),
-            "Distance totale des passes": f"{data['passing']['TotDist'].mean():.1f}"
+            "Passes progressives": round(analytics.team_metric(cube, 'passing', 'PrgP'), 2),
+            "Progression portée": round(analytics.team_metric(cube, 'standard', 'PrgC'), 2),
+            "Progression reçue": round(analytics.team_metric(cube, 'standard', 'PrgR'), 2),
+            "Distance totale des passes": f"{analytics.team_metric(cube, 'passing', 'TotDist'):.1f}"
         }
 
         for metric, value in progression_metrics.items():
@@ -981,16 +1142,13 @@ def analyze_tactical_patterns():
     st.subheader("Progression par Position")
 
     positions = ['FW', 'MF', 'DF']
-    progression_data = data['standard'][data['standard']['Pos'].str.contains('|'.join(positions), na=False)].copy()
-
-    # Assurez-vous que les colonnes de progression sont numériques
     progression_cols = ['PrgC', 'PrgP', 'PrgR']
-    for col in progression_cols:
-        if col in progression_data.columns:
-            progression_data[col] = pd.to_numeric(progression_data[col], errors='coerce').fillna(0)
 
-    # Calculer les moyennes par position
-    avg_progression_by_pos = progression_data.groupby('Pos')[progression_cols].mean().reset_index()
+    # Moyennes par poste exact, valeurs manquantes comptées comme 0 (somme / nombre de joueurs)
+    sums = analytics.team_cube_slice(cube, 'poste', 'standard', progression_cols, 'sum')
+    sizes = analytics.team_cube_slice(cube, 'poste', 'standard', progression_cols, 'size')
+    avg_progression_by_pos = (sums / sizes)[sums.index.str.contains('|'.join(positions))]
+    avg_progression_by_pos = avg_progression_by_pos.rename_axis(index='Pos', columns=None).reset_index()
 
     # Renommer les colonnes pour le graphique
     avg_progression_by_pos = avg_progression_by_pos.rename(columns={
@@ -1008,9 +1166,59 @@ def analyze_tactical_patterns():
 
     st.plotly_chart(fig_progression, use_container_width=True)
 
+    # Profils de passe et archétypes de passeurs
+    st.subheader("Profils de Passe")
+    pass_data = load_pass_profiles(snapshot)
+    profiles, archetypes = pass_data['profiles'], pass_data['archetypes']
+    if profiles.empty:
+        st.info("Aucun joueur n'a assez joué pour établir un profil de passe.")
+        return
+    st.caption(
+        f"Types de passe par 90 minutes des joueurs d'au moins {pass_profiles.MIN_NINETIES:.0f} matchs complets, "
+        f"regroupés en {len(archetypes)} archétypes (k-means sur les valeurs centrées-réduites)."
+    )
+
+    features = [f'{col}/90' for col in pass_profiles.ARCHETYPE_FEATURES]
+    labels = [pass_profiles.PASS_TYPES[col] for col in pass_profiles.ARCHETYPE_FEATURES]
+    # Couleurs : écart à la moyenne de l'effectif (chaque type de passe a son échelle)
+    centers = archetypes[features].to_numpy(dtype=float)
+    spread = profiles[features].std().to_numpy()
+    deviation = (centers - profiles[features].mean().to_numpy()) / np.where(spread > 0, spread, 1.0)
+    fig_archetypes = go.Figure(go.Heatmap(
+        z=deviation,
+        x=labels,
+        y=archetypes['Archétype'] + ' (' + archetypes['Joueurs'].astype(str) + ')',
+        text=centers.round(1),
+        texttemplate='%{text}',
+        colorscale='RdBu_r',
+        zmid=0,
+        colorbar=dict(title='Écart-type'),
+        hovertemplate="%{y}<br>%{x}: %{text} par 90 minutes<extra></extra>"
+    ))
+    fig_archetypes.update_layout(title='Archétypes de passeurs : passes par 90 minutes')
+    st.plotly_chart(fig_archetypes, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        x_type = st.selectbox("Axe horizontal", labels, index=0, key="pass_profile_x")
+    with col2:
+        y_type = st.selectbox("Axe vertical", labels, index=labels.index(pass_profiles.PASS_TYPES['Crs']),
+                              key="pass_profile_y")
+    x_column = features[labels.index(x_type)]
+    y_column = features[labels.index(y_type)]
+    fig_profiles = px.scatter(profiles, x=x_column, y=y_column, color='Archétype', size='90s',
+                              hover_name='Player', hover_data={'Pos': True, '90s': ':.1f'},
+                              labels={x_column: f'{x_type} par 90 minutes', y_column: f'{y_type} par 90 minutes'},
+                              title=f'{x_type} et {y_type} par 90 minutes')
+    st.plotly_chart(fig_profiles, use_container_width=True)
+
+    table = profiles[['Player', 'Pos', '90s', 'Archétype'] + features].rename(columns=dict(zip(features, labels)))
+    st.dataframe(table.round(2), use_container_width=True, hide_index=True)
+
+@telemetry.instrument()
 def analyze_defensive_metrics():
     """Analyse des performances défensives"""
-    data = load_fbref_data()
+    cube = load_team_cube(data_snapshot(DATA_DIR))
     
     st.header("Analyse Défensive")
     
@@ -1020,9 +1228,9 @@ def analyze_defensive_metrics():
     with col1:
         st.subheader("Progression")
         defensive_metrics = {
-            "Progression portée": data['standard']['PrgC'].mean(),
-            "Progression reçue": data['standard']['PrgR'].mean(),
-            "Passes progressives": data['passing']['PrgP'].mean()
+            "Progression portée": analytics.team_metric(cube, 'standard', 'PrgC'),
+            "Progression reçue": analytics.team_metric(cube, 'standard', 'PrgR'),
+            "Passes progressives": analytics.team_metric(cube, 'passing', 'PrgP')
         }
         for metric, value in defensive_metrics.items():
             st.metric(metric, f"{value:.1f}")
@@ -1030,9 +1238,9 @@ def analyze_defensive_metrics():
     with col2:
         st.subheader("Possession")
         possession_metrics = {
-            "Passes complétées": data['passing']['Cmp'].mean(),
-            "Passes progressives": data['passing']['PrgP'].mean(),
-            "Progression portée": data['standard']['PrgC'].mean()
+            "Passes complétées": analytics.team_metric(cube, 'passing', 'Cmp'),
+            "Passes progressives": analytics.team_metric(cube, 'passing', 'PrgP'),
+            "Progression portée": analytics.team_metric(cube, 'standard', 'PrgC')
         }
         for metric, value in possession_metrics.items():
             st.metric(metric, f"{value:.1f}")
@@ -1040,9 +1248,9 @@ def analyze_defensive_metrics():
     with col3:
         st.subheader("Distribution")
         distribution_metrics = {
-            "Passes complétées": data['passing']['Cmp'].mean(),
-            "Passes progressives": data['passing']['PrgP'].mean(),
-            "Progression reçue": data['standard']['PrgR'].mean()
+            "Passes complétées": analytics.team_metric(cube, 'passing', 'Cmp'),
+            "Passes progressives": analytics.team_metric(cube, 'passing', 'PrgP'),
+            "Progression reçue": analytics.team_metric(cube, 'standard', 'PrgR')
         }
         for metric, value in distribution_metrics.items():
             st.metric(metric, f"{value:.1f}")
@@ -1051,19 +1259,17 @@ def analyze_defensive_metrics():
     st.subheader("Performances par Position")
     
     positions = ['DF', 'MF']
-    defensive_data = data['standard'][data['standard']['Pos'].str.contains('|'.join(positions), na=False)]
     
     fig = go.Figure()
     
     for pos in positions:
-        pos_players = defensive_data[defensive_data['Pos'].str.contains(pos, na=False)]
         fig.add_trace(go.Bar(
             name=pos,
             x=['Progression', 'Passes', 'Réception'],
             y=[
-                pos_players['PrgC'].mean(),
-                pos_players['PrgP'].mean(),
-                pos_players['PrgR'].mean()
+                analytics.team_metric(cube, 'standard', 'PrgC', group=pos),
+                analytics.team_metric(cube, 'standard', 'PrgP', group=pos),
+                analytics.team_metric(cube, 'standard', 'PrgR', group=pos)
             ]
         ))
     
@@ -1075,27 +1281,266 @@ def analyze_defensive_metrics():
     
     st.plotly_chart(fig, use_container_width=True)
 
+@telemetry.instrument()
+def analyze_shot_creation():
+    """Création d'occasions : types d'actions menant à un tir ou à un but, répartition et classements"""
+    chains = load_shot_creation(data_snapshot(DATA_DIR))
+    
+    st.header("Création d'occasions")
+    st.caption(
+        f"Toutes compétitions. Classements et répartitions limités aux joueurs d'au moins "
+        f"{shot_creation.MIN_NINETIES:.0f} matchs complets."
+    )
+    
+    block_label = st.radio("Actions", list(shot_creation.CREATION_BLOCKS.values()), horizontal=True,
+                           key="shot_creation_block")
+    block = next(code for code, label in shot_creation.CREATION_BLOCKS.items() if label == block_label)
+    chains = chains[chains['90s'] >= shot_creation.MIN_NINETIES]
+    if chains.empty:
+        st.info("Aucun joueur n'a assez joué.")
+        return
+    labels = shot_creation.CREATION_ACTIONS
+    actions = {label: action for action, label in labels.items()}
+    
+    # Deux façons de créer : dribbles et balles arrêtées par défaut
+    col1, col2 = st.columns(2)
+    with col1:
+        x_action = actions[st.selectbox("Axe horizontal", list(actions), index=list(labels).index('TO'),
+                                        key="shot_creation_x")]
+    with col2:
+        y_action = actions[st.selectbox("Axe vertical", list(actions), index=list(labels).index('PassDead'),
+                                        key="shot_creation_y")]
+    per_90 = shot_creation.creation_mix(chains, block, value='Par90')
+    per_90['Total/90'] = per_90[list(labels)].sum(axis=1)
+    fig_actions = px.scatter(per_90, x=x_action, y=y_action, size='Total/90', color='Pos', hover_name='Player',
+                             hover_data={'Total/90': ':.2f', '90s': ':.1f'},
+                             labels={x_action: f'{labels[x_action]} par 90 minutes',
+                                     y_action: f'{labels[y_action]} par 90 minutes'},
+                             title=f'{block_label} : {labels[x_action]} et {labels[y_action]}')
+    st.plotly_chart(fig_actions, use_container_width=True)
+    
+    # Répartition des actions de chaque joueur
+    shares = shot_creation.creation_mix(chains, block)
+    shares = shares.set_index('Player').loc[per_90.sort_values('Total/90')['Player']]
+    fig_mix = go.Figure()
+    for action, label in labels.items():
+        fig_mix.add_trace(go.Bar(
+            name=label,
+            y=shares.index,
+            x=shares[action],
+            orientation='h',
+            hovertemplate=f"%{{y}}<br>{label}: %{{x:.1f}}%<extra></extra>"
+        ))
+    fig_mix.update_layout(
+        title=f'Répartition des {block_label.lower()} (joueurs classés par volume par 90 minutes)',
+        barmode='stack',
+        xaxis_title='Part des actions (%)',
+        height=max(400, 25 * len(shares))
+    )
+    st.plotly_chart(fig_mix, use_container_width=True)
+    
+    # Classement par type d'action
+    action = actions[st.selectbox("Classement par action", list(actions), key="shot_creation_action")]
+    board = shot_creation.leaderboard(chains, block, action)
+    fig_board = go.Figure(go.Bar(
+        x=board['Player'],
+        y=board['Par90'],
+        marker_color='#9467bd',
+        customdata=board[['Total', 'Part']].to_numpy(),
+        hovertemplate="%{x}<br>%{y:.2f} par 90 minutes<br>Total: %{customdata[0]:.0f}, "
+                      "%{customdata[1]:.1f}% de ses actions<extra></extra>"
+    ))
+    fig_board.update_layout(
+        title=f'{labels[action]} : meilleurs joueurs par 90 minutes',
+        yaxis_title='Par 90 minutes'
+    )
+    st.plotly_chart(fig_board, use_container_width=True)
+    st.dataframe(
+        board[['Rang', 'Player', 'Pos', '90s', 'Total', 'Par90', 'Part']].rename(
+            columns={'Par90': 'Par 90 minutes', 'Part': 'Part (%)'}).round(2),
+        use_container_width=True, hide_index=True
+    )
+
+@telemetry.instrument()
+def analyze_workload():
+    """Charge de travail de l'effectif : congestion du calendrier, charges glissantes et impact sur le terrain"""
+    snapshot = data_snapshot(DATA_DIR)
+    results = load_workload(snapshot)
+    loads, schedule, impact = results['loads'], results['congestion'], results['impact']
+    
+    st.header("Gestion de la charge")
+    st.caption(
+        f"Minutes par match observées en Ligue des Champions, estimées dans les autres compétitions "
+        f"(minutes restantes de la saison réparties uniformément) : les ratios qui en dépendent sont marqués "
+        f"estimés. Charge aiguë : {workload.ACUTE_DAYS} jours, "
+        f"charge chronique : {workload.CHRONIC_DAYS} jours."
+    )
+    
+    if schedule.empty:
+        st.info("Aucun match joué dans le calendrier.")
+        return
+    
+    # Congestion du calendrier
+    st.subheader("Congestion du calendrier")
+    congestion_column = f'Matchs_{workload.CONGESTION_DAYS}j'
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Matchs joués", len(schedule))
+    with col2:
+        st.metric("Repos minimum", f"{schedule['Repos'].min():.0f} jours")
+    with col3:
+        st.metric(f"Maximum de matchs sur {workload.CONGESTION_DAYS} jours", int(schedule[congestion_column].max()))
+    
+    fig_congestion = go.Figure()
+    for competition, matches in schedule.groupby('Comp', sort=False):
+        fig_congestion.add_trace(go.Bar(
+            name=competition,
+            x=matches['Date'],
+            y=matches['Repos'],
+            text=matches['Opponent'],
+            hovertemplate="%{x|%d/%m/%Y} - %{text}<br>Repos: %{y:.0f} jours<extra></extra>"
+        ))
+    fig_congestion.add_trace(go.Scatter(
+        name=f'Matchs sur {workload.CONGESTION_DAYS} jours',
+        x=schedule['Date'],
+        y=schedule[congestion_column],
+        mode='lines+markers',
+        yaxis='y2',
+        line=dict(color='#d62728')
+    ))
+    fig_congestion.update_layout(
+        title='Jours de repos avant chaque match',
+        xaxis_title='Date',
+        yaxis=dict(title='Jours de repos'),
+        yaxis2=dict(title='Matchs', overlaying='y', side='right', showgrid=False),
+        barmode='overlay'
+    )
+    st.plotly_chart(fig_congestion, use_container_width=True)
+    
+    # Charge aiguë de l'effectif, match par match
+    st.subheader("Charge de l'effectif")
+    squad = loads[loads.groupby('player_id')['Min'].transform('sum') > 0]
+    heatmap = squad.pivot_table(index='Player', columns='Date', values='Charge_aiguë', sort=False)
+    heatmap = heatmap.loc[squad.groupby('Player', sort=False)['Min'].sum().sort_values().index]
+    fig_heatmap = go.Figure(go.Heatmap(
+        z=heatmap.to_numpy(),
+        x=heatmap.columns,
+        y=heatmap.index,
+        colorscale='YlOrRd',
+        colorbar=dict(title='Minutes'),
+        hovertemplate="%{y}<br>%{x|%d/%m/%Y}<br>Charge aiguë: %{z:.0f} min<extra></extra>"
+    ))
+    fig_heatmap.update_layout(
+        title=f'Minutes jouées sur les {workload.ACUTE_DAYS} derniers jours',
+        height=max(400, 22 * len(heatmap))
+    )
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+    
+    # Charge d'un joueur : aiguë, chronique et ratio
+    selected_player = select_players("Sélectionnez un joueur", heatmap.index[::-1].tolist(), key="workload_player_select", snapshot=snapshot)
+    player_loads = loads[loads['player_id'] == player_id_of(selected_player, snapshot)]
+    low, high = workload.ACWR_RANGE
+    # Mêmes dates conservées pour toutes les traces (séries longues sous-échantillonnées)
+    player_indices = charts.shared_indices(player_loads['Date'], [player_loads['Charge_aiguë'],
+                                                                  player_loads['Charge_chronique'],
+                                                                  player_loads['ACWR']])
+    
+    fig_player = go.Figure()
+    fig_player.add_trace(charts.line_trace(
+        name=f'Charge aiguë ({workload.ACUTE_DAYS} j)',
+        x=player_loads['Date'],
+        y=player_loads['Charge_aiguë'],
+        indices=player_indices,
+        mode='lines+markers',
+        marker=dict(color=np.where(player_loads['Observé'], '#1f77b4', '#aec7e8')),
+        text=player_loads['Opponent'],
+        hovertemplate="%{x|%d/%m/%Y} - %{text}<br>Charge aiguë: %{y:.0f} min<extra></extra>"
+    ))
+    fig_player.add_trace(charts.line_trace(
+        name='Charge chronique hebdomadaire',
+        x=player_loads['Date'],
+        y=player_loads['Charge_chronique'] * workload.ACUTE_DAYS / workload.CHRONIC_DAYS,
+        indices=player_indices,
+        mode='lines',
+        line=dict(color='#ff7f0e', dash='dash'),
+        hovertemplate="%{x|%d/%m/%Y}<br>Charge chronique: %{y:.0f} min / semaine<extra></extra>"
+    ))
+    # Ratio calculé sur des minutes estimées (autres compétitions) : tracé à part, en pointillés
+    estimated = player_loads['ACWR_estimé']
+    for is_estimated, name, dash in ((False, 'Ratio aigu / chronique (minutes observées)', 'solid'),
+                                     (True, 'Ratio aigu / chronique (estimé)', 'dot')):
+        fig_player.add_trace(charts.line_trace(
+            name=name,
+            x=player_loads['Date'],
+            y=player_loads['ACWR'].where(estimated == is_estimated),
+            indices=player_indices,
+            mode='lines+markers',
+            yaxis='y2',
+            line=dict(color='#2ca02c', dash=dash),
+            hovertemplate=f"%{{x|%d/%m/%Y}}<br>Ratio{' estimé' if is_estimated else ''}: %{{y:.2f}}<extra></extra>"
+        ))
+    fig_player.add_hrect(y0=low, y1=high, yref='y2', fillcolor='#2ca02c', opacity=0.1, line_width=0)
+    fig_player.update_layout(
+        title=f'Charge de {selected_player} (points foncés : minutes observées, ratio en pointillés : estimé)',
+        xaxis_title='Date',
+        yaxis=dict(title='Minutes'),
+        yaxis2=dict(title='Ratio aigu / chronique', overlaying='y', side='right', showgrid=False)
+    )
+    st.plotly_chart(fig_player, use_container_width=True)
+    
+    latest = player_loads.iloc[-1]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Minutes (saison)", f"{player_loads['Min'].sum():.0f}")
+    with col2:
+        st.metric(f"Charge aiguë ({latest['Date']:%d/%m})", f"{latest['Charge_aiguë']:.0f} min")
+    with col3:
+        ratio = latest['ACWR']
+        st.metric("Ratio aigu / chronique (estimé)" if latest['ACWR_estimé'] else "Ratio aigu / chronique",
+                  f"{ratio:.2f}" if pd.notna(ratio) else "N/A",
+                  "dans la zone" if low <= ratio <= high else "hors zone", delta_color="off",
+                  help="Estimé : la fenêtre chronique contient des matchs hors Ligue des Champions, "
+                       "dont les minutes sont réparties uniformément." if latest['ACWR_estimé'] else None)
+    
+    # Impact sur / hors du terrain
+    st.subheader("Impact sur le terrain")
+    if impact.empty:
+        st.info(f"Aucun joueur n'a joué {workload.MIN_IMPACT_MINUTES} minutes.")
+        return
+    fig_impact = go.Figure(go.Bar(
+        x=impact['Player'],
+        y=impact['Impact_net/90'],
+        marker_color=np.where(impact['Impact_net/90'] >= 0, '#2ca02c', '#d62728'),
+        customdata=impact[['xG_sur/90', 'xGA_sur/90', 'xG_hors/90', 'xGA_hors/90']].to_numpy(),
+        hovertemplate=(
+            "%{x}<br>Écart net: %{y:+.2f}<br>"
+            "Sur le terrain: %{customdata[0]:.2f} xG / %{customdata[1]:.2f} xGA<br>"
+            "Hors du terrain: %{customdata[2]:.2f} xG / %{customdata[3]:.2f} xGA<extra></extra>"
+        )
+    ))
+    fig_impact.update_layout(
+        title=f'Écart net xG - xGA par 90 minutes, sur et hors du terrain (min. {workload.MIN_IMPACT_MINUTES} minutes)',
+        xaxis=dict(tickangle=45),
+        yaxis_title='Écart net par 90 minutes'
+    )
+    st.plotly_chart(fig_impact, use_container_width=True)
+    st.dataframe(impact.drop(columns='player_id').round(2), use_container_width=True, hide_index=True)
+
+@telemetry.instrument()
 def analyze_goalkeeping_performance():
     """Analyse des performances des gardiens"""
+    snapshot = data_snapshot(DATA_DIR)
     data = load_fbref_data()
     
     st.header("Analyse des Gardiens")
     
-    goalkeepers = data['goalkeeping'].copy()
-    
-    if goalkeepers.empty:
+    if data['goalkeeping'].empty:
         st.info("Aucune donnée de gardien disponible.")
         return
     
     # Conversion des colonnes numériques
-    numeric_gk_columns = [
-        'GA', 'GA90', 'SoTA', 'Saves', 'Save%', 'W', 'D', 'L', 'CS', 'CS%', 
-        'PKatt', 'PKA', 'PKsv', 'PKm', 'Save%.1'
-    ]
-    
-    for col in numeric_gk_columns:
-        if col in goalkeepers.columns:
-            goalkeepers[col] = pd.to_numeric(goalkeepers[col], errors='coerce').fillna(0)
+    goalkeepers = analytics.goalkeeper_stats(data)
+    totals = analytics.goalkeeper_totals(goalkeepers)
     
     # Vue d'ensemble des gardiens
     st.subheader("Vue d'ensemble des gardiens")
@@ -1103,55 +1548,35 @@ def analyze_goalkeeping_performance():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        total_matches = goalkeepers['MP'].sum()
-        total_minutes = goalkeepers['Min'].sum()
-        st.metric("Matches joués", total_matches)
-        st.metric("Minutes jouées", total_minutes)
+        st.metric("Matches joués", totals['total_matches'])
+        st.metric("Minutes jouées", totals['total_minutes'])
     
     with col2:
-        total_clean_sheets = goalkeepers['CS'].sum()
-        avg_clean_sheets = total_clean_sheets / len(goalkeepers)
-        st.metric("Clean Sheets totaux", total_clean_sheets)
-        st.metric("Clean Sheets moyens par gardien", f"{avg_clean_sheets:.1f}")
+        st.metric("Clean Sheets totaux", totals['total_clean_sheets'])
+        st.metric("Clean Sheets moyens par gardien", f"{totals['avg_clean_sheets']:.1f}")
     
     with col3:
-        total_saves = goalkeepers['Saves'].sum()
-        avg_save_percentage = goalkeepers['Save%'].mean()
-        st.metric("Arrêts totaux", total_saves)
-        st.metric("Pourcentage d'arrêts moyen", f"{avg_save_percentage:.1f}%")
+        st.metric("Arrêts totaux", totals['total_saves'])
+        st.metric("Pourcentage d'arrêts moyen", f"{totals['avg_save_percentage']:.1f}%")
     
     # Graphique de comparaison des gardiens
     st.subheader("Comparaison des gardiens")
     
     # Création d'un graphique radar pour comparer les gardiens
-    metrics = ['Save%', 'CS%', 'GA90', 'PKsv']
-    metric_names = ['% Arrêts', '% Clean Sheets', 'Buts encaissés p90', 'Arrêts Penalty']
+    # Profils normalisés (0-100, buts encaissés inversés) lus dans les matrices mises en cache
+    gk_matrix = load_goalkeeper_matrix(snapshot)
+    psg_rows = gk_matrix.select(seasons=[analytics.SEASON], competition=analytics.COMPETITION,
+                                squad=player_search.DEFAULT_CLUB)
+    profiles = gk_matrix.radar(psg_rows)
     
     fig_radar = go.Figure()
     
-    for _, gk in goalkeepers.iterrows():
-        values = []
-        for metric in metrics:
-            if metric in gk:
-                # Normalisation des valeurs
-                max_val = goalkeepers[metric].max()
-                min_val = goalkeepers[metric].min()
-                if max_val != min_val:
-                    # Inverser la normalisation pour GA90 (moins c'est mieux)
-                    if metric == 'GA90':
-                        normalized_value = (max_val - gk[metric]) / (max_val - min_val) * 100
-                    else:
-                        normalized_value = (gk[metric] - min_val) / (max_val - min_val) * 100
-                else:
-                    normalized_value = 50
-                # Corrected indentation
-                values.append(normalized_value)
-        
+    for name, values in zip(gk_matrix.keys['Player'].to_numpy()[psg_rows], profiles.to_numpy()):
         fig_radar.add_trace(go.Scatterpolar(
-            r=values,
-            theta=metric_names,
+            r=values.tolist(),
+            theta=list(profiles.columns),
             fill='toself',
-            name=gk['Player']
+            name=name
         ))
     
     fig_radar.update_layout(
@@ -1171,17 +1596,17 @@ def analyze_goalkeeping_performance():
     st.subheader("Analyse détaillée par gardien")
     
     selected_gk = st.selectbox("Sélectionnez un gardien", goalkeepers['Player'].tolist(), key="goalkeeper_select")
-    selected_gk_data = goalkeepers[goalkeepers['Player'] == selected_gk].iloc[0]
+    selected_gk_data = goalkeepers[goalkeepers['player_id'] == player_id_of(selected_gk, snapshot)].iloc[0]
     
     # Affichage de la photo du gardien et des métriques côte à côte
     col_photo_gk, space, col_metrics_gk, space = st.columns([1.5, 0.5, 3, 0.5]) # Ajuster les proportions si nécessaire
 
     with col_photo_gk:
         # Affichage de la photo du gardien
-        photo_path = get_player_photo(selected_gk)
+        photo_path = get_player_photo(selected_gk, snapshot)
         if photo_path:
             try:
-                st.image(photo_path, width=200, use_container_width=True)
+                st.image(photo_image(photo_path, snapshot), width=200, use_container_width=True)
             except Exception as e:
                 st.error(f"Erreur lors de l'affichage de la photo : {str(e)}")
         st.subheader(selected_gk)
@@ -1270,34 +1695,103 @@ def analyze_goalkeeping_performance():
     )
     
     st.plotly_chart(fig_scatter, use_container_width=True)
+    
+    # Comparaison avec les gardiens des autres saisons et championnats
+    st.subheader("Comparaison multi-saisons")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        seasons = st.multiselect("Saisons", gk_matrix.seasons(), default=gk_matrix.seasons(), key="goalkeeper_seasons")
+    with col2:
+        competitions = gk_matrix.competitions()
+        competition = st.selectbox("Compétition", competitions, key="goalkeeper_competition",
+                                   index=competitions.index(analytics.COMPETITION) if analytics.COMPETITION in competitions else 0)
+    with col3:
+        max_minutes = int(gk_matrix.column('Min').max(initial=0))
+        min_minutes = st.slider("Minutes jouées minimum", 0, max(max_minutes, 90), 0, step=90, key="goalkeeper_min_minutes")
+    
+    rows = gk_matrix.select(seasons=seasons, competition=competition, min_minutes=min_minutes)
+    if not len(rows):
+        st.info("Aucun gardien ne correspond à ces critères.")
+        return
+    
+    # Nuage de points sur deux métriques brutes, gardiens du PSG mis en évidence
+    metric_options = [metric for metric in gk_matrix.metrics if metric not in ('MP', 'Min')]
+    col1, col2 = st.columns(2)
+    with col1:
+        x_metric = st.selectbox("Axe horizontal", metric_options, index=metric_options.index('GA90'), key="goalkeeper_x_metric")
+    with col2:
+        y_metric = st.selectbox("Axe vertical", metric_options, index=metric_options.index('Save%'), key="goalkeeper_y_metric")
+    points = gk_matrix.scatter(rows, x_metric, y_metric)
+    
+    fig_league = go.Figure()
+    for is_psg, name, color in [(False, 'Autres gardiens', '#7f7f7f'), (True, 'PSG', '#1f77b4')]:
+        subset = points[(points['Squad'] == player_search.DEFAULT_CLUB) == is_psg]
+        if subset.empty:
+            continue
+        fig_league.add_trace(charts.line_trace(
+            x=subset[x_metric],
+            y=subset[y_metric],
+            lttb=False,
+            mode='markers',
+            name=name,
+            text=subset['Gardien'],
+            customdata=subset['Min'],
+            marker=dict(color=color, size=10 if is_psg else 7),
+            hovertemplate=f"%{{text}}<br>{x_metric}: %{{x:.2f}}<br>{y_metric}: %{{y:.2f}}<br>Minutes: %{{customdata:.0f}}<extra></extra>"
+        ))
+    fig_league.update_layout(
+        title=f'{y_metric} en fonction de {x_metric} ({len(points)} gardiens)',
+        xaxis_title=x_metric,
+        yaxis_title=y_metric
+    )
+    st.plotly_chart(fig_league, use_container_width=True)
+    
+    # Radar des gardiens choisis, normalisé au sein de leur saison et compétition
+    scale = st.radio("Normalisation", ["Min-max", "Percentile"], horizontal=True, key="goalkeeper_scale")
+    labels = [gk_matrix.labels[i] for i in rows]
+    default_labels = [label for label, squad in zip(labels, points['Squad']) if squad == player_search.DEFAULT_CLUB][:4]
+    compared = st.multiselect("Gardiens comparés", labels, default=default_labels, key="goalkeeper_compare_select")
+    if compared:
+        profiles = gk_matrix.radar(gk_matrix.rows(compared), scale='minmax' if scale == "Min-max" else 'percentile')
+        fig_compare = go.Figure()
+        for label, values in zip(profiles.index, profiles.to_numpy()):
+            fig_compare.add_trace(go.Scatterpolar(r=values.tolist(), theta=list(profiles.columns), fill='toself', name=label))
+        fig_compare.update_layout(
+            polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+            title=f'Profils des gardiens ({scale.lower()} par saison et compétition)',
+            showlegend=True
+        )
+        st.plotly_chart(fig_compare, use_container_width=True)
 
+@telemetry.instrument()
 def analyze_match_performance():
     """Analyse détaillée des performances par match"""
+    snapshot = data_snapshot(DATA_DIR)
     data = load_fbref_data()
     
     # Utiliser les données des joueurs de champ
     field_players_standard = data['field_players_standard'].copy()
-    field_players_shooting = data['field_players_shooting'].copy()
-    field_players_passing = data['field_players_passing'].copy()
     
     # Sélection du joueur
     player_names = field_players_standard['Player'].tolist()
-    selected_player = st.selectbox("Sélectionnez un joueur", player_names, key="match_performance_select")
+    selected_player = select_players("Sélectionnez un joueur", player_names, key="match_performance_select", snapshot=snapshot)
     
     # Affichage de la photo du joueur et des métriques de base
-    photo_path = get_player_photo(selected_player)
+    photo_path = get_player_photo(selected_player, snapshot)
     if photo_path:
         try:
             col1, col2 = st.columns([1, 3])
             with col1:
-                st.image(photo_path, width=200, use_container_width=True)
+                st.image(photo_image(photo_path, snapshot), width=200, use_container_width=True)
             with col2:
                 st.subheader(f"Performance par match de {selected_player}")
                 
                 # Récupération des données du joueur
-                player_data = field_players_standard[field_players_standard['Player'] == selected_player]
-                player_shooting = field_players_shooting[field_players_shooting['Player'] == selected_player]
-                player_passing = field_players_passing[field_players_passing['Player'] == selected_player]
+                profile = load_player_profile(snapshot, player_id_of(selected_player, snapshot))
+                player_data = profile['standard']
+                player_shooting = profile['shooting']
+                player_passing = profile['passing']
                 
                 if player_data.empty:
                     st.warning(f"Aucune donnée trouvée pour {selected_player}")
@@ -1340,116 +1834,177 @@ def analyze_match_performance():
         st.subheader(f"Performance par match de {selected_player}")
     
 
+@telemetry.instrument(kind='loader')
 @st.cache_data
+@telemetry.cache_miss
 def load_ucl_data():
     """Charge les données des matchs de Ligue des Champions"""
-    # Définition de l'ordre chronologique des matchs, leurs phases et leurs scores
-    match_order = {
-        # Phase de Ligue
-        'PSG - Girona': {'phase': 'Phase de Ligue', 'ordre': 1, 'score': '1-0'},
-        'Arsenal - PSG': {'phase': 'Phase de Ligue', 'ordre': 2, 'score': '2-0'},
-        'PSG -PSV': {'phase': 'Phase de Ligue', 'ordre': 3, 'score': '1-1'},
-        'PSG - Atletico': {'phase': 'Phase de Ligue', 'ordre': 4, 'score': '1-2'},
-        'Bayern - PSG': {'phase': 'Phase de Ligue', 'ordre': 5, 'score': '1-0'},
-        'Salzburg - PSG': {'phase': 'Phase de Ligue', 'ordre': 6, 'score': '0-3'},
-        'PSG - Manchester City': {'phase': 'Phase de Ligue', 'ordre': 7, 'score': '4-2'},
-        'Stuttgart - PSG': {'phase': 'Phase de Ligue', 'ordre': 8, 'score': '1-4'},
-        # Barrages
-        'Brest - PSG': {'phase': 'Barrages', 'ordre': 9, 'score': '0-3'},
-        'PSG - Brest': {'phase': 'Barrages', 'ordre': 10, 'score': '7-0'},
-        # 1/8 de finale
-        'PSG - Liverpool': {'phase': '1/8 de finale', 'ordre': 11, 'score': '0-1'},
-        'Liverpool - PSG': {'phase': '1/8 de finale', 'ordre': 12, 'score': '1-0 (4-1 pen)'},
-        # 1/4 de finale
-        'PSG - Aston Villa': {'phase': '1/4 de finale', 'ordre': 13, 'score': '3-1'},
-        'Aston Villa - PSG': {'phase': '1/4 de finale', 'ordre': 14, 'score': '3-2'},
-        # 1/2 finale
-        'Arsenal - PSG 2': {'phase': '1/2 finale', 'ordre': 15, 'score': '0-1'},
-        'PSG - Arsenal ': {'phase': '1/2 finale', 'ordre': 16, 'score': '2-1'},
-        # Finale
-        'PSG - Inter': {'phase': 'Finale', 'ordre': 17, 'score': '5-0'}
-    }
-    
-    ucl_data = {}
-    
-    for file in os.listdir('data/PSG UCL Games'):
-        if file.endswith('.csv'):
-            match_name = file.replace('PSG UCL Games - ', '').replace('.csv', '')
-            if match_name in match_order:
-                df = pd.read_csv(f'data/PSG UCL Games/{file}', skiprows=1)
-                df = df.rename(columns={
-                    'Performance': 'Player',
-                    'Gls': 'Gls',
-                    'Ast': 'Ast',
-                    'Sh': 'Sh',
-                    'SoT': 'SoT',
-                    'xG': 'xG',
-                    'xAG': 'xAG',
-                    'SCA': 'SCA',
-                    'GCA': 'GCA',
-                    'PrgP': 'PrgP',
-                    'PrgC': 'PrgC',
-                    'Min': 'Min'
-                })
-                df['Phase'] = match_order[match_name]['phase']
-                df['Ordre'] = match_order[match_name]['ordre']
-                df['Score'] = match_order[match_name]['score']
-                ucl_data[match_name] = df
-    
-    return ucl_data
+    return shared_data.ucl_data(DATA_DIR)
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_ucl_match_summary(snapshot, match):
+    """Score, phase et totaux d'un match de Ligue des Champions, une fois par match et snapshot des données"""
+    return shared_data.ucl_match_summary(DATA_DIR, match, snapshot, ucl=load_ucl_data())
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_team_cube(snapshot):
+    """Agrégats de l'équipe par métrique, position, saison et compétition, calculés une fois par snapshot des données"""
+    return shared_data.team_cube(DATA_DIR, snapshot, fbref=load_fbref_data())
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_pass_profiles(snapshot):
+    """Profils de passe par 90 minutes et archétypes de passeurs, regroupés une fois par snapshot des données"""
+    return shared_data.pass_profiles_table(DATA_DIR, snapshot)
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_player_roles(snapshot):
+    """Projection (ACP) et rôles des joueurs de champ, calculés une fois par snapshot des données"""
+    return shared_data.player_roles_table(DATA_DIR, snapshot, fbref=load_fbref_data())
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_shot_creation(snapshot):
+    """Actions menant à un tir ou à un but, par joueur et par type d'action, une fois par snapshot des données"""
+    return shared_data.shot_creation_chains(DATA_DIR, snapshot)['chains']
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_workload(snapshot):
+    """Charges glissantes, congestion et impact sur / hors du terrain, prolongés à l'arrivée de nouveaux matchs"""
+    return shared_data.squad_workload(DATA_DIR, snapshot, fbref=load_fbref_data(), ucl=load_ucl_data())
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_ucl_progression(snapshot):
+    """Séries de progression UCL (par match, cumulées, glissantes), prolongées à l'arrivée de nouveaux matchs"""
+    return shared_data.ucl_progression(DATA_DIR, snapshot, ucl=load_ucl_data())
 
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_xg_significance(snapshot):
+    """Calcule la significativité de la finition (G - xG) de l'effectif, mise en cache par snapshot des données"""
+    return shared_data.xg_significance(DATA_DIR, snapshot, fbref=load_fbref_data(), ucl=load_ucl_data())
+
+@telemetry.instrument(kind='loader')
+@st.cache_data
+@telemetry.cache_miss
+def load_season_simulation(snapshot, n_sims, seed, workers):
+    """Simule la saison à partir des xG du calendrier, mise en cache par snapshot et paramètres"""
+    return shared_data.season_simulation(DATA_DIR, n_sims, seed, workers, snapshot=snapshot)
+
+@telemetry.instrument()
+def render_simulations():
+    """Affiche les simulations Monte Carlo de la saison à partir des xG"""
+    st.header("Simulations Monte Carlo")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_sims = st.selectbox("Nombre de simulations", simulation.SIMULATION_COUNTS,
+                              index=simulation.SIMULATION_COUNTS.index(simulation.DEFAULT_SIMULATIONS),
+                              format_func=lambda x: f"{x:,}".replace(',', ' '), key="simulation_count_select")
+    with col2:
+        seed = int(st.number_input("Graine aléatoire", min_value=0, value=simulation.DEFAULT_SEED, step=1, key="simulation_seed_input"))
+    with col3:
+        use_pool = st.checkbox("Répartir sur plusieurs processus", value=False, key="simulation_pool_checkbox")
+    workers = (os.cpu_count() or 1) if use_pool else 1
+
+    results = load_season_simulation(data_snapshot(DATA_DIR), n_sims, seed, workers)
+
+    # Résumé des résultats
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Points Ligue 1 attendus", f"{results['league_mean_points']:.1f}",
+                  f"{results['league_actual_points']} réels", delta_color="off")
+    with col2:
+        st.metric("P(au moins les points réels)", f"{results['league_p_at_least_actual']:.1%}")
+    with col3:
+        st.metric("Qualification directe en 1/8", f"{results['ucl_direct_qualification']:.1%}")
+    with col4:
+        st.metric("Probabilité de titre en LDC", f"{results['ucl_title_odds']:.1%}")
+
+    # Distribution des points en championnat
+    st.subheader("Distribution des points en Ligue 1")
+    fig_points = px.bar(results['league_points'], x='Points', y='Probabilité',
+                        color='Probabilité', color_continuous_scale='Blues')
+    fig_points.add_vline(x=results['league_actual_points'], line_dash='dash', line_color='#d62728',
+                         annotation_text='Réel')
+    st.plotly_chart(fig_points, use_container_width=True)
+
+    # Parcours en Ligue des Champions
+    st.subheader("Parcours en Ligue des Champions")
+    rounds = results['ucl_rounds']
+    fig_rounds = go.Figure()
+    fig_rounds.add_trace(go.Bar(
+        name='Atteindre le tour',
+        x=rounds['Tour'],
+        y=rounds['P(atteindre)'],
+        marker_color='#1f77b4'
+    ))
+    fig_rounds.add_trace(go.Bar(
+        name='Se qualifier',
+        x=rounds['Tour'],
+        y=rounds['P(qualifié)'],
+        marker_color='#8B0000'
+    ))
+    fig_rounds.update_layout(
+        title='Probabilités par tour',
+        barmode='group',
+        yaxis=dict(tickformat='.0%', range=[0, 1]),
+        showlegend=True
+    )
+    st.plotly_chart(fig_rounds, use_container_width=True)
+
+    # Probabilités par match
+    st.subheader("Probabilités par match")
+    st.dataframe(results['matches'], use_container_width=True, hide_index=True)
+    n_sims_label = f"{results['n_sims']:,}".replace(',', ' ')
+    speed_label = f"{results['sims_per_second']:,.0f}".replace(',', ' ')
+    st.caption(f"{n_sims_label} simulations en {results['elapsed']:.2f} s "
+               f"({speed_label} simulations/s, {results['workers']} processus)")
+
+@telemetry.instrument()
 def analyze_ucl_progression():
     """Analyse de la progression dans la Ligue des Champions"""
-    data = load_ucl_data()
-    
     st.subheader("Progression dans la compétition")
     
-    # Calcul des statistiques cumulées
-    cumulative_stats = {
-        'Gls': [],
-        'Ast': [],
-        'xG': [],
-        'xAG': [],
-        'Sh': [],
-        'SoT': [],
-        'SCA': [],
-        'GCA': []
-    }
+    # Totaux par match, cumuls et moyennes glissantes, calculés une fois par snapshot des données
+    progression_df = load_ucl_progression(data_snapshot(DATA_DIR))
     
-    match_names = []
-    phases = []
-    scores = []
-    
-    for match_name, match_data in sorted(data.items(), key=lambda x: x[1]['Ordre'].iloc[0]):
-        match_names.append(match_name)
-        phases.append(match_data['Phase'].iloc[0])
-        scores.append(match_data['Score'].iloc[0])
-        for stat in cumulative_stats.keys():
-            cumulative_stats[stat].append(match_data[stat].sum())
-    
-    # Création d'un DataFrame pour les statistiques cumulées
-    progression_df = pd.DataFrame({
-        'Match': match_names,
-        'Phase': phases,
-        'Score': scores,
-        **cumulative_stats
-    })
+    # Mêmes matchs conservés pour toutes les traces d'une figure : l'ordre de l'axe Match est préservé
+    def match_indices(columns):
+        return charts.shared_indices(progression_df['Match'], [progression_df[col] for col in columns])
+    goals_indices = match_indices(['Gls', 'xG'])
+    creation_indices = match_indices(['SCA', 'GCA'])
     
     # Graphique de progression des buts et xG
     fig_goals = go.Figure()
-    fig_goals.add_trace(go.Scatter(
+    fig_goals.add_trace(charts.line_trace(
         name='Buts',
         x=progression_df['Match'],
         y=progression_df['Gls'],
+        indices=goals_indices,
         mode='lines+markers',
         marker=dict(color='#1f77b4'),
         text=progression_df['Score'],
         hovertemplate="Match: %{x}<br>Score: %{text}<br>Buts: %{y}<extra></extra>"
     ))
-    fig_goals.add_trace(go.Scatter(
+    fig_goals.add_trace(charts.line_trace(
         name='xG',
         x=progression_df['Match'],
         y=progression_df['xG'],
+        indices=goals_indices,
         mode='lines+markers',
         marker=dict(color='#ff7f0e'),
         text=progression_df['Score'],
@@ -1468,19 +2023,21 @@ def analyze_ucl_progression():
     
     # Graphique de progression des Créations d'actions
     fig_creation = go.Figure()
-    fig_creation.add_trace(go.Scatter(
+    fig_creation.add_trace(charts.line_trace(
         name='Créations d\'actions',
         x=progression_df['Match'],
         y=progression_df['SCA'],
+        indices=creation_indices,
         mode='lines+markers',
         marker=dict(color='#2ca02c'),
         text=progression_df['Score'],
         hovertemplate="Match: %{x}<br>Score: %{text}<br>SCA: %{y}<extra></extra>"
     ))
-    fig_creation.add_trace(go.Scatter(
+    fig_creation.add_trace(charts.line_trace(
         name='Créations d\'actions de buts',
         x=progression_df['Match'],
         y=progression_df['GCA'],
+        indices=creation_indices,
         mode='lines+markers',
         marker=dict(color='#d62728'),
         text=progression_df['Score'],
@@ -1497,6 +2054,36 @@ def analyze_ucl_progression():
     
     st.plotly_chart(fig_creation, use_container_width=True)
     
+    # Cumuls et moyennes glissantes
+    series_labels = {'Gls': 'Buts', 'xG': 'xG', 'GCA': 'GCA', 'SCA': 'SCA'}
+    series_colors = {'Gls': '#1f77b4', 'xG': '#ff7f0e', 'GCA': '#d62728', 'SCA': '#2ca02c'}
+    for suffix, title in [(progression.CUMULATIVE_SUFFIX, 'Cumul depuis le premier match'),
+                          (progression.ROLLING_SUFFIX, f'Moyenne glissante sur {progression.ROLLING_WINDOW} matchs')]:
+        fig_series = go.Figure()
+        series_indices = match_indices([stat + suffix for stat in series_labels])
+        for stat, label in series_labels.items():
+            fig_series.add_trace(charts.line_trace(
+                name=label,
+                x=progression_df['Match'],
+                y=progression_df[stat + suffix],
+                indices=series_indices,
+                mode='lines+markers',
+                marker=dict(color=series_colors[stat]),
+                text=progression_df['Score'],
+                # SCA sur un axe secondaire : un ordre de grandeur au-dessus des autres séries
+                yaxis='y2' if stat == 'SCA' else 'y',
+                hovertemplate=f"Match: %{{x}}<br>Score: %{{text}}<br>{label}: %{{y:.2f}}<extra></extra>"
+            ))
+        fig_series.update_layout(
+            title=title,
+            xaxis_title='Match',
+            yaxis=dict(title='Buts, xG, GCA'),
+            yaxis2=dict(title='SCA', overlaying='y', side='right', showgrid=False),
+            showlegend=True,
+            xaxis=dict(tickangle=45)
+        )
+        st.plotly_chart(fig_series, use_container_width=True)
+    
     # Analyse des performances par phase
     st.subheader("Performances par phase")
     
@@ -1533,54 +2120,20 @@ def analyze_ucl_progression():
     
 
 
+@telemetry.instrument()
 def analyze_ucl_key_players():
     """Analyse des performances clés des joueurs en Ligue des Champions"""
     data = load_ucl_data()
     
     st.subheader("Performances clés des joueurs")
     
-    # Calcul des statistiques cumulées par joueur
-    player_stats = {}
-    
-    for match_data in data.values():
-        for _, player in match_data.iterrows():
-            player_name = player['Player']
-            if player_name not in player_stats:
-                player_stats[player_name] = {
-                    'Gls': 0, 'Ast': 0, 'xG': 0, 'xAG': 0,
-                    'Sh': 0, 'SoT': 0, 'SCA': 0, 'GCA': 0,
-                    'Min': 0, 'Matches': 0
-                }
-            
-            player_stats[player_name]['Gls'] += player['Gls']
-            player_stats[player_name]['Ast'] += player['Ast']
-            player_stats[player_name]['xG'] += player['xG']
-            player_stats[player_name]['xAG'] += player['xAG']
-            player_stats[player_name]['Sh'] += player['Sh']
-            player_stats[player_name]['SoT'] += player['SoT']
-            player_stats[player_name]['SCA'] += player['SCA']
-            player_stats[player_name]['GCA'] += player['GCA']
-            player_stats[player_name]['Min'] += player['Min']
-            player_stats[player_name]['Matches'] += 1
-    
-    # Conversion en DataFrame
-    key_players_df = pd.DataFrame.from_dict(player_stats, orient='index')
-    key_players_df = key_players_df.reset_index().rename(columns={'index': 'Player'})
-    
-    # Calcul des statistiques par 90 minutes
-    key_players_df['Gls/90'] = (key_players_df['Gls'] * 90) / key_players_df['Min']
-    key_players_df['Ast/90'] = (key_players_df['Ast'] * 90) / key_players_df['Min']
-    key_players_df['xG/90'] = (key_players_df['xG'] * 90) / key_players_df['Min']
-    key_players_df['xAG/90'] = (key_players_df['xAG'] * 90) / key_players_df['Min']
-    key_players_df['SCA/90'] = (key_players_df['SCA'] * 90) / key_players_df['Min']
-    key_players_df['GCA/90'] = (key_players_df['GCA'] * 90) / key_players_df['Min']
-    
-    # Sélection des joueurs avec au moins 90 minutes jouées
-    key_players_df = key_players_df[key_players_df['Min'] >= 90]
+    # Statistiques cumulées et par 90 minutes (joueurs avec au moins 90 minutes jouées)
+    key_players_df = analytics.ucl_player_totals(data)
+    leaderboards = analytics.ucl_leaderboards(key_players_df)
     
     # Top 5 buteurs
     st.write("### Top 5 Buteurs")
-    top_scorers = key_players_df.nlargest(5, 'Gls')[['Player', 'Gls', 'Gls/90', 'xG', 'xG/90']]
+    top_scorers = leaderboards['scorers']
     
     fig_scorers = go.Figure()
     fig_scorers.add_trace(go.Bar(
@@ -1606,7 +2159,7 @@ def analyze_ucl_key_players():
     
     # Top 5 passeurs
     st.write("### Top 5 Passeurs")
-    top_assists = key_players_df.nlargest(5, 'Ast')[['Player', 'Ast', 'Ast/90', 'xAG', 'xAG/90']]
+    top_assists = leaderboards['assists']
     
     fig_assists = go.Figure()
     fig_assists.add_trace(go.Bar(
@@ -1632,7 +2185,7 @@ def analyze_ucl_key_players():
     
     # Top 5 créateurs de chances
     st.write("### Top 5 Créateurs de Chances")
-    top_creators = key_players_df.nlargest(5, 'SCA')[['Player', 'SCA', 'GCA', 'SCA/90', 'GCA/90']]
+    top_creators = leaderboards['creators']
     
     fig_creators = go.Figure()
     fig_creators.add_trace(go.Bar(
@@ -1656,8 +2209,10 @@ def analyze_ucl_key_players():
     
     st.plotly_chart(fig_creators, use_container_width=True)
 
+@telemetry.instrument()
 def analyze_ucl_player_match():
     """Analyse détaillée des performances par joueur pour chaque match de Ligue des Champions"""
+    snapshot = data_snapshot(DATA_DIR)
     data = load_ucl_data()
     
     st.subheader("Analyse détaillée par joueur")
@@ -1667,20 +2222,21 @@ def analyze_ucl_player_match():
     selected_match = st.selectbox("Sélectionnez un match", match_names, key="ucl_player_match_select")
     
     match_data = data[selected_match]
+    summary = load_ucl_match_summary(snapshot, selected_match)
     
     # Affichage du score et de la phase
     col1_info, col2_info = st.columns(2)
     with col1_info:
-        st.metric("Score", match_data['Score'].iloc[0])
+        st.metric("Score", summary['score'])
     with col2_info:
-        st.metric("Phase", match_data['Phase'].iloc[0])
+        st.metric("Phase", summary['phase'])
     
     # Sélection du joueur
     player_names = match_data['Player'].tolist()
     selected_player = st.selectbox("Sélectionnez un joueur", player_names, key="ucl_player_select")
     
     # Récupération des données du joueur pour le match sélectionné
-    player_data_for_match = match_data[match_data['Player'] == selected_player]
+    player_data_for_match = match_data[match_data['player_id'] == player_id_of(selected_player, snapshot)]
     
     if player_data_for_match.empty:
         st.warning(f"Aucune donnée trouvée pour {selected_player} dans le match {selected_match}.")
@@ -1693,10 +2249,10 @@ def analyze_ucl_player_match():
 
     with col_photo_ucl:
         # Affichage de la photo du joueur
-        photo_path = get_player_photo(selected_player)
+        photo_path = get_player_photo(selected_player, snapshot)
         if photo_path:
             try:
-                st.image(photo_path, width=400, use_container_width=True)
+                st.image(photo_image(photo_path, snapshot), width=400, use_container_width=True)
             except Exception as e:
                 st.error(f"Erreur lors de l'affichage de la photo : {str(e)}")
         # Optionnel : Afficher le nom du joueur sous la photo
@@ -1838,15 +2394,17 @@ def analyze_ucl_player_match():
     
     st.plotly_chart(fig_comparison, use_container_width=True)
 
+@telemetry.instrument()
 def analyze_ucl_performance():
     """Analyse des performances en Ligue des Champions"""
+    snapshot = data_snapshot(DATA_DIR)
     data = load_ucl_data()
     
     st.header("Analyse Ligue des Champions")
     
     analysis_type = st.radio(
         "Choisissez une analyse :",
-        ("Analyse Match par Match", "Analyse détaillée par joueur", "Progression dans la compétition", "Performances clés des joueurs"),
+        ("Analyse Match par Match", "Analyse détaillée par joueur", "Progression dans la compétition", "Performances clés des joueurs", "Performance par match"),
         key="ucl_analysis_radio"
     )
     
@@ -1856,34 +2414,31 @@ def analyze_ucl_performance():
         selected_match = st.selectbox("Sélectionnez un match", match_names, key="ucl_match_select")
         
         match_data = data[selected_match]
+        # Score, phase et totaux du match : une entrée du cache partagé par match
+        summary = load_ucl_match_summary(snapshot, selected_match)
+        totals = summary['totals']
         
         # Affichage du score et de la phase
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Score", match_data['Score'].iloc[0])
+            st.metric("Score", summary['score'])
         with col2:
-            st.metric("Phase", match_data['Phase'].iloc[0])
+            st.metric("Phase", summary['phase'])
         
         # Statistiques du match
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            total_goals = match_data['Gls'].sum()
-            total_xg = match_data['xG'].sum()
-            st.metric("Buts marqués", total_goals)
-            st.metric("xG total", f"{total_xg:.2f}")
+            st.metric("Buts marqués", int(totals['Gls']))
+            st.metric("xG total", f"{totals['xG']:.2f}")
         
         with col2:
-            total_assists = match_data['Ast'].sum()
-            total_xag = match_data['xAG'].sum()
-            st.metric("Passes décisives", total_assists)
-            st.metric("xAG total", f"{total_xag:.2f}")
+            st.metric("Passes décisives", int(totals['Ast']))
+            st.metric("xAG total", f"{totals['xAG']:.2f}")
         
         with col3:
-            total_shots = match_data['Sh'].sum()
-            shots_on_target = match_data['SoT'].sum()
-            st.metric("Tirs totaux", total_shots)
-            st.metric("Tirs cadrés", shots_on_target)
+            st.metric("Tirs totaux", int(totals['Sh']))
+            st.metric("Tirs cadrés", int(totals['SoT']))
         
         # Graphique des performances individuelles
         st.subheader("Performances individuelles")
@@ -1945,9 +2500,13 @@ def analyze_ucl_performance():
     elif analysis_type == "Performances clés des joueurs":
         analyze_ucl_key_players()
     
+    elif analysis_type == "Performance par match":
+        analyze_ucl_match_performance()
+    
     else:  # Analyse détaillée par joueur
         analyze_ucl_player_match()
 
+@telemetry.instrument()
 def render_home():
     # Enveloppement du logo et du titre dans un conteneur centré via HTML/CSS
     centered_header = """
@@ -1981,12 +2540,13 @@ def render_home():
     """, unsafe_allow_html=True)
 
     # Onglets principaux regroupés
-    tab_overview, tab_individual, tab_collective, tab_ucl, tab_goalkeeping = st.tabs([
+    tab_overview, tab_individual, tab_collective, tab_ucl, tab_goalkeeping, tab_simulations = st.tabs([
         "Vue d'ensemble",
         "Analyse individuelle",
         "Analyse collective",
         "Ligue des Champions",
-        "Analyse Gardiens"
+        "Analyse Gardiens",
+        "Simulations"
     ])
 
     with tab_overview:
@@ -1996,7 +2556,7 @@ def render_home():
         st.markdown('''<h2 style='color: white; font-size: 1.8rem; font-weight: 700; font-family: "Poppins", sans-serif;'>Analyse individuelle des joueurs</h2>''', unsafe_allow_html=True)
         analysis_type = st.radio(
             "Choisissez une analyse :",
-            ("Analyse par joueur", "Comparaisons", "Rôles et Profils"),
+            ("Analyse par joueur", "Comparaisons", "Rôles et Profils", "Création d'occasions"),
             key="individual_analysis_radio"
         )
         if analysis_type == "Analyse par joueur":
@@ -2005,12 +2565,14 @@ def render_home():
             render_comparisons()
         elif analysis_type == "Rôles et Profils":
             analyze_player_roles()
+        elif analysis_type == "Création d'occasions":
+            analyze_shot_creation()
 
     with tab_collective:
         st.markdown('''<h2 style='color: white; font-size: 1.8rem; font-weight: 700; font-family: "Poppins", sans-serif;'>Analyse collective et tactique</h2>''', unsafe_allow_html=True)
         analysis_type = st.radio(
             "Choisissez une analyse :",
-            ("Analyse par position", "Analyse Tactique", "Forces et Faiblesses", "Dynamiques d'Équipe", "Patterns Tactiques", "Analyse Défensive"),
+            ("Analyse par position", "Analyse Tactique", "Forces et Faiblesses", "Dynamiques d'Équipe", "Patterns Tactiques", "Analyse Défensive", "Gestion de la charge"),
             key="collective_analysis_radio"
         )
         if analysis_type == "Analyse par position":
@@ -2025,6 +2587,8 @@ def render_home():
             analyze_tactical_patterns()
         elif analysis_type == "Analyse Défensive":
             analyze_defensive_metrics()
+        elif analysis_type == "Gestion de la charge":
+            analyze_workload()
 
     with tab_ucl:
         analyze_ucl_performance()
@@ -2032,24 +2596,26 @@ def render_home():
     with tab_goalkeeping:
         analyze_goalkeeping_performance()
 
+    with tab_simulations:
+        render_simulations()
+
+@telemetry.instrument()
 def analyze_ucl_match_performance():
     """Analyse détaillée des performances par match en Ligue des Champions"""
-    ucl_data = load_ucl_data()
+    snapshot = data_snapshot(DATA_DIR)
+    timeseries = load_player_timeseries(snapshot)
     
     # Sélection du joueur
-    all_players = set()
-    for match_data in ucl_data.values():
-        all_players.update(match_data['Player'].unique())
-    player_names = sorted(list(all_players))
-    selected_player = st.selectbox("Sélectionnez un joueur", player_names, key="ucl_match_performance_select")
+    player_names = sorted(timeseries.players['Player'])
+    selected_player = select_players("Sélectionnez un joueur", player_names, key="ucl_match_performance_select", snapshot=snapshot)
     
     # Affichage de la photo du joueur
-    photo_path = get_player_photo(selected_player)
+    photo_path = get_player_photo(selected_player, snapshot)
     if photo_path:
         try:
             col1, col2 = st.columns([1, 3])
             with col1:
-                st.image(photo_path, width=200, use_container_width=True)
+                st.image(photo_image(photo_path, snapshot), width=200, use_container_width=True)
             with col2:
                 st.subheader(f"Performance par match de {selected_player} en Ligue des Champions")
         except Exception as e:
@@ -2058,42 +2624,56 @@ def analyze_ucl_match_performance():
     else:
         st.subheader(f"Performance par match de {selected_player} en Ligue des Champions")
     
-    # Récupérer les données du joueur pour chaque match
-    player_matches = []
-    for match_name, match_data in sorted(ucl_data.items(), key=lambda x: x[1]['Ordre'].iloc[0]):
-        player_match_data = match_data[match_data['Player'] == selected_player]
-        if not player_match_data.empty:
-            player_matches.append({
-                'Match': match_name,
-                'Phase': match_data['Phase'].iloc[0],
-                'Score': match_data['Score'].iloc[0],
-                'Gls': player_match_data['Gls'].iloc[0],
-                'Ast': player_match_data['Ast'].iloc[0],
-                'Min': player_match_data['Min'].iloc[0],
-                'Tkl': player_match_data['Tkl'].iloc[0] if 'Tkl' in player_match_data else 0,
-                'Int': player_match_data['Int'].iloc[0] if 'Int' in player_match_data else 0,
-                'Blocks': player_match_data['Blocks'].iloc[0] if 'Blocks' in player_match_data else 0,
-                'Clr': player_match_data['Clr'].iloc[0] if 'Clr' in player_match_data else 0
-            })
+    # Historique du joueur : une seule tranche du tableau joueur × match
+    player_id = player_id_of(selected_player, snapshot)
+    history = timeseries.history(player_id)
+    player_matches = history.to_dict('records')
     
     if player_matches:
+        # Carrière en Ligue des Champions
+        career = timeseries.career(player_id)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Matchs joués", int(career['Matchs']))
+        with col2:
+            st.metric("Minutes", int(career['Min']))
+        with col3:
+            st.metric("Buts", int(career['Gls']))
+            st.metric("xG", f"{career['xG']:.2f}")
+        with col4:
+            st.metric("Passes décisives", int(career['Ast']))
+            st.metric("xAG", f"{career['xAG']:.2f}")
+        
+        # Détail d'un match de la carrière
+        selected_match = st.selectbox("Détail d'un match", history['Match'].tolist(), key="ucl_match_performance_match")
+        match_row = history[history['Match'] == selected_match].iloc[0]
+        st.caption(f"{match_row['Phase']} - Score : {match_row['Score']}")
+        st.dataframe(match_row[timeseries.stats].to_frame(selected_match).T, use_container_width=True)
+        
+        # Mêmes matchs conservés pour toutes les barres d'une figure (séries longues sous-échantillonnées)
+        match_axis = [m['Match'] for m in player_matches]
+        offensive_indices = charts.shared_indices(match_axis, [history['Gls'], history['Ast']])
+        defensive_indices = charts.shared_indices(match_axis, [history[stat] for stat in ['Tkl', 'Int', 'Blocks', 'Clr']])
+        
         # Création du graphique offensif
         fig_offensive = go.Figure()
         
         # Ajout des barres pour les buts et passes décisives
-        fig_offensive.add_trace(go.Bar(
+        fig_offensive.add_trace(charts.bar_trace(
             name='Buts',
             x=[m['Match'] for m in player_matches],
             y=[m['Gls'] for m in player_matches],
+            indices=offensive_indices,
             marker_color='#1f77b4',
             text=[f"{m['Score']}" for m in player_matches],
             hovertemplate="Match: %{x}<br>Score: %{text}<br>Buts: %{y}<extra></extra>"
         ))
         
-        fig_offensive.add_trace(go.Bar(
+        fig_offensive.add_trace(charts.bar_trace(
             name='Passes décisives',
             x=[m['Match'] for m in player_matches],
             y=[m['Ast'] for m in player_matches],
+            indices=offensive_indices,
             marker_color='#ff7f0e',
             text=[f"{m['Score']}" for m in player_matches],
             hovertemplate="Match: %{x}<br>Score: %{text}<br>Passes décisives: %{y}<extra></extra>"
@@ -2115,37 +2695,41 @@ def analyze_ucl_match_performance():
         fig_defensive = go.Figure()
         
         # Ajout des barres pour les statistiques défensives
-        fig_defensive.add_trace(go.Bar(
+        fig_defensive.add_trace(charts.bar_trace(
             name='Tacles',
             x=[m['Match'] for m in player_matches],
             y=[m['Tkl'] for m in player_matches],
+            indices=defensive_indices,
             marker_color='#2ca02c',
             text=[f"{m['Score']}" for m in player_matches],
             hovertemplate="Match: %{x}<br>Score: %{text}<br>Tacles: %{y}<extra></extra>"
         ))
         
-        fig_defensive.add_trace(go.Bar(
+        fig_defensive.add_trace(charts.bar_trace(
             name='Interceptions',
             x=[m['Match'] for m in player_matches],
             y=[m['Int'] for m in player_matches],
+            indices=defensive_indices,
             marker_color='#d62728',
             text=[f"{m['Score']}" for m in player_matches],
             hovertemplate="Match: %{x}<br>Score: %{text}<br>Interceptions: %{y}<extra></extra>"
         ))
         
-        fig_defensive.add_trace(go.Bar(
+        fig_defensive.add_trace(charts.bar_trace(
             name='Blocages',
             x=[m['Match'] for m in player_matches],
             y=[m['Blocks'] for m in player_matches],
+            indices=defensive_indices,
             marker_color='#9467bd',
             text=[f"{m['Score']}" for m in player_matches],
             hovertemplate="Match: %{x}<br>Score: %{text}<br>Blocages: %{y}<extra></extra>"
         ))
         
-        fig_defensive.add_trace(go.Bar(
+        fig_defensive.add_trace(charts.bar_trace(
             name='Dégagements',
             x=[m['Match'] for m in player_matches],
             y=[m['Clr'] for m in player_matches],
+            indices=defensive_indices,
             marker_color='#8c564b',
             text=[f"{m['Score']}" for m in player_matches],
             hovertemplate="Match: %{x}<br>Score: %{text}<br>Dégagements: %{y}<extra></extra>"
@@ -2165,6 +2749,7 @@ def analyze_ucl_match_performance():
     else:
         st.info(f"{selected_player} n'a pas encore joué de match en Ligue des Champions cette saison.")
 
+@telemetry.instrument()
 def analyze_ucl():
     """Analyse des performances en Ligue des Champions"""
     st.title("Analyse des performances en Ligue des Champions")
@@ -2186,6 +2771,64 @@ def analyze_ucl():
     elif analysis_type == "Performance par match":
         analyze_ucl_match_performance()
 
+def render_performance_panel():
+    """Panneau d'administration caché : mesures de télémétrie des vues et chargeurs"""
+    with st.expander("Performance (administration)", expanded=True):
+        enabled = st.toggle("Activer la télémétrie", value=telemetry.is_enabled(), key="telemetry_toggle")
+        if enabled != telemetry.is_enabled():
+            telemetry.set_enabled(enabled, st)
+
+        # Mémoire des tableaux chargés, avant et après optimize_dtypes (relecture des CSV à la demande)
+        if st.button("Mesurer la mémoire des données", key="memory_report_button"):
+            fbref_report = data_loader.memory_report(data_loader.load_fbref_data(DATA_DIR, optimize=False), load_fbref_data())
+            ucl_report = data_loader.memory_report(data_loader.load_ucl_data(DATA_DIR, optimize=False), load_ucl_data())
+            memory = pd.concat([fbref_report, ucl_report.assign(Tableau='UCL - ' + ucl_report['Tableau'])], ignore_index=True)
+            before, after = memory['Avant'].sum(), memory['Après'].sum()
+            st.metric("Mémoire des données", f"{after / 1e6:.2f} Mo", f"{-100 * (1 - after / before):.1f} %", delta_color="inverse")
+            st.dataframe(memory, use_container_width=True, hide_index=True)
+
+        timings = data_loader.load_timings()
+        if not timings.empty:
+            st.markdown("#### Lecture des fichiers (dernier chargement)")
+            st.caption(f"Lectures simultanées : {data_loader.LOAD_CONCURRENCY} (PSG_LOAD_CONCURRENCY)")
+            st.dataframe(timings.sort_values('Durée (s)', ascending=False), use_container_width=True, hide_index=True)
+
+        df = telemetry.records()
+        if df.empty:
+            st.info("Aucune mesure enregistrée. Activez la télémétrie puis naviguez dans l'application.")
+            return
+
+        reruns = df[df['kind'] == 'rerun']
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Exécutions mesurées", len(reruns))
+        with col2:
+            st.metric("Durée médiane d'exécution", f"{reruns['duration_s'].median():.3f} s" if not reruns.empty else "N/A")
+        with col3:
+            st.metric("Octets envoyés (dernière exécution)", f"{int(reruns['bytes'].iloc[-1]):,}".replace(',', ' ') if not reruns.empty else "N/A")
+
+        st.markdown("#### Par vue et chargeur")
+        st.dataframe(telemetry.summary().style.format({
+            'p50_s': '{:.4f}',
+            'p95_s': '{:.4f}',
+            'max_s': '{:.4f}',
+            'total_s': '{:.3f}'
+        }), use_container_width=True)
+
+        st.markdown("#### Dernières mesures")
+        st.dataframe(df.tail(200).iloc[::-1], use_container_width=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("Exporter (OpenMetrics)", telemetry.to_openmetrics(df),
+                               file_name="psg_telemetry.txt", mime="application/openmetrics-text")
+        with col2:
+            if st.button("Vider le tampon", key="telemetry_clear"):
+                telemetry.clear()
+
 if __name__ == "__main__":
-    render_home()
+    with telemetry.rerun():
+        render_home()
+    if ADMIN_TOKEN and hmac.compare_digest(st.query_params.get('admin', ''), ADMIN_TOKEN):
+        render_performance_panel()
 
@@ -0,0 +1,227 @@
+"""Banc de performance des vues render_* / analyze_* de app.py
+
+Chaque vue est exécutée sans navigateur via l'AppTest de Streamlit sur des jeux de
+données synthétiques (voir synthetic_data.py) dont l'effectif et le nombre de matchs
+valent x1, x10, x100 (par défaut) ceux de data/. Pour chaque vue on mesure le temps
+d'exécution à froid et à chaud, le pic mémoire et la taille des figures Plotly
+envoyées au navigateur. Les résultats sont écrits en JSON et peuvent être comparés
+à une référence précédente.
+
+Exemples :
+    python benchmarks/bench_views.py --scales 1 10 100 --output baseline.json
+    python benchmarks/bench_views.py --compare baseline.json --tolerance 0.25
+"""
+import argparse
+import ast
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+# Les avertissements « missing ScriptRunContext » de Streamlit noient les mesures
+os.environ.setdefault('STREAMLIT_LOGGER_LEVEL', 'error')
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from synthetic_data import generate_dataset
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, 'app.py')
+SOURCE_DATA_DIR = os.path.join(REPO_DIR, 'data')
+UCL_DIR_NAME = 'PSG UCL Games'
+
+# Vues qui ne sont que des points d'entrée vers d'autres vues (ou le panneau d'administration)
+EXCLUDED_VIEWS = {'render_home', 'render_performance_panel'}
+
+# Script exécuté par AppTest pour une vue isolée
+VIEW_SCRIPT = """
+import sys
+sys.path.insert(0, {repo_dir!r})
+import app
+app.DATA_DIR = {data_dir!r}
+app.{view}()
+"""
+
+# Métriques comparées à la référence
+COMPARED_METRICS = ['warm_s', 'peak_memory_bytes', 'figure_bytes']
+
+
+# ----------------------------
+# JEUX DE DONNÉES SYNTHÉTIQUES
+# ----------------------------
+def scale_dataset(factor, dst_dir, seed=0, src_dir=SOURCE_DATA_DIR):
+    """Génère un jeu de données synthétique : effectif et nombre de matchs réels multipliés par factor"""
+    base = describe_dataset(src_dir)
+    return generate_dataset(dst_dir, n_players=base['players'] * factor,
+                            n_ucl_matches=base['ucl_matches'] * factor, seed=seed)
+
+
+def describe_dataset(data_dir):
+    """Compte les joueurs et les matchs d'un jeu de données"""
+    players = len(pd.read_csv(os.path.join(data_dir, 'PSG Standard Stats.csv')))
+    matches = len([f for f in os.listdir(os.path.join(data_dir, UCL_DIR_NAME)) if f.endswith('.csv')])
+    return {'players': players, 'ucl_matches': matches}
+
+
+# ----------------------------
+# MESURES
+# ----------------------------
+def discover_views(app_path=APP_PATH):
+    """Liste les fonctions render_* et analyze_* définies dans app.py"""
+    with open(app_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return [
+        node.name for node in tree.body
+        if isinstance(node, ast.FunctionDef)
+        and node.name.startswith(('render_', 'analyze_'))
+        and node.name not in EXCLUDED_VIEWS
+    ]
+
+
+def _figure_payload(app_test):
+    """Nombre et taille (octets) des figures Plotly rendues"""
+    charts = app_test.get('plotly_chart')
+    return len(charts), sum(len(chart.proto.spec.encode('utf-8')) for chart in charts)
+
+
+def measure_view(view, data_dir, repeat=3, timeout=600):
+    """Mesure une vue : temps à froid / à chaud, pic mémoire et taille des figures"""
+    script = VIEW_SCRIPT.format(repo_dir=REPO_DIR, data_dir=data_dir, view=view)
+    app_test = AppTest.from_string(script, default_timeout=timeout)
+
+    # Exécution à froid (caches vidés)
+    st.cache_data.clear()
+    start = time.perf_counter()
+    app_test.run()
+    cold = time.perf_counter() - start
+
+    # Seconde exécution à froid pour le pic mémoire : tracemalloc fausserait les temps
+    st.cache_data.clear()
+    tracemalloc.start()
+    app_test.run()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    errors = [str(exc.value) for exc in app_test.exception]
+    figures, figure_bytes = _figure_payload(app_test)
+
+    # Exécutions à chaud (caches remplis), comme lors des interactions utilisateur
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        app_test.run()
+        warm.append(time.perf_counter() - start)
+
+    return {
+        'cold_s': cold,
+        'warm_s': statistics.median(warm) if warm else cold,
+        'peak_memory_bytes': peak_memory,
+        'figures': figures,
+        'figure_bytes': figure_bytes,
+        'errors': errors
+    }
+
+
+def run_benchmarks(scales, views=None, repeat=3, timeout=600, seed=0, log=print):
+    """Exécute le banc sur chaque échelle et renvoie les résultats"""
+    views = views or discover_views()
+    results = {
+        'meta': {
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'streamlit': st.__version__,
+            'pandas': pd.__version__,
+            'repeat': repeat,
+            'seed': seed
+        },
+        'scales': {}
+    }
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f'psg_bench_x{scale}_') as tmp:
+            data_dir = scale_dataset(scale, tmp, seed=seed)
+            scale_results = {'dataset': describe_dataset(data_dir), 'views': {}}
+            log(f"x{scale} : {scale_results['dataset']}")
+            for view in views:
+                measures = measure_view(view, data_dir, repeat=repeat, timeout=timeout)
+                scale_results['views'][view] = measures
+                log(f"  {view:<35} froid {measures['cold_s']:8.3f} s  chaud {measures['warm_s']:8.3f} s  "
+                    f"mémoire {measures['peak_memory_bytes'] / 1e6:8.1f} Mo  figures {measures['figure_bytes'] / 1e3:9.1f} Ko"
+                    + (f"  ERREUR : {measures['errors'][0]}" if measures['errors'] else ''))
+            results['scales'][str(scale)] = scale_results
+        st.cache_data.clear()
+
+    return results
+
+
+def compare_results(baseline, current, tolerance=0.25):
+    """Liste les régressions (métrique dépassant la référence de plus de tolerance)"""
+    regressions = []
+    for scale, scale_results in current['scales'].items():
+        baseline_views = baseline.get('scales', {}).get(scale, {}).get('views', {})
+        for view, measures in scale_results['views'].items():
+            reference = baseline_views.get(view)
+            if reference is None:
+                continue
+            for metric in COMPARED_METRICS:
+                before, after = reference.get(metric), measures.get(metric)
+                if before and after and after > before * (1 + tolerance):
+                    regressions.append({
+                        'scale': scale,
+                        'view': view,
+                        'metric': metric,
+                        'baseline': before,
+                        'current': after,
+                        'ratio': after / before
+                    })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de performance des vues du PSG Data Center")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help="Facteurs d'agrandissement des données (défaut : 1 10 100)")
+    parser.add_argument('--views', nargs='+', help="Vues à mesurer (défaut : toutes)")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre d'exécutions à chaud (défaut : 3)")
+    parser.add_argument('--seed', type=int, default=0, help="Graine des données synthétiques (défaut : 0)")
+    parser.add_argument('--timeout', type=float, default=600, help="Délai maximal par exécution (secondes)")
+    parser.add_argument('--output', help="Fichier JSON où écrire les résultats")
+    parser.add_argument('--compare', help="Fichier JSON de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Dégradation tolérée avant de signaler une régression (défaut : 0.25)")
+    args = parser.parse_args(argv)
+
+    # Les vues lisent styles.css et les photos relativement au dépôt
+    os.chdir(REPO_DIR)
+    results = run_benchmarks(args.scales, views=args.views, repeat=args.repeat, timeout=args.timeout,
+                             seed=args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Résultats écrits dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, tolerance=args.tolerance)
+        for reg in regressions:
+            print(f"RÉGRESSION x{reg['scale']} {reg['view']} {reg['metric']} : "
+                  f"{reg['baseline']:.4g} -> {reg['current']:.4g} (x{reg['ratio']:.2f})")
+        if regressions:
+            return 1
+        print("Aucune régression détectée.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
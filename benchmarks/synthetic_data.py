@@ -0,0 +1,581 @@
+"""Générateur de jeux de données FBref / Ligue des Champions synthétiques
+
+Écrit des CSV au format exact de ceux de data/ (mêmes en-têtes, y compris les
+colonnes dupliquées, séparateurs de milliers, valeurs #ERROR!, double en-tête des
+feuilles de match UCL, absence de saut de ligne final) pour un nombre arbitraire
+de joueurs, de matchs et de saisons. La génération est déterministe pour une graine
+donnée.
+
+La saison la plus récente est écrite à la racine du répertoire de sortie (lisible
+directement par app.py via PSG_DATA_DIR) et les saisons précédentes dans
+seasons/<saison>/ avec la même structure.
+
+Exemple :
+    python benchmarks/synthetic_data.py --output /tmp/psg_big --players 5000 --ucl-matches 300 --seasons 5
+"""
+import argparse
+import csv
+import datetime
+import io
+import os
+
+import numpy as np
+
+UCL_DIR_NAME = 'PSG UCL Games'
+SEASONS_DIR_NAME = 'seasons'
+LAST_SEASON_START = 2024
+
+# ----------------------------
+# EN-TÊTES (identiques aux exports FBref)
+# ----------------------------
+STANDARD_HEADER = [
+    'Player', 'Nation', 'Pos', 'Age', 'MP', 'Starts', 'Min', '90s', 'Gls', 'Ast', 'G+A', 'G-PK', 'PK', 'PKatt',
+    'CrdY', 'CrdR', 'xG', 'npxG', 'xAG', 'npxG+xAG', 'PrgC', 'PrgP', 'PrgR', 'Gls', 'Ast', 'G+A', 'G-PK',
+    'G+A-PK', 'xG', 'xAG', 'xG+xAG', 'npxG', 'npxG+xAG', 'Matches'
+]
+SHOOTING_HEADER = [
+    'Player', 'Nation', 'Pos', 'Age', '90s', 'Gls', 'Sh', 'SoT', 'SoT%', 'Sh/90', 'SoT/90', 'G/Sh', 'G/SoT',
+    'Dist', 'FK', 'PK', 'PKatt', 'xG', 'npxG', 'npxG/Sh', 'G-xG', 'np:G-xG', 'Matches'
+]
+PASSING_HEADER = [
+    'Player', 'Nation', 'Pos', 'Age', '90s', 'Cmp', 'Att', 'Cmp%', 'TotDist', 'PrgDist', 'Cmp', 'Att', 'Cmp%',
+    'Cmp', 'Att', 'Cmp%', 'Cmp', 'Att', 'Cmp%', 'Ast', 'xAG', 'xA', 'A-xAG', 'KP', '1/3', 'PPA', 'CrsPA',
+    'PrgP', 'Matches'
+]
+PASS_TYPES_HEADER = [
+    'Player', 'Nation', 'Pos', 'Age', '90s', 'Att', 'Live', 'Dead', 'FK', 'TB', 'Sw', 'Crs', 'TI', 'CK', 'In',
+    'Out', 'Str', 'Cmp', 'Off', 'Blocks', 'Matches'
+]
+POSSESSION_HEADER = [
+    'Player', 'Nation', 'Pos', 'Age', '90s', 'Touches', 'Def Pen', 'Def 3rd', 'Mid 3rd', 'Att 3rd', 'Att Pen',
+    'Live', 'Att', 'Succ', 'Succ%', 'Tkld', 'Tkld%', 'Carries', 'TotDist', 'PrgDist', 'PrgC', '1/3', 'CPA',
+    'Mis', 'Dis', 'Rec', 'PrgR', 'Matches'
+]
+PLAYING_TIME_HEADER = [
+    'Player', 'Nation', 'Pos', 'MP', 'Min', 'Mn/MP', 'Min%', '90s', 'Starts', 'Mn/Start', 'Compl', 'Subs',
+    'Mn/Sub', 'unSub', 'PPM', 'onG', 'onGA', 'onxG', 'onxGA', 'Matches'
+]
+GOALKEEPING_HEADER = [
+    'Player', 'Nation', 'Pos', 'Age', 'MP', 'Starts', 'Min', '90s', 'GA', 'GA90', 'SoTA', 'Saves', 'Save%',
+    'W', 'D', 'L', 'CS', 'CS%', 'PKatt', 'PKA', 'PKsv', 'PKm', 'Save%', 'Matches'
+]
+SHOT_CREATION_HEADER = [
+    'Player', 'Nation', 'Pos', 'Age', '90s', 'SCA', 'SCA90', 'PassLive', 'PassDead', 'TO', 'Sh', 'Fld', 'Def',
+    'GCA', 'GCA90', 'PassLive', 'PassDead', 'TO', 'Sh', 'Fld', 'Def', 'Matches'
+]
+FIXTURES_HEADER = [
+    'Date', 'Time', 'Comp', 'Round', 'Day', 'Venue', 'Result', 'GF', 'GA', 'Opponent', 'xG', 'xGA', 'Poss',
+    'Attendance', 'Captain', 'Formation', 'Opp Formation', 'Referee', 'Match Report', 'Notes'
+]
+UCL_GROUP_HEADER = [
+    '', '', '', '', '', '', 'Performance', '', '', '', '', '', '', '', '', '', '', '', 'Expected', '', '', 'SCA',
+    '', 'Passes', '', '', '', 'Carries', '', 'Take-Ons', ''
+]
+UCL_HEADER = [
+    'Player', '#', 'Nation', 'Pos', 'Age', 'Min', 'Gls', 'Ast', 'PK', 'PKatt', 'Sh', 'SoT', 'CrdY', 'CrdR',
+    'Touches', 'Tkl', 'Int', 'Blocks', 'xG', 'npxG', 'xAG', 'SCA', 'GCA', 'Cmp', 'Att', 'Cmp%', 'PrgP',
+    'Carries', 'PrgC', 'Att', 'Succ'
+]
+
+# ----------------------------
+# VOCABULAIRE
+# ----------------------------
+FIRST_NAMES = [
+    'Achraf', 'Bradley', 'Désiré', 'Warren', 'João', 'Gonçalo', 'Fabián', 'Ousmane', 'Khvicha', 'Lucas',
+    'Nuno', 'Willian', 'Senny', 'Ibrahim', 'Yoram', 'Naoufel', 'Gianluigi', 'Matvei', 'Arnau', 'Presnel',
+    'Noham', 'Wassim', 'Quentin', 'Carlos', 'Kang-in', 'Théo', 'Raphaël', 'Zoë', 'Mathéo', 'Loïc',
+    'Rayan', 'Ilyès', 'Adrien', 'Benoît', 'Hugo', 'Kylian', 'Mamadou', 'Sékou', 'Jérémy', 'Álvaro',
+    'Iñaki', 'Rúben', 'Nélson', 'Çağlar', 'Sergio', 'Andrés', 'Mikel', 'Léo', 'Éric', 'Noé'
+]
+LAST_NAMES = [
+    'Hakimi', 'Barcola', 'Doué', 'Zaïre-Emery', 'Neves', 'Ramos', 'Ruiz', 'Peña', 'Dembélé', 'Kvaratskhelia',
+    'Hernández', 'Mendes', 'Pacho', 'Mayulu', 'Mbaye', 'Zague', 'El Hannach', 'Donnarumma', 'Safonov',
+    'Tenas', 'Kimpembe', 'Kamara', 'Slama', 'Ndjantou', 'Soler', 'Lee', 'Beraldo', 'Mbitcha', 'Guèye',
+    'Koné', 'Traoré', 'Müller', 'Sánchez', 'Gonçalves', 'Lefèvre', 'Fofana', 'Diallo', 'Camara',
+    'Søndergaard', 'Łukasz', 'Özil', 'Çelik', 'Núñez', 'García', 'Rodríguez', 'Kanté', 'Thuram', 'Saïss'
+]
+MONONYMS = ['Marquinhos', 'Vitinha', 'Danilo', 'Fernandinho', 'Juninho', 'Rafinha', 'Paulinho', 'Gabriel']
+NATIONS = [
+    'fr FRA', 'pt POR', 'br BRA', 'es ESP', 'ma MAR', 'it ITA', 'eng ENG', 'ge GEO', 'kr KOR', 'ec ECU',
+    'ar ARG', 'de GER', 'nl NED', 'ru RUS', 'sn SEN', 'ci CIV', 'dz ALG', 'be BEL', 'hr CRO', 'uy URU'
+]
+POSITIONS = {
+    'GK': ['GK'],
+    'DF': ['DF', 'DF', 'DF', 'DF,MF', 'DF,FW'],
+    'MF': ['MF', 'MF', 'MF,FW', 'MF,DF', 'FW,MF'],
+    'FW': ['FW', 'FW', 'FW,MF', 'MF,FW', 'FW,DF']
+}
+MATCH_POSITIONS = {
+    'GK': ['GK'],
+    'DF': ['CB', 'CB', 'LB', 'RB', 'WB'],
+    'MF': ['DM', 'CM', 'CM', 'AM', 'LM', 'RM'],
+    'FW': ['FW', 'LW', 'RW', 'FW,RW', 'FW,LW']
+}
+ROLE_SHARES = {'GK': 0.1, 'DF': 0.32, 'MF': 0.3, 'FW': 0.28}
+# Production offensive par 90 minutes selon le rôle : xG, xAG, passes progressives, conduites, réceptions
+ROLE_RATES = {
+    'GK': (0.0, 0.0, 0.3, 0.05, 0.0),
+    'DF': (0.04, 0.08, 4.5, 1.5, 1.5),
+    'MF': (0.12, 0.14, 6.5, 2.0, 3.5),
+    'FW': (0.42, 0.2, 2.5, 4.0, 9.0)
+}
+LEAGUE_OPPONENTS = [
+    'Le Havre', 'Montpellier', 'Lille', 'Brest', 'Reims', 'Rennes', 'Nice', 'Lens', 'Marseille', 'Lyon',
+    'Monaco', 'Nantes', 'Strasbourg', 'Toulouse', 'Angers', 'Auxerre', 'Saint-Étienne'
+]
+UCL_OPPONENTS = [
+    ('eng', 'Arsenal'), ('es', 'Girona'), ('nl', 'PSV Eindhoven'), ('es', 'Atlético Madrid'), ('de', 'Bayern Munich'),
+    ('at', 'RB Salzburg'), ('eng', 'Manchester City'), ('de', 'Stuttgart'), ('fr', 'Brest'), ('eng', 'Liverpool'),
+    ('eng', 'Aston Villa'), ('it', 'Inter'), ('es', 'Real Madrid'), ('es', 'Barcelona'), ('pt', 'Benfica'),
+    ('it', 'Milan'), ('de', 'Dortmund'), ('pt', 'Porto'), ('nl', 'Ajax'), ('it', 'Juventus')
+]
+UCL_ROUNDS = ['Knockout phase play-offs'] * 2 + ['Round of 16'] * 2 + ['Quarter-finals'] * 2 + ['Semi-finals'] * 2 + ['Final']
+CUP_ROUNDS = ['Round of 64', 'Round of 32', 'Round of 16', 'Quarter-finals', 'Semi-finals', 'Final']
+FORMATIONS = ['4-3-2003', '4-2-3-1', '3-4-2003', '4-4-2', '5-3-2002', '4-1-4-1', '3-5-2002']
+REFEREES = ['Willy Delajod', 'Marc Bollengier', 'Benoît Bastien', 'Clément Turpin', 'François Letexier', 'István Kovács']
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Proportion de valeurs calculées remplacées par #ERROR! (comme dans les exports tableur)
+ERROR_RATE = 0.3
+
+
+# ----------------------------
+# FORMATAGE
+# ----------------------------
+def fmt_int(value):
+    return str(int(value))
+
+
+def fmt_thousands(value):
+    """Entier avec séparateur de milliers ("4,133")"""
+    return f"{int(value):,}"
+
+
+def fmt_float(value, decimals=1):
+    return '' if not np.isfinite(value) else f"{value:.{decimals}f}"
+
+
+def fmt_ratio(numerator, denominator, decimals=1, scale=1.0):
+    """Ratio formaté, vide lorsque le dénominateur est nul (comme FBref)"""
+    return '' if denominator == 0 else f"{scale * numerator / denominator:.{decimals}f}"
+
+
+def fmt_signed(value, rng):
+    """Différence signée ("+1.9"), parfois remplacée par #ERROR!"""
+    if rng.random() < ERROR_RATE:
+        return '#ERROR!'
+    return f"{value:+.1f}" if round(value, 1) != 0 else '0.0'
+
+
+def write_csv(path, rows):
+    """Écrit un CSV sans saut de ligne final, comme les exports d'origine"""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(buffer.getvalue().rstrip('\n'))
+
+
+# ----------------------------
+# EFFECTIFS
+# ----------------------------
+def generate_names(n, rng, taken=None):
+    """Noms de joueurs uniques (avec accents, noms composés et surnoms)"""
+    taken = set() if taken is None else taken
+    names = []
+    while len(names) < n:
+        draw = rng.random()
+        if draw < 0.05:
+            name = MONONYMS[rng.integers(len(MONONYMS))]
+        elif draw < 0.2:
+            name = (f"{FIRST_NAMES[rng.integers(len(FIRST_NAMES))]} {LAST_NAMES[rng.integers(len(LAST_NAMES))]} "
+                    f"{LAST_NAMES[rng.integers(len(LAST_NAMES))]}")
+        else:
+            name = f"{FIRST_NAMES[rng.integers(len(FIRST_NAMES))]} {LAST_NAMES[rng.integers(len(LAST_NAMES))]}"
+        if name in taken:
+            name = f"{name} {len(taken)}"
+        taken.add(name)
+        names.append(name)
+    return names
+
+
+def generate_squad(n_players, rng, previous=None, retention=0.75, taken_names=None):
+    """Effectif d'une saison (une partie de l'effectif précédent est conservée)"""
+    squad = []
+    if previous:
+        kept = rng.permutation(len(previous))[:int(len(previous) * retention)]
+        for idx in sorted(kept)[:n_players]:
+            player = dict(previous[idx])
+            player['age'] += 1
+            squad.append(player)
+
+    roles = list(ROLE_SHARES)
+    shares = np.array(list(ROLE_SHARES.values()))
+    new_names = generate_names(n_players - len(squad), rng, taken_names)
+    for name in new_names:
+        role = roles[rng.choice(len(roles), p=shares / shares.sum())]
+        squad.append({
+            'name': name,
+            'nation': NATIONS[rng.integers(len(NATIONS))],
+            'role': role,
+            'pos': POSITIONS[role][rng.integers(len(POSITIONS[role]))],
+            'age': int(rng.integers(16, 36)),
+            'number': int(rng.integers(1, 99)),
+            'talent': float(rng.lognormal(0, 0.35))
+        })
+    return squad
+
+
+def season_totals(squad, n_matches, rng):
+    """Statistiques de saison (temps de jeu et production) de chaque joueur"""
+    n = len(squad)
+    roles = np.array([p['role'] for p in squad])
+    # Temps de jeu : une partie de l'effectif joue beaucoup, quelques joueurs jamais
+    usage = rng.beta(1.1, 1.6, size=n)
+    usage[rng.random(n) < 0.06] = 0
+    mp = np.round(usage * n_matches).astype(int)
+    starts = np.minimum(mp, np.round(mp * rng.beta(4, 2, size=n))).astype(int)
+    minutes = (starts * rng.uniform(75, 90, size=n) + (mp - starts) * rng.uniform(10, 35, size=n)).astype(int)
+    minutes[mp == 0] = 0
+    nineties = np.round(minutes / 90, 1)
+
+    rates = np.array([ROLE_RATES[r] for r in roles])
+    talent = np.array([p['talent'] for p in squad])
+    xg = np.round(rates[:, 0] * talent * nineties * rng.uniform(0.7, 1.3, size=n), 1)
+    xag = np.round(rates[:, 1] * talent * nineties * rng.uniform(0.7, 1.3, size=n), 1)
+    pkatt = rng.poisson(np.where(roles == 'FW', 0.05, 0.01) * nineties)
+    pk = rng.binomial(pkatt, 0.8)
+    npxg = np.round(np.maximum(xg - 0.79 * pkatt, 0), 1)
+    goals = rng.poisson(npxg) + pk
+
+    return {
+        'roles': roles,
+        'mp': mp,
+        'starts': starts,
+        'min': minutes,
+        '90s': nineties,
+        'xg': xg,
+        'npxg': npxg,
+        'xag': xag,
+        'gls': goals,
+        'ast': rng.poisson(xag),
+        'pk': pk,
+        'pkatt': pkatt,
+        'crdy': rng.poisson(0.15 * nineties),
+        'crdr': rng.binomial(1, np.minimum(0.01 * nineties, 0.5)),
+        'prgp': rng.poisson(rates[:, 2] * nineties),
+        'prgc': rng.poisson(rates[:, 3] * nineties),
+        'prgr': rng.poisson(rates[:, 4] * nineties)
+    }
+
+
+# ----------------------------
+# TABLES FBREF
+# ----------------------------
+def _identity(player, with_age=True):
+    row = [player['name'], player['nation'], player['pos']]
+    return row + [fmt_int(player['age'])] if with_age else row
+
+
+def build_fbref_tables(squad, totals, n_matches, rng):
+    """Construit les lignes de toutes les tables FBref d'une saison"""
+    order = np.argsort(-totals['min'], kind='stable')
+    tables = {
+        'PSG Standard Stats.csv': [STANDARD_HEADER],
+        'PSG Shooting.csv': [SHOOTING_HEADER],
+        'PSG Passing.csv': [PASSING_HEADER],
+        'PSG Pass Types.csv': [PASS_TYPES_HEADER],
+        'PSG Possession.csv': [POSSESSION_HEADER],
+        'PSG Playing Time.csv': [PLAYING_TIME_HEADER],
+        'PSG Goalkeeping.csv': [GOALKEEPING_HEADER],
+        'Goal and Shot Creation.csv': [SHOT_CREATION_HEADER]
+    }
+
+    for i in order:
+        player = squad[i]
+        mp, starts, minutes, n90 = totals['mp'][i], totals['starts'][i], totals['min'][i], totals['90s'][i]
+        gls, ast, xg, npxg, xag = totals['gls'][i], totals['ast'][i], totals['xg'][i], totals['npxg'][i], totals['xag'][i]
+        pk, pkatt = totals['pk'][i], totals['pkatt'][i]
+        role = totals['roles'][i]
+        min_label = fmt_thousands(minutes)
+
+        if mp == 0:
+            # Joueurs jamais utilisés : lignes quasiment vides
+            tables['PSG Standard Stats.csv'].append(_identity(player) + ['0', '0'] + [''] * 27 + ['Matches'])
+            tables['PSG Playing Time.csv'].append(
+                _identity(player, with_age=False) + ['0', '', '', '', '', '0', '', '0', '0', '', '1'] + [''] * 5 + ['Matches'])
+            continue
+
+        per90 = lambda value: fmt_ratio(value, n90, 2) if n90 else '0.00'
+        tables['PSG Standard Stats.csv'].append(_identity(player) + [
+            fmt_int(mp), fmt_int(starts), min_label, fmt_float(n90), fmt_int(gls), fmt_int(ast), fmt_int(gls + ast),
+            fmt_int(gls - pk), fmt_int(pk), fmt_int(pkatt), fmt_int(totals['crdy'][i]), fmt_int(totals['crdr'][i]),
+            fmt_float(xg), fmt_float(npxg), fmt_float(xag), fmt_float(npxg + xag), fmt_int(totals['prgc'][i]),
+            fmt_int(totals['prgp'][i]), fmt_int(totals['prgr'][i]), per90(gls), per90(ast), per90(gls + ast),
+            per90(gls - pk), per90(gls + ast - pk), per90(xg), per90(xag), per90(xg + xag), per90(npxg),
+            per90(npxg + xag), 'Matches'
+        ])
+
+        # Tirs
+        shots = int(rng.poisson(max(npxg, 0.05) / 0.11)) + pkatt
+        on_target = max(int(rng.binomial(shots, 0.38)), min(gls, shots))
+        tables['PSG Shooting.csv'].append(_identity(player) + [
+            fmt_float(n90), fmt_int(gls), fmt_int(shots), fmt_int(on_target), fmt_ratio(on_target, shots, 1, 100),
+            fmt_ratio(shots, n90, 2), fmt_ratio(on_target, n90, 2), fmt_ratio(gls, shots, 2), fmt_ratio(gls, on_target, 2),
+            fmt_float(rng.uniform(8, 25)) if shots else '', fmt_int(rng.poisson(0.02 * n90)), fmt_int(pk), fmt_int(pkatt),
+            fmt_float(xg), fmt_float(npxg), fmt_ratio(npxg, shots - pkatt, 2), fmt_signed(gls - xg, rng),
+            fmt_signed(gls - pk - npxg, rng), 'Matches'
+        ])
+
+        # Passes
+        attempts = int(rng.poisson({'GK': 30, 'DF': 60, 'MF': 70, 'FW': 30}[role] * n90)) + 1
+        completed = int(rng.binomial(attempts, {'GK': 0.7, 'DF': 0.9, 'MF': 0.88, 'FW': 0.78}[role]))
+        blocks = []
+        for share, rate in [(0.45, 0.95), (0.4, 0.9), (0.15, 0.65)]:
+            att = int(attempts * share)
+            blocks.append((int(rng.binomial(att, rate)), att))
+        xa = round(xag * rng.uniform(0.7, 1.3), 1)
+        key_passes = int(rng.poisson(max(xag, 0.01) * 9))
+        tables['PSG Passing.csv'].append(_identity(player) + [
+            fmt_float(n90), fmt_int(completed), fmt_int(attempts), fmt_ratio(completed, attempts, 1, 100),
+            fmt_int(completed * rng.uniform(14, 22)), fmt_int(completed * rng.uniform(3, 7))
+        ] + sum([[fmt_int(c), fmt_int(a), fmt_ratio(c, a, 1, 100)] for c, a in blocks], []) + [
+            fmt_int(ast), fmt_float(xag), fmt_float(xa), fmt_signed(ast - xag, rng), fmt_int(key_passes),
+            fmt_int(rng.poisson(3 * n90)), fmt_int(rng.poisson(1.2 * n90)), fmt_int(rng.poisson(0.3 * n90)),
+            fmt_int(totals['prgp'][i]), 'Matches'
+        ])
+
+        # Types de passes
+        dead = int(rng.binomial(attempts, 0.06 if role != 'GK' else 0.3))
+        crosses = int(rng.poisson({'GK': 0, 'DF': 1.2, 'MF': 0.8, 'FW': 1.5}[role] * n90))
+        corners = int(rng.poisson(0.3 * n90)) if role in ('MF', 'FW') else 0
+        tables['PSG Pass Types.csv'].append(_identity(player) + [
+            fmt_float(n90), fmt_int(attempts), fmt_int(attempts - dead), fmt_int(dead),
+            fmt_int(rng.binomial(dead, 0.4)), fmt_int(rng.poisson(0.1 * n90)), fmt_int(rng.poisson(0.4 * n90)),
+            fmt_int(crosses), fmt_int(rng.binomial(dead, 0.3) if role == 'DF' else 0), fmt_int(corners),
+            fmt_int(rng.binomial(corners, 0.4)), fmt_int(rng.binomial(corners, 0.4)), fmt_int(rng.binomial(corners, 0.1)),
+            fmt_int(completed), fmt_int(rng.poisson(0.1 * n90)), fmt_int(rng.poisson(0.5 * n90)), 'Matches'
+        ])
+
+        # Possession
+        touches = attempts + int(rng.poisson(20 * n90)) + 1
+        zones = rng.multinomial(touches, {'GK': [0.6, 0.35, 0.05, 0, 0], 'DF': [0.1, 0.4, 0.4, 0.09, 0.01],
+                                          'MF': [0.03, 0.2, 0.55, 0.2, 0.02], 'FW': [0.01, 0.05, 0.35, 0.45, 0.14]}[role])
+        dribbles = int(rng.poisson({'GK': 0, 'DF': 0.3, 'MF': 1.0, 'FW': 2.5}[role] * n90))
+        succ = int(rng.binomial(dribbles, 0.45))
+        carries = int(touches * rng.uniform(0.5, 0.7))
+        tables['PSG Possession.csv'].append(_identity(player) + [
+            fmt_float(n90), fmt_int(touches)] + [fmt_int(z) for z in zones] + [
+            fmt_int(touches - int(rng.integers(0, 3))), fmt_int(dribbles), fmt_int(succ), fmt_ratio(succ, dribbles, 1, 100),
+            fmt_int(dribbles - succ), fmt_ratio(dribbles - succ, dribbles, 1, 100), fmt_int(carries),
+            fmt_int(carries * rng.uniform(4, 6)), fmt_int(carries * rng.uniform(2, 3)), fmt_int(totals['prgc'][i]),
+            fmt_int(rng.poisson(1.5 * n90)), fmt_int(rng.poisson(0.5 * n90)), fmt_int(rng.poisson(1.0 * n90)),
+            fmt_int(rng.poisson(0.8 * n90)), fmt_int(touches * rng.uniform(0.6, 0.8)), fmt_int(totals['prgr'][i]), 'Matches'
+        ])
+
+        # Temps de jeu et impact
+        subs = mp - starts
+        team_xg, team_xga = 2.2 * n90, 0.9 * n90
+        on_g, on_ga = int(rng.poisson(team_xg * 1.1)), int(rng.poisson(team_xga))
+        tables['PSG Playing Time.csv'].append(_identity(player, with_age=False) + [
+            fmt_int(mp), min_label, fmt_ratio(minutes, mp, 0), fmt_ratio(minutes, 90 * n_matches, 1, 100),
+            fmt_float(n90), fmt_int(starts), fmt_ratio(minutes - subs * 20, starts, 0) if starts else '',
+            fmt_int(int(starts * 0.8)), fmt_int(subs), fmt_ratio(subs * 20, subs, 0) if subs else '',
+            fmt_int(rng.integers(0, 8)), fmt_float(rng.uniform(1.8, 2.6), 2), fmt_int(on_g), fmt_int(on_ga),
+            fmt_float(team_xg * rng.uniform(0.9, 1.1)), fmt_float(team_xga * rng.uniform(0.9, 1.1)), 'Matches'
+        ])
+
+        # Création d'occasions (deux blocs SCA / GCA aux en-têtes dupliqués)
+        sca = int(rng.poisson((xg + xag) * 4 + 0.2 * n90))
+        sca_mix = rng.multinomial(sca, [0.72, 0.08, 0.06, 0.06, 0.05, 0.03])
+        gca = int(rng.binomial(sca, 0.09))
+        gca_mix = rng.multinomial(gca, [0.7, 0.1, 0.06, 0.08, 0.04, 0.02])
+        tables['Goal and Shot Creation.csv'].append(_identity(player) + [
+            fmt_float(n90), fmt_int(sca), fmt_ratio(sca, n90, 2)] + [fmt_int(v) for v in sca_mix] + [
+            fmt_int(gca), fmt_ratio(gca, n90, 2)] + [fmt_int(v) for v in gca_mix] + ['Matches'])
+
+        # Gardiens
+        if role == 'GK':
+            against = int(rng.poisson(0.9 * n90))
+            sota = against + int(rng.poisson(2.3 * n90))
+            wins = int(rng.binomial(starts, 0.7))
+            draws = int(rng.binomial(starts - wins, 0.5))
+            clean = int(rng.binomial(starts, 0.3))
+            pk_faced = int(rng.poisson(0.08 * n90))
+            pk_saved = int(rng.binomial(pk_faced, 0.2))
+            tables['PSG Goalkeeping.csv'].append(_identity(player) + [
+                fmt_int(mp), fmt_int(starts), min_label, fmt_float(n90), fmt_int(against), fmt_ratio(against, n90, 2),
+                fmt_int(sota), fmt_int(sota - against), fmt_ratio(sota - against, sota, 1, 100), fmt_int(wins),
+                fmt_int(draws), fmt_int(starts - wins - draws), fmt_int(clean), fmt_ratio(clean, starts, 1, 100),
+                fmt_int(pk_faced), fmt_int(pk_faced - pk_saved), fmt_int(pk_saved), '0',
+                fmt_ratio(pk_saved, pk_faced, 1, 100), 'Matches'
+            ])
+
+    return tables
+
+
+# ----------------------------
+# CALENDRIER ET FEUILLES DE MATCH UCL
+# ----------------------------
+def _ucl_rounds(n_ucl):
+    """Tours des matchs UCL d'une saison : phase de ligue puis tableau final"""
+    knockout = UCL_ROUNDS[-min(n_ucl, len(UCL_ROUNDS)):] if n_ucl > 8 else []
+    return ['League phase'] * (n_ucl - len(knockout)) + knockout
+
+
+def build_fixtures(season_start, squad, n_ucl, rng):
+    """Calendrier d'une saison (Ligue 1, coupes, Ligue des Champions)"""
+    comps = ['Trophée des Champions'] + ['Ligue 1'] * 34 + ['Coupe de France'] * len(CUP_ROUNDS) + ['Champions Lg'] * n_ucl
+    order = np.concatenate([[0], 1 + rng.permutation(len(comps) - 1)])
+    comps = [comps[i] for i in order]
+    # Les matchs UCL gardent leur ordre de tour, la finale de coupe et de LDC en fin de saison
+    ucl_rounds, cup_rounds = iter(_ucl_rounds(n_ucl)), iter(CUP_ROUNDS)
+    season_days = 290
+    offsets = np.sort(rng.choice(season_days * 4, size=len(comps), replace=False)) / 4
+    start = datetime.date(season_start, 8, 10)
+
+    rows, matchweek, ucl_matches = [FIXTURES_HEADER], 0, []
+    captains = [p['name'] for p in squad[:5]] or ['']
+    for comp, offset in zip(comps, offsets):
+        date = start + datetime.timedelta(days=int(offset))
+        if comp == 'Ligue 1':
+            matchweek += 1
+            round_name, opponent, venue = f"Matchweek {matchweek}", LEAGUE_OPPONENTS[rng.integers(len(LEAGUE_OPPONENTS))], ['Home', 'Away'][rng.integers(2)]
+        elif comp == 'Champions Lg':
+            round_name = next(ucl_rounds)
+            code, club = UCL_OPPONENTS[rng.integers(len(UCL_OPPONENTS))]
+            opponent, venue = f"{code} {club}", 'Neutral' if round_name == 'Final' else ['Home', 'Away'][rng.integers(2)]
+        elif comp == 'Coupe de France':
+            round_name, opponent = next(cup_rounds), LEAGUE_OPPONENTS[rng.integers(len(LEAGUE_OPPONENTS))]
+            venue = 'Neutral' if round_name == 'Final' else ['Home', 'Away'][rng.integers(2)]
+        else:
+            round_name, opponent, venue = 'Final', 'Monaco', 'Neutral'
+
+        xg, xga = round(rng.gamma(4, 0.55), 1), round(rng.gamma(2, 0.45), 1)
+        gf, ga = int(rng.poisson(xg)), int(rng.poisson(xga))
+        gf_label, ga_label = str(gf), str(ga)
+        if gf == ga and comp != 'Ligue 1' and round_name != 'League phase':
+            # Séance de tirs au but notée entre parenthèses
+            pens_for, pens_against = (4, 1) if rng.random() < 0.5 else (2, 4)
+            gf_label, ga_label = f"{gf} ({pens_for})", f"{ga} ({pens_against})"
+        result = 'W' if gf > ga else 'L' if gf < ga else 'D'
+        missing_xg = comp == 'Coupe de France' and rng.random() < 0.3
+        rows.append([
+            date.isoformat(), ['20:45', '21:00', '18:45'][rng.integers(3)], comp, round_name, WEEKDAYS[date.weekday()],
+            venue, result, gf_label, ga_label, opponent, '' if missing_xg else fmt_float(xg),
+            '' if missing_xg else fmt_float(xga), fmt_int(rng.integers(45, 80)), fmt_thousands(rng.integers(15000, 80000)),
+            captains[rng.integers(len(captains))], FORMATIONS[0], FORMATIONS[rng.integers(len(FORMATIONS))],
+            REFEREES[rng.integers(len(REFEREES))], 'Match Report', ''
+        ])
+        if comp == 'Champions Lg':
+            ucl_matches.append({'opponent': opponent.split(' ', 1)[1], 'venue': venue, 'gf': gf, 'xg': xg})
+
+    rows[1:] = sorted(rows[1:], key=lambda row: row[0])
+    return rows, ucl_matches
+
+
+def build_ucl_match(squad, totals, match, season_start, rng):
+    """Feuille de match UCL : 11 titulaires et quelques remplaçants, double en-tête"""
+    weights = totals['min'].astype(float) + 1
+    roles = totals['roles']
+    keepers = np.flatnonzero(roles == 'GK')
+    field = np.flatnonzero(roles != 'GK')
+    lineup = []
+    if len(keepers):
+        lineup.append(int(rng.choice(keepers, p=weights[keepers] / weights[keepers].sum())))
+    n_field = min(len(field), 10 + int(rng.integers(3, 6)))
+    lineup += list(rng.choice(field, size=n_field, replace=False, p=weights[field] / weights[field].sum()))
+
+    length = 120 if rng.random() < 0.08 else 90
+    rows = [UCL_GROUP_HEADER, UCL_HEADER]
+    goals_left = match['gf']
+    for slot, i in enumerate(lineup):
+        player = squad[i]
+        minutes = length if slot < 11 and rng.random() < 0.75 else int(rng.integers(1, length))
+        share = minutes / 90
+        rate = ROLE_RATES[roles[i]]
+        xg = round(rate[0] * player['talent'] * share * rng.uniform(0.3, 2.0), 1)
+        xag = round(rate[1] * player['talent'] * share * rng.uniform(0.3, 2.0), 1)
+        gls = min(goals_left, int(rng.poisson(xg)))
+        goals_left -= gls
+        shots = int(rng.poisson(xg / 0.11)) + gls
+        on_target = max(gls, int(rng.binomial(shots, 0.38)))
+        attempts = int(rng.poisson(55 * share)) + 1
+        completed = int(rng.binomial(attempts, 0.86))
+        sca = int(rng.poisson((xg + xag) * 4 + 0.5 * share))
+        dribbles = int(rng.poisson(1.5 * share))
+        age_days = int(rng.integers(0, 365))
+        rows.append([
+            player['name'], fmt_int(player['number']), player['nation'],
+            MATCH_POSITIONS[roles[i]][rng.integers(len(MATCH_POSITIONS[roles[i]]))],
+            f"{player['age'] + (season_start - LAST_SEASON_START)}-{age_days:03d}", fmt_int(minutes), fmt_int(gls),
+            fmt_int(rng.poisson(xag)), '0', '0', fmt_int(shots), fmt_int(on_target), fmt_int(rng.binomial(1, 0.1)), '0',
+            fmt_int(attempts + rng.poisson(15 * share)), fmt_int(rng.poisson(1.5 * share)), fmt_int(rng.poisson(0.8 * share)),
+            fmt_int(rng.poisson(0.8 * share)), fmt_float(xg), fmt_float(xg), fmt_float(xag), fmt_int(sca),
+            fmt_int(rng.binomial(sca, 0.1)), fmt_int(completed), fmt_int(attempts), fmt_ratio(completed, attempts, 1, 100),
+            fmt_int(rng.poisson(4 * share)), fmt_int(rng.poisson(30 * share)), fmt_int(rng.poisson(2 * share)),
+            fmt_int(dribbles), fmt_int(rng.binomial(dribbles, 0.5))
+        ])
+    return rows
+
+
+def ucl_file_names(matches):
+    """Noms de fichiers UCL ('PSG - Club', 'Club - PSG', suffixe numéroté pour les confrontations répétées)"""
+    seen, names = {}, []
+    for match in matches:
+        base = f"{match['opponent']} - PSG" if match['venue'] == 'Away' else f"PSG - {match['opponent']}"
+        seen[base] = seen.get(base, 0) + 1
+        names.append(base if seen[base] == 1 else f"{base} {seen[base]}")
+    return [f"PSG UCL Games - {name}.csv" for name in names]
+
+
+# ----------------------------
+# GÉNÉRATION
+# ----------------------------
+def season_label(season_start):
+    return f"{season_start}-{season_start + 1}"
+
+
+def write_season(out_dir, squad, n_ucl, season_start, rng):
+    """Écrit tous les fichiers d'une saison dans out_dir"""
+    os.makedirs(os.path.join(out_dir, UCL_DIR_NAME), exist_ok=True)
+    fixtures, ucl_matches = build_fixtures(season_start, squad, n_ucl, rng)
+    totals = season_totals(squad, len(fixtures) - 1, rng)
+
+    for name, rows in build_fbref_tables(squad, totals, len(fixtures) - 1, rng).items():
+        write_csv(os.path.join(out_dir, name), rows)
+    write_csv(os.path.join(out_dir, 'PSG Scores & Fixtures.csv'), fixtures)
+    for match, file_name in zip(ucl_matches, ucl_file_names(ucl_matches)):
+        write_csv(os.path.join(out_dir, UCL_DIR_NAME, file_name), build_ucl_match(squad, totals, match, season_start, rng))
+
+
+def generate_dataset(out_dir, n_players=28, n_ucl_matches=17, n_seasons=1, seed=0):
+    """Génère un jeu de données complet et renvoie le répertoire de la saison la plus récente"""
+    rng = np.random.default_rng(seed)
+    taken_names = set()
+    squad = None
+    first_season = LAST_SEASON_START - n_seasons + 1
+    for season_start in range(first_season, LAST_SEASON_START + 1):
+        squad = generate_squad(n_players, rng, previous=squad, taken_names=taken_names)
+        if season_start == LAST_SEASON_START:
+            target = out_dir
+        else:
+            target = os.path.join(out_dir, SEASONS_DIR_NAME, season_label(season_start))
+        write_season(target, squad, n_ucl_matches, season_start, rng)
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère des données FBref / UCL synthétiques au format de data/")
+    parser.add_argument('--output', required=True, help="Répertoire de sortie")
+    parser.add_argument('--players', type=int, default=28, help="Joueurs par saison (défaut : 28)")
+    parser.add_argument('--ucl-matches', type=int, default=17, help="Matchs de Ligue des Champions par saison (défaut : 17)")
+    parser.add_argument('--seasons', type=int, default=1, help="Nombre de saisons (défaut : 1)")
+    parser.add_argument('--seed', type=int, default=0, help="Graine aléatoire (défaut : 0)")
+    args = parser.parse_args(argv)
+    generate_dataset(args.output, n_players=args.players, n_ucl_matches=args.ucl_matches,
+                     n_seasons=args.seasons, seed=args.seed)
+    print(f"Données écrites dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
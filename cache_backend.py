@@ -0,0 +1,348 @@
+import contextlib
+import hashlib
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import threading
+import time
+
+# ----------------------------
+# CACHE PARTAGÉ ENTRE RÉPLIQUES
+# ----------------------------
+# Tables chargées et agrégats calculés une seule fois par nœud, partagés par les
+# processus Streamlit et l'API. Les clés combinent le snapshot des données (toute
+# modification des CSV invalide les entrées) et CACHE_VERSION, à incrémenter lorsque
+# les chargeurs ou la structure des valeurs changent.
+#
+# PSG_CACHE_BACKEND : none (défaut), disk, redis ou memory (substitut local de Redis)
+# PSG_CACHE_DIR     : répertoire du cache disque
+# PSG_CACHE_URL     : URL Redis (redis://host:6379/0)
+#
+# Le nettoyage après un calcul ne touche que les snapshots du même répertoire de données
+# (source) : des répliques servant des données différentes peuvent partager le cache.
+CACHE_VERSION = 8
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'psg_cache')
+# Durée de vie des verrous de calcul (un calcul plus long est considéré abandonné)
+LOCK_TIMEOUT = 300
+LOCK_POLL_INTERVAL = 0.05
+# Alignement des tampons dans les fichiers du cache disque (lecture vectorisée des tableaux)
+BUFFER_ALIGNMENT = 64
+# Libération d'un verrou Redis par comparaison et suppression atomiques : seul son détenteur le supprime
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def make_key(name, snapshot, *parts):
+    """Clé versionnée : format, snapshot des données, nom et paramètres"""
+    params = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:16]
+    return f"psg:v{CACHE_VERSION}:{snapshot}:{name}:{params}"
+
+
+def source_id(source):
+    """Identifiant du répertoire de données d'origine d'un snapshot"""
+    return hashlib.sha1(os.path.abspath(source).encode('utf-8')).hexdigest()[:16]
+
+
+class NullBackend:
+    """Aucun partage : chaque appel recalcule (comportement par défaut)"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, source=None):
+        pass
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        yield
+
+    def prune(self, snapshot, source):
+        return 0
+
+
+class DiskBackend:
+    """Fichiers pickle dont les tableaux (numpy, Arrow) sont projetés en mémoire sans copie
+
+    Pickle protocole 5 avec tampons hors bande : le flux pickle ne contient que la structure,
+    les données des tableaux suivent dans le fichier et sont relues comme vues sur un mmap
+    copy-on-write. Les processus partagent ainsi les pages du noyau ; une écriture éventuelle
+    dans un tableau ne copie que la page modifiée, dans le processus qui écrit.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key, suffix='.pkl'):
+        _, version, snapshot, name, _ = key.split(':', 4)
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, version, snapshot, f"{name}-{digest[:16]}{suffix}")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            # En-tête : longueur du flux pickle, nombre de tampons puis (position, taille) de chacun
+            view = memoryview(buf)
+            payload_size, n_buffers = struct.unpack_from('<QQ', view, 0)
+            index = struct.unpack_from(f'<{2 * n_buffers}Q', view, 16)
+            start = 16 + 16 * n_buffers
+            # Les vues sur le mmap gardent la projection ouverte tant qu'un tableau les référence
+            buffers = [view[offset:offset + size] for offset, size in zip(index[::2], index[1::2])]
+            return pickle.loads(view[start:start + payload_size], buffers=buffers)
+        except (FileNotFoundError, ValueError, EOFError, struct.error, pickle.UnpicklingError):
+            return None
+
+    def set(self, key, value, source=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if source is not None:
+            self._record_source(os.path.dirname(path), source)
+        buffers = []
+        payload = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        # Tampons alignés après l'en-tête et le flux pickle
+        offset = 16 + 16 * len(raws) + len(payload)
+        index = []
+        for raw in raws:
+            offset += -offset % BUFFER_ALIGNMENT
+            index += [offset, raw.nbytes]
+            offset += raw.nbytes
+        # Écriture atomique : les autres processus ne voient jamais un fichier partiel
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(struct.pack(f'<QQ{len(index)}Q', len(payload), len(raws), *index))
+                f.write(payload)
+                for raw, position in zip(raws, index[::2]):
+                    f.write(b'\0' * (position - f.tell()))
+                    f.write(raw)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _record_source(snapshot_dir, source):
+        """Note le répertoire de données d'origine du snapshot (lu par prune)"""
+        marker = os.path.join(snapshot_dir, 'source')
+        if not os.path.exists(marker):
+            with open(marker, 'w', encoding='utf-8') as f:
+                f.write(source_id(source))
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        path = self._path(key, suffix='.lock')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            import fcntl
+        except ImportError:
+            # Pas de verrou de fichier hors POSIX : calcul éventuellement dupliqué
+            yield
+            return
+        with open(path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def prune(self, snapshot, source):
+        """Supprime les entrées des autres snapshots du même répertoire de données, toutes versions du format"""
+        removed = 0
+        if not os.path.isdir(self.directory):
+            return removed
+        origin = source_id(source)
+        for version in os.listdir(self.directory):
+            version_dir = os.path.join(self.directory, version)
+            if not os.path.isdir(version_dir):
+                continue
+            for entry in os.listdir(version_dir):
+                if version == f"v{CACHE_VERSION}" and entry == snapshot:
+                    continue
+                # Snapshots d'un autre répertoire (autre réplique) ou d'origine inconnue : conservés
+                try:
+                    with open(os.path.join(version_dir, entry, 'source'), encoding='utf-8') as f:
+                        if f.read() != origin:
+                            continue
+                except OSError:
+                    continue
+                shutil.rmtree(os.path.join(version_dir, entry), ignore_errors=True)
+                removed += 1
+        return removed
+
+
+class LocalRedis:
+    """Substitut local d'un client Redis (get / set / delete / scan_iter / eval), pour les tests et le développement"""
+
+    def __init__(self):
+        self._data = {}
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and expires < time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key) if self._alive(key) else None
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._alive(key):
+                return None
+            self._data[key] = value
+            if ex is not None:
+                self._expires[key] = time.monotonic() + ex
+            else:
+                self._expires.pop(key, None)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            removed = 0
+            for key in keys:
+                removed += self._data.pop(key, None) is not None
+                self._expires.pop(key, None)
+            return removed
+
+    def eval(self, script, numkeys, *keys_and_args):
+        """Seul le script de libération des verrous est pris en charge (comparaison et suppression atomiques)"""
+        if script != RELEASE_LOCK_SCRIPT or numkeys != 1:
+            raise NotImplementedError("LocalRedis n'exécute que RELEASE_LOCK_SCRIPT")
+        key, token = keys_and_args
+        with self._lock:
+            if self._alive(key) and self._data[key] == token:
+                self._data.pop(key)
+                self._expires.pop(key, None)
+                return 1
+            return 0
+
+    def scan_iter(self, match=None):
+        prefix = match.rstrip('*') if match else ''
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix) and self._alive(key)]
+        return iter(keys)
+
+
+class RedisBackend:
+    """Adaptateur pour tout client compatible Redis (redis-py, LocalRedis, ...)"""
+
+    def __init__(self, client, ttl=None):
+        self.client = client
+        self.ttl = ttl
+
+    @staticmethod
+    def _name(key):
+        return key if isinstance(key, str) else key.decode('utf-8')
+
+    def get(self, key):
+        payload = self.client.get(key)
+        return pickle.loads(payload) if payload is not None else None
+
+    def set(self, key, value, source=None):
+        self.client.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=self.ttl)
+        if source is not None:
+            # Répertoire de données d'origine du snapshot (lu par prune)
+            snapshot = key.split(':', 3)[2]
+            self.client.set(f"psg:source:{snapshot}", source_id(source).encode('ascii'), ex=self.ttl)
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        lock_key = f"{key}:lock"
+        token = os.urandom(16).hex().encode('ascii')
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        # SET NX EX : un seul processus calcule, les autres attendent le résultat
+        acquired = self.client.set(lock_key, token, ex=LOCK_TIMEOUT, nx=True)
+        while not acquired and time.monotonic() <= deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            acquired = self.client.set(lock_key, token, ex=LOCK_TIMEOUT, nx=True)
+        try:
+            # Détenteur bloqué au-delà du délai : calcul dupliqué plutôt qu'une attente sans fin
+            yield
+        finally:
+            # Le verrou a pu expirer et être repris : seul le jeton posé ici est supprimé
+            if acquired:
+                self.client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    def prune(self, snapshot, source):
+        """Supprime les entrées des autres snapshots du même répertoire de données, toutes versions du format"""
+        origin = source_id(source).encode('ascii')
+        stale_snapshots = set()
+        for marker in self.client.scan_iter(match='psg:source:*'):
+            other = self._name(marker).split(':', 2)[2]
+            if other != snapshot and self.client.get(marker) == origin:
+                stale_snapshots.add(other)
+        current = f"psg:v{CACHE_VERSION}:{snapshot}:"
+        stale = []
+        for key in self.client.scan_iter(match='psg:v*'):
+            name = self._name(key)
+            if name.split(':', 3)[2] in stale_snapshots or (name.split(':', 3)[2] == snapshot
+                                                             and not name.startswith(current)):
+                stale.append(key)
+        stale += [f"psg:source:{other}" for other in stale_snapshots]
+        return self.client.delete(*stale) if stale else 0
+
+
+def backend_from_env():
+    """Construit le backend configuré par les variables d'environnement"""
+    kind = os.environ.get('PSG_CACHE_BACKEND', 'none').lower()
+    if kind == 'disk':
+        return DiskBackend(os.environ.get('PSG_CACHE_DIR', DEFAULT_CACHE_DIR))
+    if kind == 'memory':
+        return RedisBackend(LocalRedis())
+    if kind == 'redis':
+        import redis
+
+        return RedisBackend(redis.Redis.from_url(os.environ.get('PSG_CACHE_URL', 'redis://localhost:6379/0')))
+    if kind == 'none':
+        return NullBackend()
+    raise ValueError(f"PSG_CACHE_BACKEND inconnu : {kind}")
+
+
+_backend = None
+
+
+def get_backend():
+    """Backend partagé du processus (créé à la première utilisation)"""
+    global _backend
+    if _backend is None:
+        _backend = backend_from_env()
+    return _backend
+
+
+def set_backend(backend):
+    """Remplace le backend du processus (tests, configuration explicite)"""
+    global _backend
+    _backend = backend
+
+
+def get_or_compute(name, snapshot, compute, *parts, backend=None, source=None):
+    """Renvoie la valeur partagée ou la calcule une seule fois par nœud (source : répertoire de données)"""
+    backend = backend or get_backend()
+    key = make_key(name, snapshot, *parts)
+    value = backend.get(key)
+    if value is not None:
+        return value
+    with backend.lock(key):
+        # Un autre processus a pu remplir l'entrée pendant l'attente du verrou
+        value = backend.get(key)
+        if value is None:
+            value = compute()
+            backend.set(key, value, source=source)
+            # Nouveau calcul : les entrées des snapshots précédents de ce répertoire ne servent plus
+            if source is not None:
+                backend.prune(snapshot, source)
+    return value
@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# ----------------------------
+# SÉRIES LONGUES
+# ----------------------------
+# Traces Plotly des vues de progression. Jusqu'à PSG_WEBGL_THRESHOLD points, les traces
+# restent en SVG (go.Scatter / go.Bar). Au-delà, elles passent en WebGL (go.Scattergl),
+# et les séries de plus de PSG_CHART_MAX_POINTS points sont sous-échantillonnées côté
+# serveur par LTTB (Largest-Triangle-Three-Buckets), qui conserve les pics et creux.
+# Les traces d'une même figure partagent l'axe x : elles reçoivent les mêmes indices
+# (shared_indices, union des sélections LTTB de chaque série), sans quoi chaque trace
+# garderait ses propres matchs et Plotly mélangerait l'ordre des catégories de l'axe.
+# Les nuages de points (abscisses non triées) passent en WebGL sans sous-échantillonnage.
+WEBGL_THRESHOLD = int(os.environ.get('PSG_WEBGL_THRESHOLD', 1000))
+MAX_POINTS = int(os.environ.get('PSG_CHART_MAX_POINTS', 2000))
+
+
+def lttb_indices(x, y, n_out):
+    """Indices des points conservés par LTTB (premier et dernier points toujours inclus)"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    # Les valeurs manquantes ne pèsent pas dans le choix des points
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+
+    # n_out - 2 seaux entre le premier et le dernier point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Sommet fictif : moyenne du seau suivant (le dernier point pour le dernier seau)
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        mean_x, mean_y = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+        # Point du seau formant le plus grand triangle avec le point retenu précédent
+        area = np.abs(
+            (x[previous] - mean_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (mean_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample(x, y, n_out=MAX_POINTS):
+    """Indices LTTB d'une série ; les abscisses non numériques sont remplacées par leur rang"""
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x_values = x.astype('int64').to_numpy()
+    elif pd.api.types.is_numeric_dtype(x):
+        x_values = x.to_numpy(dtype=float)
+    else:
+        x_values = np.arange(len(x))
+    return lttb_indices(x_values, y, n_out)
+
+
+def _take(value, indices, n):
+    """Sous-échantillonne les attributs par point (text, customdata, ...) de longueur n"""
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series, pd.Index)) and len(value) == n:
+        return np.asarray(value, dtype=object)[indices] if not isinstance(value, np.ndarray) else value[indices]
+    return value
+
+
+def shared_indices(x, ys, max_points=MAX_POINTS):
+    """Indices communs aux traces d'un même axe x : union des sélections LTTB de chaque série (au plus max_points)
+
+    None si les séries ne dépassent pas max_points (aucun sous-échantillonnage).
+    """
+    if len(x) <= max_points:
+        return None
+    per_series = max(3, max_points // max(len(ys), 1))
+    return np.unique(np.concatenate([downsample(x, y, per_series) for y in ys]))
+
+
+def _points(x, y, kwargs, max_points, indices=None):
+    n = len(y)
+    if indices is None:
+        if n <= max_points:
+            return x, y, kwargs
+        indices = downsample(x, y, max_points)
+    kwargs = {key: _take(value, indices, n) for key, value in kwargs.items()}
+    return np.asarray(x, dtype=object)[indices], np.asarray(y, dtype=float)[indices], kwargs
+
+
+def line_trace(x, y, threshold=WEBGL_THRESHOLD, max_points=MAX_POINTS, indices=None, lttb=True, **kwargs):
+    """Trace en ligne : SVG pour les séries courtes, WebGL sous-échantillonné au-delà du seuil
+
+    indices : points communs aux traces de la figure (shared_indices) ; lttb=False pour les
+    nuages de points, passés en WebGL sans sous-échantillonnage.
+    """
+    if len(y) <= threshold:
+        return go.Scatter(x=x, y=y, **kwargs)
+    if lttb:
+        x, y, kwargs = _points(x, y, kwargs, max_points, indices)
+    return go.Scattergl(x=x, y=y, **kwargs)
+
+
+def bar_trace(x, y, threshold=WEBGL_THRESHOLD, max_points=MAX_POINTS, indices=None, **kwargs):
+    """Barres en SVG pour les séries courtes ; au-delà du seuil, points WebGL (Plotly n'a pas de barres WebGL)"""
+    if len(y) <= threshold:
+        return go.Bar(x=x, y=y, **kwargs)
+    x, y, kwargs = _points(x, y, kwargs, max_points, indices)
+    # Attributs propres aux barres remplacés par leurs équivalents pour des marqueurs
+    color = kwargs.pop('marker_color', None)
+    for key in ('offsetgroup', 'textposition', 'width'):
+        kwargs.pop(key, None)
+    if color is not None:
+        kwargs['marker'] = dict(kwargs.get('marker') or {}, color=color)
+    return go.Scattergl(x=x, y=y, mode='markers', **kwargs)
@@ -0,0 +1,304 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from entity_resolution import PlayerRegistry
+
+# ----------------------------
+# CHARGEMENT DES DONNÉES
+# ----------------------------
+# Chargeurs sans dépendance à Streamlit, partagés par app.py (st.cache_data) et api.py
+
+# Définition de l'ordre chronologique des matchs, leurs phases et leurs scores
+UCL_MATCH_ORDER = {
+    # Phase de Ligue
+    'PSG - Girona': {'phase': 'Phase de Ligue', 'ordre': 1, 'score': '1-0'},
+    'Arsenal - PSG': {'phase': 'Phase de Ligue', 'ordre': 2, 'score': '2-0'},
+    'PSG -PSV': {'phase': 'Phase de Ligue', 'ordre': 3, 'score': '1-1'},
+    'PSG - Atletico': {'phase': 'Phase de Ligue', 'ordre': 4, 'score': '1-2'},
+    'Bayern - PSG': {'phase': 'Phase de Ligue', 'ordre': 5, 'score': '1-0'},
+    'Salzburg - PSG': {'phase': 'Phase de Ligue', 'ordre': 6, 'score': '0-3'},
+    'PSG - Manchester City': {'phase': 'Phase de Ligue', 'ordre': 7, 'score': '4-2'},
+    'Stuttgart - PSG': {'phase': 'Phase de Ligue', 'ordre': 8, 'score': '1-4'},
+    # Barrages
+    'Brest - PSG': {'phase': 'Barrages', 'ordre': 9, 'score': '0-3'},
+    'PSG - Brest': {'phase': 'Barrages', 'ordre': 10, 'score': '7-0'},
+    # 1/8 de finale
+    'PSG - Liverpool': {'phase': '1/8 de finale', 'ordre': 11, 'score': '0-1'},
+    'Liverpool - PSG': {'phase': '1/8 de finale', 'ordre': 12, 'score': '1-0 (4-1 pen)'},
+    # 1/4 de finale
+    'PSG - Aston Villa': {'phase': '1/4 de finale', 'ordre': 13, 'score': '3-1'},
+    'Aston Villa - PSG': {'phase': '1/4 de finale', 'ordre': 14, 'score': '3-2'},
+    # 1/2 finale
+    'Arsenal - PSG 2': {'phase': '1/2 finale', 'ordre': 15, 'score': '0-1'},
+    'PSG - Arsenal ': {'phase': '1/2 finale', 'ordre': 16, 'score': '2-1'},
+    # Finale
+    'PSG - Inter': {'phase': 'Finale', 'ordre': 17, 'score': '5-0'}
+}
+
+
+# Nombre maximal de fichiers lus simultanément (volumes réseau : la latence domine)
+LOAD_CONCURRENCY = int(os.environ.get('PSG_LOAD_CONCURRENCY', '8'))
+
+# Colonnes de libellés répétés converties en catégories par optimize_dtypes
+CATEGORICAL_COLUMNS = ['Player', 'Nation', 'Pos', 'Position', 'Position_Detail', 'Phase', 'Score']
+# Proportion maximale de valeurs distinctes pour qu'une catégorie fasse gagner de la mémoire
+MAX_CATEGORY_RATIO = 0.5
+# Marge des entiers réduits : les vues multiplient par 90 et cumulent sans conversion préalable
+INT_HEADROOM = 1000
+
+
+def get_player_position(pos):
+    """Détermine la position principale d'un joueur"""
+    if pd.isna(pos):
+        return 'Unknown'
+    
+    pos = str(pos).strip()
+    
+    # Gardiens
+    if 'GK' in pos:
+        return 'GK'
+    
+    # Défenseurs
+    if 'DF' in pos or 'CB' in pos or 'LB' in pos or 'RB' in pos or 'WB' in pos:
+        return 'DF'
+    
+    # Milieux
+    if 'MF' in pos or 'DM' in pos or 'CM' in pos or 'AM' in pos:
+        return 'MF'
+    
+    # Attaquants
+    if 'FW' in pos or 'ST' in pos or 'LW' in pos or 'RW' in pos or 'CF' in pos:
+        return 'FW'
+    
+    return 'Unknown'
+
+
+def get_detailed_position(pos):
+    """Détermine la position détaillée d'un joueur"""
+    if pd.isna(pos):
+        return 'Unknown'
+    
+    pos = str(pos).strip()
+    
+    # Gardiens
+    if 'GK' in pos:
+        return 'Gardien'
+    
+    # Défenseurs
+    if 'CB' in pos:
+        return 'Défenseur Central'
+    if 'LB' in pos:
+        return 'Latéral Gauche'
+    if 'RB' in pos:
+        return 'Latéral Droit'
+    if 'WB' in pos:
+        return 'Arrière Latéral'
+    if 'DF' in pos:
+        return 'Défenseur'
+    
+    # Milieux
+    if 'DM' in pos:
+        return 'Milieu Défensif'
+    if 'CM' in pos:
+        return 'Milieu Central'
+    if 'AM' in pos:
+        return 'Milieu Offensif'
+    if 'MF' in pos:
+        return 'Milieu'
+    
+    # Attaquants
+    if 'ST' in pos:
+        return 'Attaquant'
+    if 'LW' in pos:
+        return 'Ailier Gauche'
+    if 'RW' in pos:
+        return 'Ailier Droit'
+    if 'CF' in pos:
+        return 'Attaquant de Pointe'
+    if 'FW' in pos:
+        return 'Attaquant'
+    
+    return 'Unknown'
+
+
+def classify_positions(pos, classifier=get_player_position):
+    """Classe une colonne Pos en n'appliquant le classifieur qu'aux valeurs distinctes (colonne catégorielle)"""
+    # Le passage en catégoriel est nettement plus rapide que pd.factorize sur les chaînes Arrow
+    pos_categorical = pos if isinstance(pos.dtype, pd.CategoricalDtype) else pos.astype('category')
+    codes = pos_categorical.cat.codes.to_numpy()
+    # Dernière entrée : libellé des valeurs manquantes (code -1)
+    labels = [classifier(value) for value in pos_categorical.cat.categories] + [classifier(np.nan)]
+    label_codes, categories = pd.factorize(pd.Series(labels, dtype=object))
+    return pd.Series(pd.Categorical.from_codes(label_codes[codes], categories=categories), index=pos.index, name=pos.name)
+
+
+def optimize_dtypes(df):
+    """Réduit la mémoire d'un tableau : libellés répétés en catégories, nombres au plus petit type sûr"""
+    for col in df.columns:
+        series = df[col]
+        if len(series) == 0:
+            continue
+        if col in CATEGORICAL_COLUMNS:
+            if not isinstance(series.dtype, pd.CategoricalDtype) and series.nunique() <= MAX_CATEGORY_RATIO * len(series):
+                df[col] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_extension_array_dtype(series):
+            bound = int(series.abs().max()) * INT_HEADROOM
+            for dtype in (np.int8, np.int16, np.int32):
+                if bound <= np.iinfo(dtype).max:
+                    df[col] = series.astype(dtype)
+                    break
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            # float32 uniquement sans perte : les valeurs décimales FBref restent en float64
+            downcast = series.astype(np.float32)
+            if np.array_equal(downcast.to_numpy(dtype=np.float64), series.to_numpy(dtype=np.float64), equal_nan=True):
+                df[col] = downcast
+    return df
+
+
+def memory_report(before, after):
+    """Mémoire (octets) de chaque tableau avant et après optimisation"""
+    rows = []
+    for name, df in before.items():
+        size_before = int(df.memory_usage(deep=True).sum())
+        size_after = int(after[name].memory_usage(deep=True).sum())
+        rows.append({
+            'Tableau': name,
+            'Avant': size_before,
+            'Après': size_after,
+            'Gain (%)': 100 * (1 - size_after / size_before) if size_before else 0.0
+        })
+    return pd.DataFrame(rows)
+
+
+_load_timings = {}
+_load_timings_lock = threading.Lock()
+
+
+def _timed_read_csv(path, **kwargs):
+    start = time.perf_counter()
+    df = pd.read_csv(path, **kwargs)
+    with _load_timings_lock:
+        _load_timings[path] = {'seconds': time.perf_counter() - start, 'rows': len(df)}
+    return df
+
+
+def read_csv_files(paths, max_workers=None, **kwargs):
+    """Lit plusieurs CSV simultanément dans un pool de threads borné (résultats dans l'ordre des chemins)"""
+    workers = max(1, min(max_workers or LOAD_CONCURRENCY, len(paths)))
+    if workers == 1:
+        return [_timed_read_csv(path, **kwargs) for path in paths]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='psg-load') as executor:
+        return list(executor.map(lambda path: _timed_read_csv(path, **kwargs), paths))
+
+
+def load_timings():
+    """Durée de lecture et nombre de lignes du dernier chargement de chaque fichier"""
+    with _load_timings_lock:
+        rows = [{'Fichier': path, 'Durée (s)': t['seconds'], 'Lignes': t['rows']} for path, t in _load_timings.items()]
+    return pd.DataFrame(rows, columns=['Fichier', 'Durée (s)', 'Lignes'])
+
+
+# Tables de l'effectif de référence pour la résolution des joueurs (voir entity_resolution.py)
+ROSTER_FILES = ['PSG Standard Stats.csv', 'PSG Playing Time.csv', 'PSG Goalkeeping.csv']
+
+
+def player_registry(data_dir='data'):
+    """Référentiel des joueurs construit sur l'effectif FBref"""
+    frames = read_csv_files([os.path.join(data_dir, file) for file in ROSTER_FILES], usecols=['Player'])
+    return PlayerRegistry(pd.concat(frames, ignore_index=True)['Player'].str.strip())
+
+
+def load_fbref_data(data_dir='data', optimize=True, registry=None):
+    """Charge les données FBref du PSG pour la saison 2024-2025"""
+    standard_stats, shooting_stats, passing_stats, possession_stats, playing_time, goalkeeping_stats = read_csv_files([
+        os.path.join(data_dir, 'PSG Standard Stats.csv'),
+        os.path.join(data_dir, 'PSG Shooting.csv'),
+        os.path.join(data_dir, 'PSG Passing.csv'),
+        os.path.join(data_dir, 'PSG Possession.csv'),
+        os.path.join(data_dir, 'PSG Playing Time.csv'),
+        os.path.join(data_dir, 'PSG Goalkeeping.csv')
+    ])
+    
+    # Nettoyage des données
+    for df in [standard_stats, shooting_stats, passing_stats, possession_stats, playing_time, goalkeeping_stats]:
+        df['Player'] = df['Player'].str.strip()
+        if 'Pos' in df.columns:
+            df['Pos'] = df['Pos'].str.strip()
+            # Ajout des colonnes de position
+            pos = df['Pos'].astype('category')
+            df['Position'] = classify_positions(pos, get_player_position)
+            df['Position_Detail'] = classify_positions(pos, get_detailed_position)
+
+    # Identifiants stables des joueurs : les jointures entre tables se font sur player_id
+    registry = registry or PlayerRegistry(pd.concat([standard_stats['Player'], playing_time['Player'],
+                                                     goalkeeping_stats['Player']], ignore_index=True))
+    for df in [standard_stats, shooting_stats, passing_stats, possession_stats, playing_time, goalkeeping_stats]:
+        registry.assign(df)
+    
+    tables = {
+        'standard': standard_stats,
+        'shooting': shooting_stats,
+        'passing': passing_stats,
+        'possession': possession_stats,
+        'playing_time': playing_time,
+        'goalkeeping': goalkeeping_stats,
+        'field_players_standard': standard_stats[standard_stats['Position'] != 'GK'].copy(),
+        'field_players_shooting': shooting_stats[shooting_stats['Pos'].str.contains('GK') == False].copy(),
+        'field_players_passing': passing_stats[passing_stats['Pos'].str.contains('GK') == False].copy(),
+        'field_players_possession': possession_stats[possession_stats['Pos'].str.contains('GK') == False].copy()
+    }
+    # Optimisation après les filtres : ils s'appuient sur les chaînes d'origine
+    if optimize:
+        for df in tables.values():
+            optimize_dtypes(df)
+    return tables
+
+
+def load_ucl_data(data_dir='data', optimize=True, registry=None):
+    """Charge les données des matchs de Ligue des Champions"""
+    ucl_data = {}
+    ucl_dir = os.path.join(data_dir, 'PSG UCL Games')
+    extra_order = len(UCL_MATCH_ORDER)
+    
+    matches = []
+    for file in sorted(os.listdir(ucl_dir)):
+        if file.endswith('.csv'):
+            match_name = file.replace('PSG UCL Games - ', '').replace('.csv', '')
+            if match_name in UCL_MATCH_ORDER:
+                match_info = UCL_MATCH_ORDER[match_name]
+            else:
+                # Matchs absents du calendrier connu (archives, jeux de données de test) : ajoutés à la suite
+                extra_order += 1
+                match_info = {'phase': 'Autres matchs', 'ordre': extra_order, 'score': 'N/A'}
+            matches.append((match_name, match_info, os.path.join(ucl_dir, file)))
+    
+    frames = read_csv_files([path for _, _, path in matches], skiprows=1)
+    registry = registry or player_registry(data_dir)
+    for (match_name, match_info, _), df in zip(matches, frames):
+        df = df.rename(columns={
+            'Performance': 'Player',
+            'Gls': 'Gls',
+            'Ast': 'Ast',
+            'Sh': 'Sh',
+            'SoT': 'SoT',
+            'xG': 'xG',
+            'xAG': 'xAG',
+            'SCA': 'SCA',
+            'GCA': 'GCA',
+            'PrgP': 'PrgP',
+            'PrgC': 'PrgC',
+            'Min': 'Min'
+        })
+        # Noms des feuilles de match rapprochés de l'effectif FBref
+        registry.assign(df)
+        df['Phase'] = match_info['phase']
+        df['Ordre'] = match_info['ordre']
+        df['Score'] = match_info['score']
+        ucl_data[match_name] = optimize_dtypes(df) if optimize else df
+    
+    return ucl_data
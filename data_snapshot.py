@@ -0,0 +1,18 @@
+import hashlib
+import os
+
+
+def data_snapshot(data_dir='data'):
+    """Calcule une empreinte des fichiers de données (chemin, taille, date de modification)"""
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(data_dir):
+        # Parcours déterministe de l'arborescence
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith('.csv'):
+                continue
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            digest.update(os.path.relpath(path, data_dir).encode('utf-8'))
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode('ascii'))
+    return digest.hexdigest()
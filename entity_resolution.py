@@ -0,0 +1,134 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from player_search import fold, trigrams
+
+# ----------------------------
+# RÉSOLUTION DES JOUEURS
+# ----------------------------
+# Chaque joueur reçoit un identifiant entier stable, dérivé de son nom canonique replié :
+# il ne dépend ni de l'ordre de chargement ni du snapshot des données. Un nom est
+# rapproché de l'effectif de référence (tables FBref) dans l'ordre :
+#   1. nom replié identique (accents, casse, ponctuation ignorés)
+#   2. table d'alias (surnoms, noms complets, translittérations)
+#   3. mêmes mots dans un autre ordre ('Kang-in Lee' -> 'Lee Kang-in')
+#   4. correspondance approchée : trigrammes (Dice) ou mots tous contenus dans un seul nom
+# Un nom sans correspondance devient une nouvelle entité.
+PLAYER_ID_COLUMN = 'player_id'
+
+# Alias -> nom canonique de l'effectif
+PLAYER_ALIASES = {
+    'Gigio Donnarumma': 'Gianluigi Donnarumma',
+    'Fabián Ruiz': 'Fabián Ruiz Peña',
+    'Kang-in Lee': 'Lee Kang-in',
+    'Kvara': 'Khvicha Kvaratskhelia',
+    'Marcos Aoás Corrêa': 'Marquinhos',
+    'Vítor Machado Ferreira': 'Vitinha',
+    'Gonçalo Matias Ramos': 'Gonçalo Ramos',
+    'João Pedro Neves Filipe': 'João Neves',
+    'Nuno Alexandre Tavares Mendes': 'Nuno Mendes',
+    'Lucas François Bernard Hernández Pi': 'Lucas Hernández',
+    'Beraldo': 'Lucas Beraldo',
+    'Pacho': 'Willian Pacho'
+}
+# Similarité minimale (Dice sur les trigrammes) d'une correspondance approchée
+FUZZY_THRESHOLD = 0.8
+
+
+def stable_id(folded_name):
+    """Identifiant entier positif sur 63 bits d'un nom replié"""
+    digest = hashlib.blake2b(folded_name.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') >> 1
+
+
+def _token_key(folded_name):
+    return ' '.join(sorted(folded_name.split()))
+
+
+class PlayerRegistry:
+    """Référentiel des joueurs : noms (et variantes) -> identifiant stable"""
+
+    def __init__(self, roster_names, aliases=PLAYER_ALIASES):
+        self._names = {}
+        self._by_fold = {}
+        self._by_tokens = {}
+        for name in dict.fromkeys(roster_names):
+            if pd.isna(name):
+                continue
+            folded = fold(name)
+            if folded and folded not in self._by_fold:
+                player_id = stable_id(folded)
+                self._by_fold[folded] = player_id
+                self._by_tokens.setdefault(_token_key(folded), player_id)
+                self._names[player_id] = name
+        self._aliases = {fold(alias): fold(canonical) for alias, canonical in aliases.items()}
+        self._roster = list(self._by_fold)
+        self._roster_grams = [trigrams(folded) for folded in self._roster]
+        # Noms déjà résolus : chaque variante n'est rapprochée qu'une fois
+        self._resolved = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def _fuzzy(self, folded):
+        grams = trigrams(folded)
+        words = set(folded.split())
+        scores = np.array([
+            2 * len(grams & roster_grams) / (len(grams) + len(roster_grams))
+            for roster_grams in self._roster_grams
+        ])
+        best = np.flatnonzero(scores == scores.max()) if len(scores) else []
+        if len(best) == 1 and scores[best[0]] >= FUZZY_THRESHOLD:
+            return self._by_fold[self._roster[best[0]]]
+        # 'Fabian Ruiz' dans 'Fabián Ruiz Peña' : au moins deux mots, un seul nom candidat
+        if len(words) >= 2:
+            containing = [folded_name for folded_name in self._roster if words <= set(folded_name.split())]
+            if len(containing) == 1:
+                return self._by_fold[containing[0]]
+        return None
+
+    def _match(self, folded):
+        if folded in self._by_fold:
+            return self._by_fold[folded]
+        canonical = self._aliases.get(folded)
+        if canonical is not None:
+            return self._by_fold.get(canonical, stable_id(canonical))
+        by_tokens = self._by_tokens.get(_token_key(folded))
+        if by_tokens is not None:
+            return by_tokens
+        return self._fuzzy(folded)
+
+    def resolve(self, name):
+        """Identifiant du joueur désigné par un nom (None si le nom est vide)"""
+        if name in self._resolved:
+            return self._resolved[name]
+        folded = fold(name) if not pd.isna(name) else ''
+        if not folded:
+            player_id = None
+        else:
+            player_id = self._match(folded)
+            if player_id is None:
+                # Joueur absent de l'effectif de référence : nouvelle entité
+                player_id = stable_id(folded)
+            self._names.setdefault(player_id, name)
+        self._resolved[name] = player_id
+        return player_id
+
+    def name(self, player_id):
+        """Nom canonique d'un identifiant"""
+        return self._names.get(player_id)
+
+    def assign(self, df, column='Player'):
+        """Ajoute la colonne player_id (-1 sans nom) et remplace les variantes par le nom canonique"""
+        names = df[column].astype('category')
+        categories = list(names.cat.categories)
+        # Une résolution par nom distinct, propagée aux lignes par les codes
+        ids = [self.resolve(name) for name in categories]
+        id_by_code = np.append(np.array([-1 if i is None else i for i in ids], dtype=np.int64), -1)
+        df[PLAYER_ID_COLUMN] = id_by_code[names.cat.codes.to_numpy()]
+        canonical = {name: self.name(i) for name, i in zip(categories, ids) if i is not None and self.name(i) != name}
+        if canonical:
+            df[column] = df[column].replace(canonical)
+        return df
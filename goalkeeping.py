@@ -0,0 +1,179 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import data_loader
+from player_search import DEFAULT_CLUB
+from xg_modeling import to_numeric
+
+# ----------------------------
+# GARDIENS : PLUSIEURS SAISONS ET CHAMPIONNATS
+# ----------------------------
+# Tables FBref des gardiens de toutes les saisons disponibles, réunies en une table longue
+# (une ligne par gardien, club, saison et compétition) :
+#   - data/PSG Goalkeeping.csv pour la saison courante, data/seasons/<saison>/ pour les
+#     précédentes (même structure, voir benchmarks/synthetic_data.py)
+#   - dans chacun de ces répertoires, les exports FBref d'un championnat entier nommés
+#     « Goalkeeping - <compétition>.csv » (colonnes Squad / Comp lorsqu'elles existent)
+# Les métriques sont rangées dans une matrice gardiens × métriques, normalisée en une passe
+# vectorisée (min-max et percentile) au sein de chaque couple saison × compétition. Radar
+# et nuage de points lisent des lignes de ces matrices, sans recalcul par gardien.
+SEASONS_DIR = 'seasons'
+GOALKEEPING_FILE = 'PSG Goalkeeping.csv'
+LEAGUE_GOALKEEPING_PREFIX = 'Goalkeeping - '
+GOALKEEPER_KEYS = ['player_id', 'Player', 'Squad', 'Season', 'Comp']
+
+# Métriques du profil : libellé et sens (True si une valeur élevée est meilleure)
+PROFILE_METRICS = {
+    'Save%': ('% Arrêts', True),
+    'CS%': ('% Clean Sheets', True),
+    'GA90': ('Buts encaissés p90', False),
+    'PKsv': ('Arrêts Penalty', True)
+}
+MATRIX_METRICS = ['MP', 'Min'] + analytics.GOALKEEPER_COLUMNS
+# Préfixe pays des compétitions FBref (« fr Ligue 1 »)
+_COUNTRY_PREFIX = re.compile(r'^[a-z]{2,3}\s+')
+
+
+def goalkeeping_sources(data_dir='data', season=analytics.SEASON):
+    """Fichiers de gardiens de chaque saison : (saison, chemin, club et compétition par défaut)"""
+    seasons_dir = os.path.join(data_dir, SEASONS_DIR)
+    directories = [(season, data_dir)]
+    if os.path.isdir(seasons_dir):
+        directories += [(name, os.path.join(seasons_dir, name)) for name in sorted(os.listdir(seasons_dir))
+                        if os.path.isdir(os.path.join(seasons_dir, name))]
+    sources = []
+    for label, directory in directories:
+        if os.path.exists(os.path.join(directory, GOALKEEPING_FILE)):
+            sources.append((label, os.path.join(directory, GOALKEEPING_FILE), DEFAULT_CLUB, analytics.COMPETITION))
+        for file in sorted(os.listdir(directory)):
+            if file.startswith(LEAGUE_GOALKEEPING_PREFIX) and file.endswith('.csv'):
+                competition = file[len(LEAGUE_GOALKEEPING_PREFIX):-len('.csv')]
+                sources.append((label, os.path.join(directory, file), None, competition))
+    return sources
+
+
+def load_goalkeepers(data_dir='data', registry=None):
+    """Table longue des gardiens de toutes les saisons et compétitions disponibles"""
+    sources = goalkeeping_sources(data_dir)
+    frames = data_loader.read_csv_files([path for _, path, _, _ in sources])
+    tables = []
+    for (season, _, squad, competition), df in zip(sources, frames):
+        # Les exports de championnat répètent la ligne d'en-tête tous les 25 joueurs
+        df = df[df['Player'].notna() & (df['Player'] != 'Player')].copy()
+        df['Player'] = df['Player'].str.strip()
+        if 'Season' not in df.columns:
+            df['Season'] = season
+        if 'Squad' not in df.columns:
+            df['Squad'] = squad or DEFAULT_CLUB
+        df['Comp'] = df['Comp'].astype(str).str.replace(_COUNTRY_PREFIX, '', regex=True) if 'Comp' in df.columns \
+            else competition
+        tables.append(df)
+    columns = GOALKEEPER_KEYS[1:] + MATRIX_METRICS
+    goalkeepers = pd.concat([df.reindex(columns=columns) for df in tables], ignore_index=True) if tables \
+        else pd.DataFrame(columns=columns)
+    for col in MATRIX_METRICS:
+        # Comme analytics.goalkeeper_stats : valeurs manquantes (aucun penalty subi, ...) à 0
+        goalkeepers[col] = to_numeric(goalkeepers[col]).astype(float).fillna(0)
+    for col in ['Player', 'Squad', 'Season', 'Comp']:
+        goalkeepers[col] = goalkeepers[col].astype(str)
+    (registry or data_loader.player_registry(data_dir)).assign(goalkeepers)
+    return psg_squad_names(goalkeepers)[GOALKEEPER_KEYS + MATRIX_METRICS]
+
+
+def psg_squad_names(goalkeepers):
+    """Rattache au PSG, sous DEFAULT_CLUB, les lignes des exports de championnat de ses gardiens
+
+    Les exports de championnat écrivent le club à leur façon (« Paris S-G ») : un gardien y est
+    reconnu par son identifiant, présent la même saison dans les tables du PSG.
+    """
+    psg = goalkeepers['Squad'] == DEFAULT_CLUB
+    roster = pd.MultiIndex.from_frame(goalkeepers.loc[psg, ['player_id', 'Season']])
+    in_roster = pd.MultiIndex.from_frame(goalkeepers[['player_id', 'Season']]).isin(roster)
+    goalkeepers.loc[in_roster & ~psg, 'Squad'] = DEFAULT_CLUB
+    return goalkeepers
+
+
+class GoalkeeperMatrix:
+    """Métriques des gardiens (brutes, min-max et percentiles) en matrices gardiens × métriques"""
+
+    def __init__(self, goalkeepers, metrics=MATRIX_METRICS, profile=PROFILE_METRICS):
+        self.keys = goalkeepers[GOALKEEPER_KEYS].reset_index(drop=True)
+        self.metrics = list(metrics)
+        self.profile = dict(profile)
+        labels = self.keys['Player'] + ' (' + self.keys['Squad'] + ', ' + self.keys['Season']
+        # Compétition ajoutée aux libellés d'un même gardien, club et saison dans plusieurs tables
+        repeated = labels.duplicated(keep=False)
+        self.labels = (labels + np.where(repeated, ', ' + self.keys['Comp'], '') + ')').tolist()
+        self._rows = {label: i for i, label in enumerate(self.labels)}
+        self.values = goalkeepers[self.metrics].to_numpy(dtype=float)
+
+        # Normalisation au sein de chaque saison × compétition, toutes métriques à la fois
+        values = pd.DataFrame(self.values, columns=self.metrics)
+        groups = values.groupby([self.keys['Season'], self.keys['Comp']], sort=False)
+        low = groups.transform('min').to_numpy()
+        high = groups.transform('max').to_numpy()
+        span = high - low
+        lower_is_better = np.array([not self.profile.get(metric, ('', True))[1] for metric in self.metrics])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scaled = np.where(lower_is_better, high - self.values, self.values - low) / span * 100
+        # Métrique constante dans le groupe : valeur médiane, comme l'ancien radar
+        self.minmax = np.where(span > 0, scaled, 50.0)
+        ranks = groups.rank(pct=True).to_numpy() * 100
+        inverse = groups.rank(pct=True, ascending=False).to_numpy() * 100
+        self.percentile = np.where(lower_is_better, inverse, ranks)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def seasons(self):
+        """Saisons disponibles, de la plus récente à la plus ancienne"""
+        return sorted(self.keys['Season'].unique(), reverse=True)
+
+    def competitions(self):
+        """Compétitions disponibles"""
+        return sorted(self.keys['Comp'].unique())
+
+    def column(self, metric):
+        """Valeurs brutes d'une métrique pour tous les gardiens"""
+        return self.values[:, self.metrics.index(metric)]
+
+    def select(self, seasons=None, competition=None, squad=None, min_minutes=0):
+        """Indices des gardiens retenus par les filtres (tous si aucun filtre)"""
+        mask = self.column('Min') >= min_minutes
+        if seasons is not None:
+            mask &= self.keys['Season'].isin(seasons).to_numpy()
+        if competition is not None:
+            mask &= (self.keys['Comp'] == competition).to_numpy()
+        if squad is not None:
+            mask &= (self.keys['Squad'] == squad).to_numpy()
+        return np.flatnonzero(mask)
+
+    def rows(self, labels):
+        """Indices des gardiens désignés par leurs libellés « Joueur (Club, Saison) »"""
+        return np.array([self._rows[label] for label in labels if label in self._rows], dtype=np.int64)
+
+    def radar(self, indices, scale='minmax'):
+        """Profil normalisé (0-100) des gardiens : une ligne par gardien, une colonne par métrique du profil"""
+        matrix = self.minmax if scale == 'minmax' else self.percentile
+        columns = [self.metrics.index(metric) for metric in self.profile]
+        return pd.DataFrame(matrix[np.ix_(indices, columns)], index=[self.labels[i] for i in indices],
+                            columns=[label for label, _ in self.profile.values()])
+
+    def scatter(self, indices, x, y):
+        """Deux métriques brutes des gardiens, avec libellés, club et minutes"""
+        return pd.DataFrame({
+            'Gardien': [self.labels[i] for i in indices],
+            'Squad': self.keys['Squad'].to_numpy()[indices],
+            x: self.values[indices, self.metrics.index(x)],
+            y: self.values[indices, self.metrics.index(y)],
+            'Min': self.values[indices, self.metrics.index('Min')]
+        })
+
+
+def build_goalkeeper_matrix(goalkeepers):
+    """Matrices des gardiens de toutes les saisons et compétitions"""
+    return GoalkeeperMatrix(goalkeepers)
@@ -0,0 +1,183 @@
+import contextlib
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+import numpy as np
+
+from cache_backend import DEFAULT_CACHE_DIR
+
+# ----------------------------
+# CACHE DES IMAGES DÉCODÉES
+# ----------------------------
+# Les photos sont décodées et redimensionnées une seule fois par nœud, puis écrites dans
+# un fichier unique : pixels bruts et rendu encodé à la taille d'affichage (PNG avec
+# transparence, JPEG sinon). Chaque processus le projette en mémoire (mmap) et lit les
+# images sans copie ; le cache de pages du noyau est partagé entre les répliques au lieu
+# d'une copie par processus. st.image reçoit le rendu : déjà à la bonne taille et au bon
+# format, il est servi tel quel, sans décodage ni réencodage côté serveur. Les pixels
+# (tableaux numpy en lecture seule) servent aux traitements sur l'image.
+#
+# PSG_IMAGE_CACHE_DIR : répertoire du fichier d'images
+# PSG_IMAGE_MAX_WIDTH : largeur maximale conservée, au moins la plus grande largeur affichée
+#                       (800 px dans l'analyse individuelle) : une photo n'est jamais réduite
+#                       puis agrandie par le navigateur ; les photos de 800 px gardent leur taille
+IMAGE_CACHE_DIR = os.environ.get('PSG_IMAGE_CACHE_DIR', os.path.join(DEFAULT_CACHE_DIR, 'images'))
+IMAGE_MAX_WIDTH = int(os.environ.get('PSG_IMAGE_MAX_WIDTH', 800))
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Fichier : signature, longueur de l'en-tête JSON (offsets et forme de chaque image), données
+_MAGIC = b'PSGIMG02'
+_HEADER = struct.Struct('<8sQ')
+# Alignement des tampons dans le fichier
+_ALIGN = 64
+
+
+def directory_signature(directory):
+    """Empreinte des images d'un répertoire (nom, taille, date de modification)"""
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        stat = os.stat(os.path.join(directory, name))
+        digest.update(name.encode('utf-8'))
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode('ascii'))
+    return digest.hexdigest()
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def decode_image(path, max_width=IMAGE_MAX_WIDTH):
+    """Pixels RGB / RGBA d'une image, réduite à max_width de large (proportions conservées)"""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+        if image.width > max_width:
+            image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+        return np.asarray(image)
+
+
+def render_image(pixels):
+    """Rendu encodé des pixels : PNG s'ils ont un canal alpha, JPEG sinon (comme st.image)"""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    if pixels.shape[-1] == 4:
+        Image.fromarray(pixels).save(buffer, format='PNG')
+    else:
+        Image.fromarray(pixels).save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def write_image_cache(directory, path, max_width=IMAGE_MAX_WIDTH):
+    """Décode les images du répertoire et écrit le fichier d'images (écriture atomique)"""
+    names = sorted(name for name in os.listdir(directory) if name.lower().endswith(IMAGE_EXTENSIONS))
+    pixels = {name: decode_image(os.path.join(directory, name), max_width) for name in names}
+    renders = {name: render_image(array) for name, array in pixels.items()}
+
+    # Offsets relatifs au début de la zone de données, qui suit l'en-tête
+    index, offset = {}, 0
+    for name, array in pixels.items():
+        index[name] = {'offset': offset, 'shape': list(array.shape)}
+        offset = _aligned(offset + array.nbytes)
+        index[name].update(render_offset=offset, render_size=len(renders[name]))
+        offset = _aligned(offset + len(renders[name]))
+    header = json.dumps(index).encode('utf-8')
+    data_start = _aligned(_HEADER.size + len(header))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, len(header)))
+            f.write(header)
+            for name, array in pixels.items():
+                f.seek(data_start + index[name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+                f.seek(data_start + index[name]['render_offset'])
+                f.write(renders[name])
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+class ImageCache:
+    """Images décodées servies depuis un fichier projeté en mémoire"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_size = _HEADER.unpack_from(self._buffer)
+        if magic != _MAGIC:
+            raise ValueError(f"Fichier de cache d'images invalide : {path}")
+        self._index = json.loads(self._buffer[_HEADER.size:_HEADER.size + header_size])
+        self._data_start = _aligned(_HEADER.size + header_size)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @property
+    def nbytes(self):
+        return len(self._buffer)
+
+    def get(self, name):
+        """Pixels d'une image (tableau en lecture seule, sans copie), None si elle est absente"""
+        entry = self._index.get(name)
+        if entry is None:
+            return None
+        shape = entry['shape']
+        return np.frombuffer(self._buffer, dtype=np.uint8, count=int(np.prod(shape)),
+                             offset=self._data_start + entry['offset']).reshape(shape)
+
+    def rendered(self, name):
+        """Image encodée à la taille d'affichage (vue mémoire sans copie), None si elle est absente"""
+        entry = self._index.get(name)
+        if entry is None:
+            return None
+        start = self._data_start + entry['render_offset']
+        return memoryview(self._buffer)[start:start + entry['render_size']]
+
+
+# Caches ouverts par le processus, par fichier
+_opened = {}
+_opened_lock = threading.Lock()
+
+
+def open_image_cache(directory, signature=None, max_width=IMAGE_MAX_WIDTH, cache_dir=IMAGE_CACHE_DIR):
+    """Cache des images d'un répertoire, construit au premier appel sur le nœud puis partagé
+
+    signature : empreinte du répertoire (directory_signature) déjà calculée par l'appelant
+    """
+    signature = signature or directory_signature(directory)
+    path = os.path.join(cache_dir, f"images-{signature[:16]}-{max_width}.bin")
+    with _opened_lock:
+        if path in _opened:
+            return _opened[path]
+        if not os.path.exists(path):
+            os.makedirs(cache_dir, exist_ok=True)
+            # Un seul processus décode les images, les autres attendent le fichier
+            with open(path + '.lock', 'a') as lock:
+                try:
+                    import fcntl
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                except ImportError:
+                    pass
+                if not os.path.exists(path):
+                    write_image_cache(directory, path, max_width)
+        _opened[path] = ImageCache(path)
+        return _opened[path]
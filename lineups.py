@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from entity_resolution import PLAYER_ID_COLUMN
+from xg_modeling import to_numeric
+
+# ----------------------------
+# ASSOCIATIONS DE JOUEURS
+# ----------------------------
+# Apparitions communes et xG / xGA des duos et trios, à partir des lignes joueur × match UCL
+# (player_timeseries.PlayerTimeSeries) et du calendrier (xG / xGA de chaque match, le k-ième
+# match UCL du calendrier étant celui d'Ordre k, comme dans workload.py).
+# Les feuilles de match donnent les minutes de chaque joueur, pas ses entrées et sorties :
+# la part du match jouée ensemble est estimée par le produit des parts jouées par chacun
+# (exacte dès que l'un des deux a joué tout le match).
+# Tout passe par des produits de matrices creuses joueurs × matchs : les duos sont les
+# coefficients non nuls de A · Aᵀ, les trios ceux de (duos × matchs) · Aᵀ. Aucune
+# combinaison n'est énumérée en Python ; seules celles qui ont joué ensemble sont stockées.
+UCL_COMPETITION = 'Champions Lg'
+# Matchs communs minimaux d'un trio : seuls les duos qui l'atteignent entrent dans le calcul
+MIN_TRIO_MATCHES = 2
+# Minutes communes minimales par défaut des classements
+MIN_SHARED_MINUTES = 270
+OUTCOME_COLUMNS = ['Durée', 'xG', 'xGA']
+
+
+def match_outcomes(fixtures, rows):
+    """Durée, xG et xGA de chaque match UCL joué, indexés par Ordre"""
+    matches = fixtures[(fixtures['Comp'] == UCL_COMPETITION) & fixtures['Result'].notna()].copy()
+    matches['Date'] = pd.to_datetime(matches['Date'])
+    matches = matches.sort_values('Date', kind='stable').reset_index(drop=True)
+    outcomes = pd.DataFrame({
+        'Ordre': np.arange(1, len(matches) + 1),
+        'xG': to_numeric(matches['xG']).astype(float).fillna(0).to_numpy(),
+        'xGA': to_numeric(matches['xGA']).astype(float).fillna(0).to_numpy()
+    })
+    # Durée : minutes du joueur le plus utilisé (120 après prolongation)
+    duration = rows.groupby('Ordre')['Min'].max().astype(float)
+    outcomes.insert(1, 'Durée', outcomes['Ordre'].map(duration).to_numpy())
+    return outcomes[outcomes['Durée'] > 0].reset_index(drop=True)
+
+
+class LineupCombinations:
+    """Apparitions, minutes communes et xG / xGA des joueurs, duos et trios"""
+
+    def __init__(self, rows, outcomes, min_trio_matches=MIN_TRIO_MATCHES):
+        rows = rows[(rows['Min'] > 0) & rows['Ordre'].isin(outcomes['Ordre'])]
+        self.players = rows.drop_duplicates(PLAYER_ID_COLUMN)[[PLAYER_ID_COLUMN, 'Player']]
+        self.players = self.players.sort_values(PLAYER_ID_COLUMN).reset_index(drop=True)
+        self.outcomes = outcomes.reset_index(drop=True)
+
+        # Présence joueurs × matchs : part du match jouée (P) et apparition (A)
+        player_rows = pd.Index(self.players[PLAYER_ID_COLUMN]).get_indexer(rows[PLAYER_ID_COLUMN])
+        match_columns = pd.Index(self.outcomes['Ordre']).get_indexer(rows['Ordre'])
+        duration = self.outcomes['Durée'].to_numpy()
+        share = np.minimum(rows['Min'].to_numpy(dtype=float) / duration[match_columns], 1.0)
+        shape = (len(self.players), len(self.outcomes))
+        self.presence = sparse.csr_array((share, (player_rows, match_columns)), shape=shape)
+        self.appearances = sparse.csr_array((np.ones(len(share)), (player_rows, match_columns)), shape=shape)
+        self._outcomes = self.outcomes[OUTCOME_COLUMNS].to_numpy(dtype=float)
+
+        # Duos : coefficients non nuls au-dessus de la diagonale de A · Aᵀ
+        together = sparse.triu(self.appearances @ self.appearances.T, k=1).tocoo()
+        self._pairs = np.column_stack([together.row, together.col]).astype(np.int64)
+        self._pair_presence = self.presence[self._pairs[:, 0]] * self.presence[self._pairs[:, 1]]
+        self._pair_appearances = self.appearances[self._pairs[:, 0]] * self.appearances[self._pairs[:, 1]]
+
+        # Trios : duos réguliers × matchs, multipliés par la présence du troisième joueur (un trio
+        # ne joue pas plus de matchs ensemble que chacun de ses duos)
+        regular = np.flatnonzero(together.data >= min_trio_matches)
+        counts = (self._pair_appearances[regular] @ self.appearances.T).tocoo()
+        # Troisième joueur d'indice supérieur aux deux autres : chaque trio une seule fois
+        keep = (counts.col > self._pairs[regular[counts.row], 1]) & (counts.data >= min_trio_matches)
+        self._trio_pairs, self._trio_thirds = regular[counts.row[keep]], counts.col[keep]
+        self._trio_counts = counts.data[keep]
+        self._trio_totals = np.column_stack([
+            self._sandwich(self._pair_presence[regular], column)[counts.row[keep], counts.col[keep]]
+            for column in range(len(OUTCOME_COLUMNS))
+        ]) if len(self._trio_thirds) else np.empty((0, len(OUTCOME_COLUMNS)))
+
+    def _sandwich(self, left, column):
+        """Produit gauche · diag(durée, xG ou xGA des matchs) · Pᵀ"""
+        weighted = self.presence.multiply(self._outcomes[:, column]).tocsr()
+        return (left @ weighted.T).tocsr()
+
+    def _table(self, members, matches, totals, min_minutes, extra=None):
+        """Table des combinaisons : joueurs, matchs, minutes communes, xG / xGA et par 90 minutes"""
+        names = self.players['Player'].to_numpy()
+        table = pd.DataFrame({f'Joueur {i + 1}': names[member] for i, member in enumerate(members)})
+        for i, member in enumerate(members):
+            table[f'{PLAYER_ID_COLUMN}_{i + 1}'] = self.players[PLAYER_ID_COLUMN].to_numpy()[member]
+        table['Matchs'] = np.asarray(matches, dtype=np.int64)
+        table['Min'] = totals[:, 0]
+        table['xG'] = totals[:, 1]
+        table['xGA'] = totals[:, 2]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            per_90 = 90 / totals[:, 0]
+        table['xG/90'] = table['xG'] * per_90
+        table['xGA/90'] = table['xGA'] * per_90
+        table['Net/90'] = table['xG/90'] - table['xGA/90']
+        for column, values in (extra or {}).items():
+            table[column] = values
+        table = table[table['Min'] >= min_minutes]
+        return table.sort_values(['Net/90', 'Min'], ascending=False, ignore_index=True)
+
+    def singles(self, min_minutes=0):
+        """Joueurs : apparitions, minutes, xG / xGA sur le terrain et écart avec l'équipe hors du terrain"""
+        on = self.presence @ self._outcomes
+        off = self._outcomes.sum(axis=0) - on
+        with np.errstate(invalid='ignore', divide='ignore'):
+            off_90 = np.where(off[:, :1] > 0, off[:, 1:] * 90 / off[:, :1], np.nan)
+        extra = {'xG_hors/90': off_90[:, 0], 'xGA_hors/90': off_90[:, 1]}
+        table = self._table([np.arange(len(self.players))], self.appearances.sum(axis=1), on, min_minutes, extra)
+        table['Impact_net/90'] = table['Net/90'] - (table['xG_hors/90'] - table['xGA_hors/90'])
+        return table
+
+    def pairs(self, min_minutes=MIN_SHARED_MINUTES):
+        """Duos ayant joué ensemble : matchs communs, minutes communes estimées, xG / xGA"""
+        totals = self._pair_presence @ self._outcomes
+        return self._table(self._pairs.T, self._pair_appearances.sum(axis=1), totals, min_minutes)
+
+    def trios(self, min_minutes=MIN_SHARED_MINUTES):
+        """Trios ayant joué au moins min_trio_matches matchs ensemble : matchs communs, minutes communes estimées, xG / xGA"""
+        members = [self._pairs[self._trio_pairs, 0], self._pairs[self._trio_pairs, 1], self._trio_thirds]
+        return self._table(members, self._trio_counts, self._trio_totals, min_minutes)
+
+
+def build_lineup_combinations(fixtures, timeseries):
+    """Duos et trios de la Ligue des Champions"""
+    return LineupCombinations(timeseries.rows, match_outcomes(fixtures, timeseries.rows))
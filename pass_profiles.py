@@ -0,0 +1,152 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from entity_resolution import PLAYER_ID_COLUMN
+from xg_modeling import to_numeric
+
+# ----------------------------
+# PROFILS DE PASSE
+# ----------------------------
+# Types de passe FBref (PSG Pass Types.csv) ramenés à des vecteurs par 90 minutes, puis
+# regroupés en archétypes de passeurs par k-means. Le k-means est entièrement vectorisé
+# (distances joueurs × centres en une opération, plusieurs initialisations k-means++ à graine
+# fixe) : le même snapshot donne toujours les mêmes archétypes, calculés une fois par
+# snapshot dans le cache partagé.
+PASS_TYPES_FILE = 'PSG Pass Types.csv'
+# Types de passe et libellés
+PASS_TYPES = {
+    'Live': 'Jeu en mouvement',
+    'Dead': 'Balle arrêtée',
+    'FK': 'Coup franc',
+    'TB': 'Passe en profondeur',
+    'Sw': 'Renversement',
+    'Crs': 'Centre',
+    'TI': 'Touche',
+    'CK': 'Corner',
+    'In': 'Corner rentrant',
+    'Out': 'Corner sortant',
+    'Str': 'Corner direct'
+}
+# Types servant au regroupement : In / Out / Str détaillent les corners (CK), rares et redondants
+ARCHETYPE_FEATURES = ['Live', 'Dead', 'FK', 'TB', 'Sw', 'Crs', 'TI', 'CK']
+# Écart à la moyenne (en écarts-types) au-delà duquel un type de passe caractérise un archétype
+ARCHETYPE_THRESHOLD = 0.5
+# Temps de jeu minimal (en matchs complets) pour entrer dans le regroupement
+MIN_NINETIES = 5.0
+PASS_ARCHETYPES = 4
+KMEANS_SEED = 2024
+KMEANS_INIT = 10
+KMEANS_MAX_ITER = 100
+# Arrêt lorsque les centres se déplacent de moins de KMEANS_TOL × variance moyenne des données
+KMEANS_TOL = 1e-4
+
+
+def load_pass_types(data_dir='data', registry=None):
+    """Types de passe de l'effectif, avec identifiants des joueurs"""
+    pass_types, = data_loader.read_csv_files([os.path.join(data_dir, PASS_TYPES_FILE)])
+    pass_types = pass_types[pass_types['Player'].notna()].copy()
+    pass_types['Player'] = pass_types['Player'].str.strip()
+    pass_types['Pos'] = pass_types['Pos'].astype(str).str.strip()
+    for col in ['90s', 'Att', 'Cmp'] + list(PASS_TYPES):
+        pass_types[col] = to_numeric(pass_types[col]).astype(float).fillna(0)
+    (registry or data_loader.player_registry(data_dir)).assign(pass_types)
+    return pass_types
+
+
+def per_90_profiles(pass_types, min_nineties=MIN_NINETIES):
+    """Passes de chaque type par 90 minutes et part de chaque type dans les passes tentées"""
+    players = pass_types[pass_types['90s'] >= min_nineties].reset_index(drop=True)
+    counts = players[list(PASS_TYPES)].to_numpy(dtype=float)
+    nineties = players['90s'].to_numpy(dtype=float)[:, None]
+    attempts = players['Att'].to_numpy(dtype=float)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shares = np.where(attempts > 0, counts / attempts * 100, 0.0)
+    profiles = players[[PLAYER_ID_COLUMN, 'Player', 'Pos', '90s', 'Att']].copy()
+    profiles[[f'{col}/90' for col in PASS_TYPES]] = counts / nineties
+    profiles[[f'{col}%' for col in PASS_TYPES]] = shares
+    return profiles
+
+
+def standardize(values):
+    """Centrage-réduction par colonne (colonnes constantes à 0)"""
+    std = values.std(axis=0)
+    return (values - values.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+
+def _squared_distances(points, centers):
+    """Distances euclidiennes au carré points × centres (|x|² - 2 x·c + |c|², un produit matriciel)"""
+    distances = (points ** 2).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    return np.maximum(distances, 0)
+
+
+def kmeans(points, k, seed=KMEANS_SEED, n_init=KMEANS_INIT, max_iter=KMEANS_MAX_ITER, tol=KMEANS_TOL):
+    """K-means vectorisé (initialisations k-means++) : étiquettes, centres et inertie de la meilleure initialisation"""
+    k = min(k, len(points))
+    rng = np.random.default_rng(seed)
+    # |x|² ne change pas le centre le plus proche : seul -2 x·c + |c|² est calculé à chaque itération
+    norms = (points ** 2).sum(axis=1)
+    threshold = tol * points.var(axis=0).mean()
+    best = None
+    for _ in range(n_init):
+        # k-means++ : chaque centre tiré avec une probabilité proportionnelle à la distance au plus proche
+        centers = points[[rng.integers(len(points))]]
+        for _ in range(1, k):
+            closest = _squared_distances(points, centers).min(axis=1)
+            total = closest.sum()
+            probabilities = closest / total if total > 0 else None
+            centers = np.vstack([centers, points[rng.choice(len(points), p=probabilities)]])
+        for _ in range(max_iter):
+            labels = ((centers ** 2).sum(axis=1)[None, :] - 2 * points @ centers.T).argmin(axis=1)
+            # Centres : moyenne des points de chaque groupe (un groupe vide garde son centre)
+            sizes = np.bincount(labels, minlength=k)[:, None]
+            one_hot = np.eye(k)[labels]
+            new_centers = np.where(sizes > 0, one_hot.T @ points / np.maximum(sizes, 1), centers)
+            shift = ((new_centers - centers) ** 2).sum()
+            centers = new_centers
+            if shift <= threshold:
+                break
+        labels = ((centers ** 2).sum(axis=1)[None, :] - 2 * points @ centers.T).argmin(axis=1)
+        inertia = np.maximum(
+            norms + (centers ** 2).sum(axis=1)[labels] - 2 * (points * centers[labels]).sum(axis=1), 0).sum()
+        if best is None or inertia < best[2]:
+            best = (labels, centers, inertia)
+    return best
+
+
+def archetype_names(centers, labels=tuple(PASS_TYPES[col] for col in ARCHETYPE_FEATURES),
+                    threshold=ARCHETYPE_THRESHOLD, default='Profil équilibré'):
+    """Nom de chaque archétype : ses deux caractéristiques les plus au-dessus de la moyenne (centres centrés-réduits)"""
+    names = []
+    for center in centers:
+        top = [i for i in np.argsort(-center)[:2] if center[i] > threshold]
+        names.append(' / '.join(labels[i] for i in top) if top else default)
+    # Deux archétypes de même nom : numérotés
+    return [f"{name} ({names[:i].count(name) + 1})" if names.count(name) > 1 else name
+            for i, name in enumerate(names)]
+
+
+def build_pass_profiles(pass_types, k=PASS_ARCHETYPES, min_nineties=MIN_NINETIES):
+    """Profils de passe par 90 minutes et archétypes de passeurs : {'profiles', 'archetypes'}"""
+    profiles = per_90_profiles(pass_types, min_nineties)
+    rate_columns = [f'{col}/90' for col in PASS_TYPES]
+    feature_columns = [f'{col}/90' for col in ARCHETYPE_FEATURES]
+    if profiles.empty:
+        profiles['Archétype'] = pd.Series(dtype=str)
+        return {'profiles': profiles, 'archetypes': pd.DataFrame(columns=['Archétype', 'Joueurs'] + rate_columns)}
+
+    scores = standardize(profiles[feature_columns].to_numpy(dtype=float))
+    labels, centers, _ = kmeans(scores, k)
+    # Archétypes numérotés par taille décroissante, pour un ordre stable d'un snapshot à l'autre
+    sizes = np.bincount(labels, minlength=len(centers))
+    order = np.argsort(-sizes, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    names = archetype_names(centers[order])
+    profiles['Archétype'] = np.array(names)[rank[labels]]
+
+    archetypes = profiles.groupby('Archétype', sort=False)[rate_columns].mean().reindex(names)
+    archetypes.insert(0, 'Joueurs', sizes[order])
+    return {'profiles': profiles, 'archetypes': archetypes.rename_axis('Archétype').reset_index()}
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+from entity_resolution import PLAYER_ID_COLUMN
+from pass_profiles import archetype_names, kmeans, standardize
+from xg_modeling import to_numeric
+
+# ----------------------------
+# RÔLES DES JOUEURS
+# ----------------------------
+# Matrice joueurs × caractéristiques (tables standard, passes, possession et tirs des
+# joueurs de champ, par 90 minutes sauf les taux), centrée-réduite puis projetée sur ses
+# composantes principales (ACP par décomposition de la matrice de covariance : coût en
+# caractéristiques², pas en joueurs²). Les rôles sont les groupes d'un k-means sur cette
+# projection (pass_profiles.kmeans : distances joueurs × centres en un produit matriciel).
+# Projection, rôles et distances aux centres sont calculés une fois par snapshot, pour tous
+# les joueurs à la fois : le nombre de joueurs-saisons ne change que la taille des matrices.
+# Caractéristiques : (table FBref, colonne, libellé, ramenée à 90 minutes)
+ROLE_FEATURES = [
+    ('field_players_standard', 'npxG', 'xG hors penalty', True),
+    ('field_players_standard', 'xAG', 'xAG', True),
+    ('field_players_shooting', 'Sh', 'Tirs', True),
+    ('field_players_shooting', 'Dist', 'Distance de tir', False),
+    ('field_players_passing', 'Att', 'Passes tentées', True),
+    ('field_players_passing', 'Cmp%', 'Précision des passes', False),
+    ('field_players_passing', 'PrgDist', 'Distance progressive des passes', True),
+    ('field_players_passing', 'KP', 'Passes clés', True),
+    ('field_players_passing', 'PPA', 'Passes dans la surface', True),
+    ('field_players_passing', 'CrsPA', 'Centres dans la surface', True),
+    ('field_players_standard', 'PrgP', 'Passes progressives', True),
+    ('field_players_standard', 'PrgC', 'Conduites progressives', True),
+    ('field_players_standard', 'PrgR', 'Passes progressives reçues', True),
+    ('field_players_possession', 'Def 3rd', 'Touches tiers défensif', True),
+    ('field_players_possession', 'Att 3rd', 'Touches tiers offensif', True),
+    ('field_players_possession', 'Att Pen', 'Touches dans la surface', True),
+    ('field_players_possession', 'Succ', 'Dribbles réussis', True)
+]
+# Temps de jeu minimal (en matchs complets) pour recevoir un rôle
+MIN_NINETIES = 5.0
+ROLE_CLUSTERS = 5
+# Part de variance conservée par la projection (au moins deux composantes)
+ROLE_VARIANCE = 0.8
+
+
+def feature_matrix(fbref, min_nineties=MIN_NINETIES):
+    """Joueurs de champ retenus et leur matrice de caractéristiques (par 90 minutes sauf les taux)"""
+    base = fbref['field_players_standard'].drop_duplicates(PLAYER_ID_COLUMN)
+    base = base[to_numeric(base['90s']).astype(float) >= min_nineties]
+    players = base[[PLAYER_ID_COLUMN, 'Player', 'Pos']].reset_index(drop=True)
+    players['90s'] = to_numeric(base['90s']).astype(float).to_numpy()
+    ids = players[PLAYER_ID_COLUMN]
+
+    columns = []
+    for table, column, _, per_90 in ROLE_FEATURES:
+        values = fbref[table].drop_duplicates(PLAYER_ID_COLUMN).set_index(PLAYER_ID_COLUMN)[column]
+        values = to_numeric(values).astype(float).reindex(ids).to_numpy()
+        if per_90:
+            # Volumes du joueur rapportés à son temps de jeu de la table standard
+            values = values / players['90s'].to_numpy()
+        columns.append(values)
+    features = np.column_stack(columns) if columns else np.empty((len(players), 0))
+    # Valeur manquante (aucun tir pour la distance, ...) : moyenne de la caractéristique
+    means = np.nanmean(np.where(np.isfinite(features), features, np.nan), axis=0) if len(features) \
+        else np.zeros(features.shape[1])
+    features = np.where(np.isfinite(features), features, np.nan_to_num(means))
+    return players, features
+
+
+def principal_components(scores, variance=ROLE_VARIANCE):
+    """Projection sur les composantes principales : coordonnées, axes et part de variance de chaque axe"""
+    covariance = scores.T @ scores / max(len(scores) - 1, 1)
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    order = np.argsort(eigenvalues)[::-1]
+    eigenvalues, eigenvectors = np.clip(eigenvalues[order], 0, None), eigenvectors[:, order]
+    # Signe des axes fixé (plus forte contribution positive) : même projection d'un calcul à l'autre
+    signs = np.sign(eigenvectors[np.abs(eigenvectors).argmax(axis=0), np.arange(eigenvectors.shape[1])])
+    eigenvectors = eigenvectors * np.where(signs == 0, 1, signs)
+    explained = eigenvalues / eigenvalues.sum() if eigenvalues.sum() > 0 else eigenvalues
+    n_components = int(np.clip(np.searchsorted(np.cumsum(explained), variance) + 1, 2, len(explained)))
+    axes = eigenvectors[:, :n_components]
+    return scores @ axes, axes, explained[:n_components]
+
+
+def build_player_roles(fbref, k=ROLE_CLUSTERS, min_nineties=MIN_NINETIES):
+    """Rôles des joueurs de champ : {'roles', 'centroids', 'explained'}"""
+    players, features = feature_matrix(fbref, min_nineties)
+    labels = [label for _, _, label, _ in ROLE_FEATURES]
+    if len(players) < 2:
+        players[['Rôle', 'Second rôle', 'Archétype']] = pd.DataFrame(columns=['Rôle', 'Second rôle', 'Archétype'])
+        return {'roles': players, 'centroids': pd.DataFrame(columns=['Rôle', 'Joueurs', 'Archétype'] + labels),
+                'explained': np.array([])}
+
+    scores = standardize(features)
+    embedding, _, explained = principal_components(scores)
+    assignment, centers, _ = kmeans(embedding, k)
+
+    # Rôles numérotés par taille décroissante, nommés d'après leur profil centré-réduit
+    n_roles = len(centers)
+    sizes = np.bincount(assignment, minlength=n_roles)
+    order = np.argsort(-sizes, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(n_roles)
+    assignment, centers, sizes = rank[assignment], centers[order], sizes[order]
+    one_hot = np.eye(n_roles)[assignment]
+    profiles = one_hot.T @ scores / np.maximum(sizes, 1)[:, None]
+    names = np.array(archetype_names(profiles, labels, default='Polyvalent'))
+
+    # Distances de chaque joueur à chaque centre : rôle, second rôle et joueur type de chaque rôle
+    distances = np.sqrt(np.maximum(
+        (embedding ** 2).sum(axis=1)[:, None] - 2 * embedding @ centers.T + (centers ** 2).sum(axis=1)[None, :], 0))
+    nearest = np.argsort(distances, axis=1)
+    member_distances = np.where(one_hot > 0, distances, np.inf)
+    typical = member_distances.argmin(axis=0)
+
+    roles = players.copy()
+    roles['Rôle'] = names[assignment]
+    roles['Second rôle'] = names[nearest[:, 1]] if n_roles > 1 else names[assignment]
+    roles['Archétype'] = roles['Player'].to_numpy()[typical][assignment]
+    roles['Distance'] = distances[np.arange(len(roles)), assignment]
+    for i in range(embedding.shape[1]):
+        roles[f'CP{i + 1}'] = embedding[:, i]
+    roles[labels] = scores
+
+    centroids = pd.DataFrame(profiles, columns=labels)
+    centroids.insert(0, 'Rôle', names)
+    centroids.insert(1, 'Joueurs', sizes)
+    centroids.insert(2, 'Archétype', roles['Player'].to_numpy()[typical])
+    return {'roles': roles, 'centroids': centroids, 'explained': explained}
@@ -0,0 +1,140 @@
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# RECHERCHE DE JOUEURS
+# ----------------------------
+# Index construit une fois au chargement des données sur les noms, clubs et nations :
+#   - préfixes : jetons repliés (sans accents, minuscules) triés, recherchés par bisection
+#   - trigrammes : index inversé des trigrammes des noms, pour les fautes de frappe
+# Une requête combine les deux et renvoie les joueurs classés par pertinence.
+DEFAULT_CLUB = 'Paris Saint-Germain'
+DEFAULT_LIMIT = 20
+# Similarité minimale (coefficient de Dice sur les trigrammes) d'un résultat approché
+MIN_SIMILARITY = 0.3
+
+# Lettres que la décomposition Unicode ne sépare pas de leur accent
+_FOLD_TABLE = str.maketrans({'ø': 'o', 'ł': 'l', 'đ': 'd', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe', 'ı': 'i', 'ð': 'd', 'þ': 'th'})
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+
+
+def fold(text):
+    """Forme de recherche d'un texte : sans accents, en minuscules, ponctuation remplacée par des espaces"""
+    text = unicodedata.normalize('NFKD', str(text).casefold().translate(_FOLD_TABLE))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _SEPARATORS.sub(' ', text).strip()
+
+
+def trigrams(folded):
+    """Trigrammes d'un texte replié, chaque mot étant encadré d'espaces"""
+    grams = set()
+    for word in folded.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class PlayerSearchIndex:
+    """Index de recherche des joueurs (nom, club, nation)"""
+
+    def __init__(self, players):
+        # players : DataFrame Player / Club / Nation, un joueur par ligne
+        self.players = players.reset_index(drop=True)
+        self.names = self.players['Player'].tolist()
+        self._ids = {name: i for i, name in enumerate(self.names)}
+        self._folded_names = np.array([fold(name) for name in self.names], dtype=object)
+        # Noms repliés triés : les noms commençant par la requête forment une tranche contiguë
+        name_order = np.argsort(self._folded_names, kind='stable')
+        self._sorted_names = self._folded_names[name_order].tolist()
+        self._sorted_name_players = name_order.astype(np.int32)
+
+        # Paires (jeton, joueur) triées par jeton : un préfixe correspond à une tranche contiguë
+        pairs = sorted(
+            (token, i)
+            for i, row in enumerate(self.players[['Player', 'Club', 'Nation']].itertuples(index=False))
+            for token in set(fold(' '.join(str(v) for v in row if pd.notna(v))).split())
+        )
+        self._tokens = [token for token, _ in pairs]
+        self._token_players = np.array([i for _, i in pairs], dtype=np.int32)
+
+        # Index inversé trigramme -> joueurs, sur les noms uniquement
+        postings = {}
+        self._gram_counts = np.zeros(len(self.names), dtype=np.int32)
+        for i, name in enumerate(self._folded_names):
+            grams = trigrams(name)
+            self._gram_counts[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _prefix_slice(keys, prefix):
+        start = bisect.bisect_left(keys, prefix)
+        return slice(start, bisect.bisect_left(keys, prefix + '\uffff', lo=start))
+
+    def _prefix_players(self, token):
+        return np.unique(self._token_players[self._prefix_slice(self._tokens, token)])
+
+    def scores(self, query):
+        """Score de pertinence de chaque joueur pour une requête (0 si aucune correspondance)"""
+        folded = fold(query)
+        scores = np.zeros(len(self.names))
+        if not folded:
+            return scores
+
+        # Part des mots de la requête qui commencent un mot du nom, du club ou de la nation
+        words = folded.split()
+        for word in words:
+            scores[self._prefix_players(word)] += 1.0 / len(words)
+
+        # Similarité approchée des noms : coefficient de Dice sur les trigrammes
+        query_grams = trigrams(folded)
+        hits = [self._postings[gram] for gram in query_grams if gram in self._postings]
+        if hits:
+            shared = np.bincount(np.concatenate(hits), minlength=len(self.names))
+            dice = 2 * shared / (len(query_grams) + self._gram_counts)
+            scores += np.where(dice >= MIN_SIMILARITY, dice, 0)
+
+        # Nom commençant par la requête (+1), ou identique (+2), en tête du classement
+        starts = self._sorted_name_players[self._prefix_slice(self._sorted_names, folded)]
+        scores[starts] += 1
+        scores[starts[self._folded_names[starts] == folded]] += 1
+        return scores
+
+    def search(self, query, limit=DEFAULT_LIMIT, among=None):
+        """Joueurs correspondant à la requête, du plus au moins pertinent (restreints à among si fourni)"""
+        scores = self.scores(query)
+        if among is not None:
+            allowed = np.zeros(len(self.names), dtype=bool)
+            allowed[[self._ids[name] for name in among if name in self._ids]] = True
+            scores[~allowed] = 0
+        matches = np.flatnonzero(scores)
+        # Tri par score décroissant puis par nom
+        order = np.lexsort((self._folded_names[matches], -scores[matches]))
+        return [self.names[i] for i in matches[order][:limit]]
+
+
+def players_table(fbref_data, ucl_data=None):
+    """Tous les joueurs de la base (tables FBref et matchs UCL), un par ligne, avec club et nation"""
+    tables = [df for name, df in fbref_data.items() if not name.startswith('field_players_')]
+    tables += list((ucl_data or {}).values())
+    # Squad n'existe que dans les exports multi-clubs ; à défaut le joueur est rattaché au PSG
+    players = pd.concat([df.reindex(columns=['Player', 'Squad', 'Nation']).astype(object) for df in tables],
+                        ignore_index=True)
+    players = players.dropna(subset=['Player'])
+    players['Squad'] = players['Squad'].fillna(DEFAULT_CLUB)
+    # Première nation renseignée pour chaque joueur
+    players = players.sort_values('Nation', na_position='last').drop_duplicates('Player')
+    return players.rename(columns={'Squad': 'Club'}).sort_values('Player', ignore_index=True)
+
+
+def build_search_index(fbref_data, ucl_data=None):
+    """Index de recherche de tous les joueurs de la base"""
+    return PlayerSearchIndex(players_table(fbref_data, ucl_data))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from entity_resolution import PLAYER_ID_COLUMN
+
+# ----------------------------
+# SÉRIES JOUEUR × MATCH
+# ----------------------------
+# Toutes les lignes joueur × match UCL réunies au chargement dans un seul tableau trié par
+# (player_id, Ordre) : l'historique d'un joueur occupe une plage contiguë de lignes, dont
+# les bornes sont calculées une fois. Lire la carrière d'un joueur est une seule tranche
+# (iloc[début:fin]), sans parcourir les feuilles de match.
+PLAYER_MATCH_COLUMNS = ['Match', 'Ordre', 'Phase', 'Score']
+PLAYER_MATCH_STATS = ['Min', 'Gls', 'Ast', 'xG', 'xAG', 'Sh', 'SoT', 'SCA', 'GCA', 'Tkl', 'Int', 'Blocks', 'Clr']
+
+
+class PlayerTimeSeries:
+    """Historique match par match des joueurs, contigu et trié par joueur puis par match"""
+
+    def __init__(self, ucl_data, stats=PLAYER_MATCH_STATS):
+        self.stats = list(stats)
+        columns = [PLAYER_ID_COLUMN, 'Player'] + PLAYER_MATCH_COLUMNS + self.stats
+        if ucl_data:
+            frames = []
+            for match_name, match_data in ucl_data.items():
+                # Statistiques absentes d'une feuille de match comptées à 0
+                frame = match_data.reindex(columns=[PLAYER_ID_COLUMN, 'Player', 'Ordre', 'Phase', 'Score'] + self.stats,
+                                           fill_value=0)
+                frames.append(frame.assign(Match=match_name))
+            rows = pd.concat(frames, ignore_index=True)
+            rows = rows[rows[PLAYER_ID_COLUMN] >= 0]
+            for column in ('Phase', 'Score'):
+                rows[column] = rows[column].astype(str)
+            # Une ligne par joueur et par match (la première si la feuille en compte plusieurs)
+            rows = rows.drop_duplicates([PLAYER_ID_COLUMN, 'Ordre'])
+            rows = rows.sort_values([PLAYER_ID_COLUMN, 'Ordre'], kind='stable')[columns]
+        else:
+            rows = pd.DataFrame(columns=columns)
+        self.rows = rows.reset_index(drop=True)
+
+        # Bornes [début, fin) de chaque joueur dans le tableau trié
+        ids = self.rows[PLAYER_ID_COLUMN].to_numpy(dtype=np.int64)
+        player_ids, starts = np.unique(ids, return_index=True)
+        stops = np.append(starts[1:], len(ids))
+        self._bounds = dict(zip(player_ids.tolist(), zip(starts.tolist(), stops.tolist())))
+        self.players = self.rows.drop_duplicates(PLAYER_ID_COLUMN)[[PLAYER_ID_COLUMN, 'Player']].reset_index(drop=True)
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def __contains__(self, player_id):
+        return player_id in self._bounds
+
+    def history(self, player_id):
+        """Matchs du joueur dans l'ordre de la compétition (tableau vide s'il n'a pas joué)"""
+        start, stop = self._bounds.get(player_id, (0, 0))
+        return self.rows.iloc[start:stop]
+
+    def career(self, player_id):
+        """Totaux du joueur sur l'ensemble de ses matchs"""
+        history = self.history(player_id)
+        totals = history[self.stats].sum()
+        totals['Matchs'] = len(history)
+        return totals
+
+
+def build_player_timeseries(ucl_data):
+    """Séries joueur × match de la Ligue des Champions"""
+    return PlayerTimeSeries(ucl_data)
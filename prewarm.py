@@ -0,0 +1,242 @@
+"""Préchauffage au déploiement du PSG Data Center
+
+Remplit le cache partagé du nœud (voir cache_backend.py) avant l'arrivée du premier
+utilisateur : tables FBref et UCL, cube d'agrégats de l'équipe, matrices des gardiens,
+duos et trios UCL, profils de passe, chaînes de création d'occasions, rôles des joueurs,
+charges de l'effectif, significativité de la finition et simulation de la
+saison par défaut, puis parcourt chaque option des listes déroulantes, boutons radio
+et sélections multiples des vues render_* / analyze_* (chaque joueur, match, position
+et gardien) en exécutant la vue sans navigateur. Les deux étapes sont réparties sur
+un pool de processus.
+
+Le cache st.cache_data et les figures sont propres à chaque processus Streamlit :
+seul le cache partagé (PSG_CACHE_BACKEND=disk ou redis) survit au préchauffage. Les
+agrégats par option (profil d'un joueur, joueurs d'une position, totaux d'un match)
+y sont donc rangés un par option : le parcours les remplit et vérifie en outre que
+chaque chemin s'exécute sans erreur.
+
+Exemples :
+    PSG_CACHE_BACKEND=disk python prewarm.py --workers 4
+    PSG_CACHE_BACKEND=disk python prewarm.py --views render_player_analysis --output prewarm.json
+"""
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Les avertissements « missing ScriptRunContext » de Streamlit noient le rapport
+os.environ.setdefault('STREAMLIT_LOGGER_LEVEL', 'error')
+
+import numpy as np
+
+import cache_backend
+import shared_data
+import simulation
+from data_snapshot import data_snapshot
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, 'app.py')
+
+# Vues qui ne sont que des points d'entrée vers d'autres vues (ou le panneau d'administration)
+EXCLUDED_VIEWS = {'render_home', 'render_performance_panel'}
+
+# Sélecteurs parcourus option par option
+WIDGET_KINDS = ('selectbox', 'radio', 'multiselect')
+
+# Script exécuté par AppTest pour une vue isolée
+VIEW_SCRIPT = """
+import sys
+sys.path.insert(0, {repo_dir!r})
+import app
+app.DATA_DIR = {data_dir!r}
+app.{view}()
+"""
+
+
+# ----------------------------
+# CACHE PARTAGÉ
+# ----------------------------
+def _warm_entry(name, data_dir):
+    """Calcule une entrée du cache partagé et renvoie sa durée"""
+    start = time.perf_counter()
+    if name == 'fbref':
+        shared_data.fbref_data(data_dir)
+    elif name == 'ucl':
+        shared_data.ucl_data(data_dir)
+    elif name == 'team_cube':
+        shared_data.team_cube(data_dir)
+    elif name == 'goalkeeper_matrix':
+        shared_data.goalkeeper_matrix(data_dir)
+    elif name == 'player_timeseries':
+        shared_data.player_timeseries_store(data_dir)
+    elif name == 'ucl_progression':
+        shared_data.ucl_progression(data_dir)
+    elif name == 'player_roles':
+        shared_data.player_roles_table(data_dir)
+    elif name == 'shot_creation':
+        shared_data.shot_creation_chains(data_dir)
+    elif name == 'pass_profiles':
+        shared_data.pass_profiles_table(data_dir)
+    elif name == 'lineup_combinations':
+        shared_data.lineup_combinations(data_dir)
+    elif name == 'squad_workload':
+        shared_data.squad_workload(data_dir)
+    elif name == 'xg_significance':
+        shared_data.xg_significance(data_dir)
+    elif name == 'season_simulation':
+        shared_data.season_simulation(data_dir, simulation.DEFAULT_SIMULATIONS, simulation.DEFAULT_SEED)
+    return {'entry': name, 'seconds': time.perf_counter() - start}
+
+
+def warm_shared_cache(data_dir, executor):
+    """Remplit le cache partagé : tables d'abord, puis agrégats qui en dépendent"""
+    report = []
+    for stage in (['fbref', 'ucl'], ['team_cube', 'goalkeeper_matrix', 'player_timeseries', 'ucl_progression', 'lineup_combinations', 'pass_profiles', 'shot_creation', 'player_roles', 'squad_workload', 'xg_significance', 'season_simulation']):
+        report.extend(executor.map(_warm_entry, stage, [data_dir] * len(stage)))
+    return report
+
+
+# ----------------------------
+# PARCOURS DES OPTIONS
+# ----------------------------
+def discover_views(app_path=APP_PATH):
+    """Liste les fonctions render_* et analyze_* définies dans app.py"""
+    with open(app_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return [
+        node.name for node in tree.body
+        if isinstance(node, ast.FunctionDef)
+        and node.name.startswith(('render_', 'analyze_'))
+        and node.name not in EXCLUDED_VIEWS
+    ]
+
+
+def _app_test(view, data_dir):
+    from streamlit.testing.v1 import AppTest
+
+    script = VIEW_SCRIPT.format(repo_dir=REPO_DIR, data_dir=data_dir, view=view)
+    return AppTest.from_string(script, default_timeout=600)
+
+
+def _select(widget, kind, option):
+    """Choisit une option d'un sélecteur (seule, pour une sélection multiple)"""
+    if kind == 'selectbox':
+        return widget.select_index(option)
+    if kind == 'multiselect':
+        return widget.set_value([widget.options[option]])
+    return widget.set_value(widget.options[option])
+
+
+def list_options(view, data_dir):
+    """Sélecteurs d'une vue : (vue, type, indice du sélecteur, libellé, nombre d'options)"""
+    app_test = _app_test(view, data_dir)
+    app_test.run()
+    if app_test.exception:
+        return [], f"{view} : {app_test.exception[0].value}"
+    return [
+        (view, kind, i, widget.label, len(widget.options))
+        for kind in WIDGET_KINDS
+        for i, widget in enumerate(getattr(app_test, kind))
+    ], None
+
+
+def walk_options(view, data_dir, kind, widget_index, option_indices):
+    """Exécute la vue pour chaque option d'un sélecteur, les autres gardant leur valeur par défaut"""
+    app_test = _app_test(view, data_dir)
+    app_test.run()
+    results = []
+    for option in option_indices:
+        start = time.perf_counter()
+        widget = getattr(app_test, kind)[widget_index]
+        label = widget.label
+        value = widget.options[option]
+        _select(widget, kind, option).run()
+        results.append({
+            'view': view,
+            'widget': f"{kind} {label}",
+            'option': str(value),
+            'seconds': time.perf_counter() - start,
+            'error': str(app_test.exception[0].value) if app_test.exception else None
+        })
+    return results
+
+
+def walk_views(views, data_dir, executor, workers):
+    """Parcourt toutes les options de toutes les vues, réparties entre les processus"""
+    discovered = list(executor.map(list_options, views, [data_dir] * len(views)))
+    errors = [error for _, error in discovered if error]
+
+    tasks = []
+    for selectors, _ in discovered:
+        for view, kind, widget_index, _, n_options in selectors:
+            # Chaque processus reçoit une tranche d'options d'un même sélecteur
+            n_chunks = max(1, min(workers, n_options))
+            for chunk in np.array_split(np.arange(n_options), n_chunks):
+                tasks.append((view, kind, widget_index, chunk.tolist()))
+
+    results = []
+    for chunk_results in executor.map(walk_options, [t[0] for t in tasks], [data_dir] * len(tasks),
+                                      [t[1] for t in tasks], [t[2] for t in tasks], [t[3] for t in tasks]):
+        results.extend(chunk_results)
+    return results, errors
+
+
+def prewarm(data_dir, workers=None, views=None, walk=True, log=print):
+    """Préchauffe le cache partagé puis parcourt les options des vues"""
+    workers = workers or os.cpu_count() or 1
+    if isinstance(cache_backend.get_backend(), cache_backend.NullBackend):
+        log("Attention : PSG_CACHE_BACKEND=none, aucun résultat ne sera conservé après le préchauffage.")
+
+    report = {'snapshot': data_snapshot(data_dir), 'workers': workers, 'shared': [], 'options': [], 'errors': []}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        report['shared'] = warm_shared_cache(data_dir, executor)
+        for entry in report['shared']:
+            log(f"  cache partagé {entry['entry']:<20} {entry['seconds']:8.3f} s")
+
+        if walk:
+            report['options'], report['errors'] = walk_views(views or discover_views(), data_dir, executor, workers)
+            report['errors'] += [f"{r['view']} / {r['widget']} = {r['option']} : {r['error']}"
+                                 for r in report['options'] if r['error']]
+            log(f"  {len(report['options'])} options parcourues")
+
+    report['seconds'] = time.perf_counter() - start
+    for error in report['errors']:
+        log(f"  ERREUR {error}")
+    log(f"Préchauffage terminé en {report['seconds']:.1f} s")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Préchauffage du cache du PSG Data Center")
+    parser.add_argument('--data-dir', default=os.environ.get('PSG_DATA_DIR', 'data'),
+                        help="Répertoire des données (défaut : PSG_DATA_DIR ou data)")
+    parser.add_argument('--workers', type=int, help="Nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument('--views', nargs='+', help="Vues à parcourir (défaut : toutes)")
+    parser.add_argument('--no-walk', action='store_true', help="Ne remplir que le cache partagé")
+    parser.add_argument('--output', help="Fichier JSON où écrire le rapport")
+    parser.add_argument('--strict', action='store_true',
+                        help="Code de retour non nul si une vue ou une option lève une exception")
+    args = parser.parse_args(argv)
+
+    data_dir = os.path.abspath(args.data_dir)
+    # Les vues lisent styles.css et les photos relativement au dépôt
+    os.chdir(REPO_DIR)
+    report = prewarm(data_dir, workers=args.workers, views=args.views, walk=not args.no_walk)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Rapport écrit dans {args.output}")
+    return 1 if args.strict and report['errors'] else 0
+
+
+if __name__ == '__main__':
+    # AppTest exécute les vues sous le nom __main__ dans les processus du pool : les tâches
+    # doivent être référencées par le nom du module pour rester sérialisables
+    import prewarm
+
+    sys.exit(prewarm.main())
@@ -0,0 +1,133 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# PROGRESSION EN LIGUE DES CHAMPIONS
+# ----------------------------
+# Totaux de l'équipe par match, cumuls depuis le premier match et moyennes glissantes
+# sur les ROLLING_WINDOW derniers matchs. La série est calculée d'un bloc (cumsum /
+# rolling) puis prolongée match par match : seuls les nouveaux matchs sont totalisés, et
+# chacun coûte O(1) (cumul courant et somme de la fenêtre mis à jour), sans recalcul ni
+# comparaison des matchs précédents. Avant l'ajout, seul le dernier match connu est
+# retotalisé et comparé à la dernière ligne de la série. Un snapshot sans nouveau match
+# (correction d'une feuille de match) ou dont le dernier match connu a changé relance le
+# calcul complet ; la correction d'un match plus ancien publiée avec un nouveau match ne
+# l'est pas. Seule la publication du tableau (frame) reste proportionnelle au nombre de matchs.
+PROGRESSION_STATS = ['Gls', 'Ast', 'xG', 'xAG', 'Sh', 'SoT', 'SCA', 'GCA']
+ROLLING_WINDOW = 3
+CUMULATIVE_SUFFIX = '_cumul'
+ROLLING_SUFFIX = '_glissant'
+
+
+def match_order(ucl_data):
+    """Noms des matchs dans l'ordre de la compétition"""
+    return sorted(ucl_data, key=lambda name: ucl_data[name]['Ordre'].iloc[0])
+
+
+def match_totals(ucl_data, stats=PROGRESSION_STATS, matches=None):
+    """Totaux de l'équipe par match (Match, Phase, Score, statistiques), dans l'ordre de la compétition
+
+    matches : noms des seuls matchs à totaliser (par défaut tous)
+    """
+    names = match_order(ucl_data) if matches is None else list(matches)
+    if not names:
+        return pd.DataFrame(columns=['Match', 'Phase', 'Score'] + list(stats))
+    matches = pd.concat([ucl_data[name][['Phase', 'Score'] + list(stats)] for name in names],
+                        keys=names, names=['Match', None])
+    # Sommes en 64 bits : les colonnes chargées sont réduites à int8 / int16
+    matches = matches.astype({stat: np.float64 if pd.api.types.is_float_dtype(matches[stat]) else np.int64
+                              for stat in stats})
+    grouped = matches.groupby(level='Match', sort=False, observed=True)
+    totals = grouped[list(stats)].sum()
+    totals.insert(0, 'Score', grouped['Score'].first().astype(str))
+    totals.insert(0, 'Phase', grouped['Phase'].first().astype(str))
+    return totals.reset_index()
+
+
+class ProgressionSeries:
+    """Séries par match, cumulées et glissantes, prolongeables match par match"""
+
+    def __init__(self, stats=PROGRESSION_STATS, window=ROLLING_WINDOW):
+        self.stats = list(stats)
+        self.window = window
+        self._reset()
+
+    def _reset(self):
+        self._rows = []
+        self._cumulative = np.zeros(len(self.stats))
+        self._recent = deque(maxlen=self.window)
+        self._window_sum = np.zeros(len(self.stats))
+        self._frame = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _row(self, match, phase, score, totals):
+        row = {'Match': match, 'Phase': phase, 'Score': score}
+        row.update(zip(self.stats, totals))
+        row.update(zip([stat + CUMULATIVE_SUFFIX for stat in self.stats], self._cumulative))
+        row.update(zip([stat + ROLLING_SUFFIX for stat in self.stats], self._window_sum / len(self._recent)))
+        return row
+
+    def append(self, match, phase, score, values):
+        """Ajoute un match : cumul et fenêtre glissante mis à jour en temps constant"""
+        totals = list(values)
+        values = np.asarray(totals, dtype=float)
+        if len(self._recent) == self.window:
+            self._window_sum -= self._recent[0]
+        self._recent.append(values)
+        self._window_sum += values
+        self._cumulative += values
+        self._rows.append(self._row(match, phase, score, totals))
+        self._frame = None
+
+    def rebuild(self, totals):
+        """Recalcule toute la série d'un bloc (cumsum et rolling vectorisés)"""
+        self._reset()
+        values = totals[self.stats].astype(float)
+        frame = pd.concat([
+            totals[['Match', 'Phase', 'Score']].reset_index(drop=True),
+            totals[self.stats].reset_index(drop=True),
+            values.cumsum().add_suffix(CUMULATIVE_SUFFIX).reset_index(drop=True),
+            values.rolling(self.window, min_periods=1).mean().add_suffix(ROLLING_SUFFIX).reset_index(drop=True)
+        ], axis=1)
+        self._rows = frame.to_dict('records')
+        # État repris de la fin de la série pour les ajouts suivants
+        array = values.to_numpy()
+        if len(array):
+            self._cumulative = array.sum(axis=0)
+            self._recent.extend(array[-self.window:])
+            self._window_sum = array[-self.window:].sum(axis=0)
+        self._frame = frame
+
+    def update(self, ucl_data):
+        """Aligne la série sur les matchs : seuls les nouveaux matchs sont totalisés et ajoutés"""
+        order = match_order(ucl_data)
+        known = len(self._rows)
+        if known == 0 or known >= len(order) or order[known - 1] != self._rows[-1]['Match'] \
+                or not self._same_last(match_totals(ucl_data, self.stats, order[known - 1:known])):
+            self.rebuild(match_totals(ucl_data, self.stats))
+        else:
+            for row in match_totals(ucl_data, self.stats, order[known:]).itertuples(index=False):
+                self.append(row.Match, row.Phase, row.Score, [getattr(row, stat) for stat in self.stats])
+        return self
+
+    def _same_last(self, totals):
+        """Dernier match connu inchangé (une ligne comparée, quel que soit le nombre de matchs)"""
+        last = self._rows[-1]
+        row = totals.iloc[0]
+        return (
+            (row['Phase'], row['Score']) == (last['Phase'], last['Score'])
+            and np.allclose([last[stat] for stat in self.stats], row[self.stats].to_numpy(dtype=float),
+                            rtol=0, atol=1e-9, equal_nan=True)
+        )
+
+    def frame(self):
+        """Séries sous forme de tableau : une ligne par match"""
+        if self._frame is None:
+            columns = ['Match', 'Phase', 'Score'] + self.stats + \
+                [stat + CUMULATIVE_SUFFIX for stat in self.stats] + [stat + ROLLING_SUFFIX for stat in self.stats]
+            self._frame = pd.DataFrame(self._rows, columns=columns)
+        return self._frame
@@ -0,0 +1,218 @@
+import os
+import threading
+
+import pandas as pd
+
+import analytics
+import cache_backend
+import data_loader
+import goalkeeping
+import lineups
+import pass_profiles
+import player_roles
+import player_timeseries
+import progression
+import shot_creation
+import simulation
+import workload
+import xg_modeling
+from data_snapshot import data_snapshot
+
+# ----------------------------
+# ENTRÉES DU CACHE PARTAGÉ
+# ----------------------------
+# Points d'entrée communs à app.py, api.py et prewarm.py : les mêmes noms et paramètres
+# produisent les mêmes clés dans le cache du nœud (voir cache_backend.py).
+
+
+def fbref_data(data_dir, snapshot=None):
+    """Tables FBref partagées"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute('fbref', snapshot, lambda: data_loader.load_fbref_data(data_dir),
+                                        source=data_dir)
+
+
+def ucl_data(data_dir, snapshot=None):
+    """Matchs de Ligue des Champions partagés"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute('ucl', snapshot, lambda: data_loader.load_ucl_data(data_dir),
+                                        source=data_dir)
+
+
+def player_registry(data_dir, snapshot=None):
+    """Référentiel des joueurs (identifiants stables) partagé"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute('player_registry', snapshot, lambda: data_loader.player_registry(data_dir),
+                                        source=data_dir)
+
+
+def player_timeseries_store(data_dir, snapshot=None, ucl=None):
+    """Séries joueur × match de la Ligue des Champions partagées"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute(
+        'player_timeseries', snapshot,
+        lambda: player_timeseries.build_player_timeseries(ucl or ucl_data(data_dir, snapshot)),
+        source=data_dir
+    )
+
+
+def lineup_combinations(data_dir, snapshot=None, ucl=None):
+    """Duos et trios de la Ligue des Champions (apparitions communes, xG / xGA) partagés"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute(
+        'lineup_combinations', snapshot,
+        lambda: lineups.build_lineup_combinations(
+            simulation.load_fixtures(os.path.join(data_dir, 'PSG Scores & Fixtures.csv')),
+            player_timeseries_store(data_dir, snapshot, ucl=ucl)
+        ),
+        source=data_dir
+    )
+
+
+def pass_profiles_table(data_dir, snapshot=None):
+    """Profils de passe par 90 minutes et archétypes de passeurs partagés"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute(
+        'pass_profiles', snapshot,
+        lambda: pass_profiles.build_pass_profiles(
+            pass_profiles.load_pass_types(data_dir, registry=player_registry(data_dir, snapshot))
+        ),
+        source=data_dir
+    )
+
+
+def shot_creation_chains(data_dir, snapshot=None):
+    """Chaînes de création d'occasions (blocs SCA / GCA par action) partagées"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute(
+        'shot_creation', snapshot,
+        lambda: shot_creation.build_shot_creation(
+            shot_creation.load_shot_creation(data_dir, registry=player_registry(data_dir, snapshot))
+        ),
+        source=data_dir
+    )
+
+
+def player_roles_table(data_dir, snapshot=None, fbref=None):
+    """Projection (ACP) et rôles des joueurs de champ partagés"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute(
+        'player_roles', snapshot, lambda: player_roles.build_player_roles(fbref or fbref_data(data_dir, snapshot)),
+        source=data_dir
+    )
+
+
+def goalkeeper_matrix(data_dir, snapshot=None):
+    """Matrices des gardiens de toutes les saisons et compétitions partagées"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute(
+        'goalkeeper_matrix', snapshot,
+        lambda: goalkeeping.build_goalkeeper_matrix(
+            goalkeeping.load_goalkeepers(data_dir, registry=player_registry(data_dir, snapshot))
+        ),
+        source=data_dir
+    )
+
+
+def team_cube(data_dir, snapshot=None, fbref=None):
+    """Cube d'agrégats de l'équipe (métrique × regroupement × saison × compétition) partagé"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute(
+        'team_cube', snapshot, lambda: analytics.build_team_cube(fbref or fbref_data(data_dir, snapshot)),
+        source=data_dir
+    )
+
+
+def player_profile(data_dir, player_id, snapshot=None, fbref=None):
+    """Lignes FBref d'un joueur de champ partagées (une entrée par joueur)"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute(
+        'player_profile', snapshot,
+        lambda: analytics.player_profile(fbref or fbref_data(data_dir, snapshot), player_id),
+        int(player_id), source=data_dir
+    )
+
+
+def position_players(data_dir, position, column='Position', snapshot=None, fbref=None):
+    """Joueurs d'une position partagés (une entrée par position et colonne de filtre)"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute(
+        'position_players', snapshot,
+        lambda: analytics.position_players(fbref or fbref_data(data_dir, snapshot), position, column),
+        position, column, source=data_dir
+    )
+
+
+def ucl_match_summary(data_dir, match, snapshot=None, ucl=None):
+    """Score, phase et totaux d'un match UCL partagés (une entrée par match)"""
+    snapshot = snapshot or data_snapshot(data_dir)
+    return cache_backend.get_or_compute(
+        'ucl_match_summary', snapshot,
+        lambda: analytics.ucl_match_summary(ucl or ucl_data(data_dir, snapshot), match),
+        match, source=data_dir
+    )
+
+
+# Séries de progression UCL du processus, par répertoire de données : un nouveau snapshot
+# qui ajoute des matchs prolonge la série au lieu de la recalculer
+_progressions = {}
+_progressions_lock = threading.Lock()
+
+
+def ucl_progression(data_dir, snapshot=None, ucl=None):
+    """Séries de progression UCL (par match, cumulées, glissantes) partagées"""
+    snapshot = snapshot or data_snapshot(data_dir)
+
+    def compute():
+        with _progressions_lock:
+            series = _progressions.setdefault(data_dir, progression.ProgressionSeries())
+            return series.update(ucl or ucl_data(data_dir, snapshot)).frame().copy()
+
+    return cache_backend.get_or_compute('ucl_progression', snapshot, compute, source=data_dir)
+
+
+# Charges de l'effectif du processus, par répertoire de données : prolongées à l'arrivée de nouveaux matchs
+_workloads = {}
+_workloads_lock = threading.Lock()
+
+
+def squad_workload(data_dir, snapshot=None, fbref=None, ucl=None):
+    """Charges glissantes, congestion du calendrier et impact sur / hors du terrain partagés"""
+    snapshot = snapshot or data_snapshot(data_dir)
+
+    def compute():
+        fixtures = simulation.load_fixtures(os.path.join(data_dir, 'PSG Scores & Fixtures.csv'))
+        playing_time = (fbref or fbref_data(data_dir, snapshot))['playing_time']
+        timeseries = player_timeseries_store(data_dir, snapshot, ucl=ucl)
+        matches, players, minutes, observed, spread = workload.workload_inputs(fixtures, playing_time, timeseries)
+        with _workloads_lock:
+            series = _workloads.setdefault(data_dir, workload.WorkloadSeries())
+            frames = series.update(matches, players, minutes, observed).frames(spread)
+            result = {name: frame.copy() for name, frame in frames.items()}
+        result['impact'] = workload.on_off_impact(playing_time, matches)
+        return result
+
+    return cache_backend.get_or_compute('squad_workload', snapshot, compute, source=data_dir)
+
+
+def xg_significance(data_dir, snapshot=None, fbref=None, ucl=None):
+    """Significativité de la finition (G - xG) de l'effectif partagée"""
+    snapshot = snapshot or data_snapshot(data_dir)
+
+    def compute():
+        standard = (fbref or fbref_data(data_dir, snapshot))['field_players_standard']
+        player_matches = pd.concat((ucl or ucl_data(data_dir, snapshot)).values(), ignore_index=True)
+        return xg_modeling.build_significance_table(standard, player_matches)
+
+    return cache_backend.get_or_compute('xg_significance', snapshot, compute, source=data_dir)
+
+
+def season_simulation(data_dir, n_sims, seed, workers=1, snapshot=None):
+    """Simulation Monte Carlo de la saison partagée (le nombre de processus fait partie de la clé)"""
+    snapshot = snapshot or data_snapshot(data_dir)
+
+    def compute():
+        fixtures = simulation.load_fixtures(os.path.join(data_dir, 'PSG Scores & Fixtures.csv'))
+        return simulation.simulate_season(fixtures, n_sims=n_sims, seed=seed, workers=workers)
+
+    return cache_backend.get_or_compute('season_simulation', snapshot, compute, n_sims, seed, workers, source=data_dir)
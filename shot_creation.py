@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+
+import data_loader
+from entity_resolution import PLAYER_ID_COLUMN
+from xg_modeling import to_numeric
+
+# ----------------------------
+# CHAÎNES DE CRÉATION D'OCCASIONS
+# ----------------------------
+# Goal and Shot Creation.csv répète les mêmes en-têtes (PassLive, PassDead, TO, Sh, Fld, Def)
+# pour le bloc SCA (actions menant à un tir) puis pour le bloc GCA (actions menant à un but) :
+# pandas les renommerait PassLive / PassLive.1. L'en-tête est lu tel quel et chaque colonne
+# d'action est nommée d'après le bloc qui la précède (SCA_PassLive, GCA_PassLive, ...).
+# Les deux blocs sont ensuite réunis en une table longue joueur × bloc × action, avec totaux,
+# valeurs par 90 minutes, part de chaque action dans le bloc du joueur et rang de chaque
+# joueur pour chaque bloc × action, calculés d'un bloc (melt, groupby).
+SHOT_CREATION_FILE = 'Goal and Shot Creation.csv'
+CREATION_BLOCKS = {
+    'SCA': "Actions menant à un tir",
+    'GCA': "Actions menant à un but"
+}
+# Actions créatrices et libellés
+CREATION_ACTIONS = {
+    'PassLive': 'Passe en jeu',
+    'PassDead': 'Balle arrêtée',
+    'TO': 'Dribble',
+    'Sh': 'Tir',
+    'Fld': 'Faute subie',
+    'Def': 'Action défensive'
+}
+# Temps de jeu minimal (en matchs complets) pour entrer dans les classements
+MIN_NINETIES = 5.0
+CREATION_COLUMNS = [PLAYER_ID_COLUMN, 'Player', 'Pos', '90s', 'Bloc', 'Action', 'Total', 'Par90', 'Part', 'Rang']
+
+
+def creation_headers(header):
+    """En-têtes explicites : colonnes d'action préfixées par leur bloc (SCA_PassLive, GCA_PassLive, ...)"""
+    columns, block = [], None
+    for name in header:
+        name = str(name).strip()
+        if name in CREATION_BLOCKS:
+            block = name
+        columns.append(f'{block}_{name}' if block and name in CREATION_ACTIONS else name)
+    return columns
+
+
+def load_shot_creation(data_dir='data', registry=None):
+    """Table large de création d'occasions, en-têtes des deux blocs distingués"""
+    raw, = data_loader.read_csv_files([os.path.join(data_dir, SHOT_CREATION_FILE)], header=None, dtype=str)
+    creation = raw.iloc[1:].set_axis(creation_headers(raw.iloc[0]), axis=1).reset_index(drop=True)
+    creation = creation[creation['Player'].notna()].copy()
+    creation['Player'] = creation['Player'].str.strip()
+    creation['Pos'] = creation['Pos'].str.strip()
+    numeric = ['90s'] + [f'{block}_{action}' for block in CREATION_BLOCKS for action in CREATION_ACTIONS] \
+        + list(CREATION_BLOCKS)
+    for col in numeric:
+        creation[col] = to_numeric(creation[col]).astype(float).fillna(0)
+    (registry or data_loader.player_registry(data_dir)).assign(creation)
+    return creation
+
+
+def creation_chains(creation, min_nineties=MIN_NINETIES):
+    """Table longue joueur × bloc × action : total, par 90 minutes, part dans le bloc et rang par 90 minutes"""
+    action_columns = [f'{block}_{action}' for block in CREATION_BLOCKS for action in CREATION_ACTIONS]
+    chains = creation.melt(id_vars=[PLAYER_ID_COLUMN, 'Player', 'Pos', '90s'], value_vars=action_columns,
+                           var_name='Colonne', value_name='Total')
+    chains[['Bloc', 'Action']] = chains['Colonne'].str.split('_', n=1, expand=True)
+    nineties = chains['90s'].to_numpy(dtype=float)
+    totals = chains['Total'].to_numpy(dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        chains['Par90'] = np.where(nineties > 0, totals / nineties, 0.0)
+    block_totals = chains.groupby([PLAYER_ID_COLUMN, 'Bloc'])['Total'].transform('sum').to_numpy(dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        chains['Part'] = np.where(block_totals > 0, totals / block_totals * 100, 0.0)
+    # Rang par 90 minutes parmi les joueurs ayant assez joué (les autres restent sans rang)
+    eligible = chains['90s'] >= min_nineties
+    chains['Rang'] = chains['Par90'].where(eligible).groupby([chains['Bloc'], chains['Action']]).rank(
+        ascending=False, method='first')
+    return chains[CREATION_COLUMNS]
+
+
+def creation_mix(chains, block, value='Part'):
+    """Répartition des actions d'un bloc : une ligne par joueur, une colonne par action"""
+    mix = chains[chains['Bloc'] == block].pivot_table(index=[PLAYER_ID_COLUMN, 'Player', 'Pos', '90s'],
+                                                      columns='Action', values=value, sort=False)
+    return mix.reindex(columns=list(CREATION_ACTIONS)).reset_index().rename_axis(columns=None)
+
+
+def leaderboard(chains, block, action, n=10):
+    """Meilleurs joueurs d'un bloc × action par 90 minutes (joueurs ayant assez joué)"""
+    board = chains[(chains['Bloc'] == block) & (chains['Action'] == action) & (chains['Rang'] <= n)]
+    return board.sort_values('Rang', ignore_index=True)
+
+
+def build_shot_creation(creation, min_nineties=MIN_NINETIES):
+    """Chaînes de création d'occasions de l'effectif : {'chains'}"""
+    return {'chains': creation_chains(creation, min_nineties)}
@@ -0,0 +1,182 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# ----------------------------
+# SIMULATION MONTE CARLO
+# ----------------------------
+LEAGUE_COMPETITION = 'Ligue 1'
+UCL_COMPETITION = 'Champions Lg'
+LEAGUE_PHASE_ROUND = 'League phase'
+
+# Ordre du tableau final de Ligue des Champions et libellés affichés
+KNOCKOUT_ROUNDS = ['Knockout phase play-offs', 'Round of 16', 'Quarter-finals', 'Semi-finals', 'Final']
+ROUND_LABELS = {
+    'League phase': 'Phase de Ligue',
+    'Knockout phase play-offs': 'Barrages',
+    'Round of 16': '1/8 de finale',
+    'Quarter-finals': '1/4 de finale',
+    'Semi-finals': '1/2 finale',
+    'Final': 'Finale'
+}
+
+# Points de la 8e et de la 24e place de la phase de ligue 2024-2025
+DIRECT_QUALIFICATION_POINTS = 16
+PLAYOFF_QUALIFICATION_POINTS = 11
+
+# Part des 90 minutes jouée en prolongation
+EXTRA_TIME_SHARE = 30 / 90
+
+# Nombres de simulations proposés dans l'application, valeur et graine par défaut
+SIMULATION_COUNTS = [10_000, 100_000, 500_000, 1_000_000]
+DEFAULT_SIMULATIONS = 100_000
+DEFAULT_SEED = 2025
+
+# Écart de buts maximal représenté (la masse au-delà est négligeable pour des xG réalistes)
+MAX_GOAL_DIFFERENCE = 20
+
+
+def parse_goals(series):
+    """Extrait le nombre de buts d'un score FBref ('1 (4)' -> 1)"""
+    return pd.to_numeric(series.astype(str).str.extract(r'^\s*(\d+)')[0], errors='coerce')
+
+
+def load_fixtures(path='data/PSG Scores & Fixtures.csv'):
+    """Charge le calendrier et les xG/xGA par match"""
+    fixtures = pd.read_csv(path)
+    fixtures['Date'] = pd.to_datetime(fixtures['Date'])
+    fixtures['GF'] = parse_goals(fixtures['GF'])
+    fixtures['GA'] = parse_goals(fixtures['GA'])
+    for col in ['xG', 'xGA']:
+        fixtures[col] = pd.to_numeric(fixtures[col], errors='coerce')
+        # Les matchs sans xG (finale de coupe) reçoivent la moyenne de la compétition
+        fixtures[col] = fixtures[col].fillna(fixtures.groupby('Comp')[col].transform('mean'))
+        fixtures[col] = fixtures[col].fillna(fixtures[col].mean())
+    return fixtures.sort_values('Date').reset_index(drop=True)
+
+
+def goal_difference_cdf(xg, xga, max_goals=MAX_GOAL_DIFFERENCE):
+    """Fonction de répartition de la différence de buts (Skellam = Poisson(xG) - Poisson(xGA)) par match"""
+    support = np.arange(-max_goals, max_goals + 1)
+    return stats.skellam.cdf(support[:, None], np.asarray(xg)[None, :], np.asarray(xga)[None, :])
+
+
+def _simulate_chunk(cdf, n_sims, seed_seq):
+    """Tire la différence de buts de n_sims saisons complètes par inversion de la loi (matchs en lignes)"""
+    rng = np.random.default_rng(seed_seq)
+    n_matches = cdf.shape[1]
+    # Tirages match par match dans un même tampon : la mémoire ne croît pas avec matchs × simulations
+    # (même suite de nombres qu'un tirage (n_matches, n_sims) d'un bloc)
+    uniforms = np.empty(n_sims)
+    diff = np.empty((n_matches, n_sims), dtype=np.int8)
+    for j in range(n_matches):
+        rng.random(out=uniforms)
+        diff[j] = np.searchsorted(cdf[:, j], uniforms) - MAX_GOAL_DIFFERENCE
+    return diff
+
+
+def simulate_goal_differences(xg, xga, n_sims, seed=None, workers=1):
+    """Simule la différence de buts de tous les matchs, éventuellement sur un pool de processus"""
+    cdf = goal_difference_cdf(xg, xga)
+    workers = max(1, int(workers or 1))
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+
+    if workers == 1:
+        return _simulate_chunk(cdf, n_sims, seeds[0])
+
+    sizes = [len(part) for part in np.array_split(np.arange(n_sims), workers)]
+    with ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1)) as executor:
+        chunks = list(executor.map(_simulate_chunk, [cdf] * workers, sizes, seeds))
+    return np.concatenate(chunks, axis=1)
+
+
+def resolve_tie(diff, xg, xga, rng):
+    """Détermine le vainqueur d'une confrontation (aller-retour ou match unique) pour chaque simulation"""
+    aggregate = diff.sum(axis=0, dtype=np.int16)
+    n_sims = aggregate.shape[0]
+
+    # Prolongation sur le dernier match puis tirs au but à pile ou face
+    extra_for = rng.poisson(xg[-1] * EXTRA_TIME_SHARE, size=n_sims)
+    extra_against = rng.poisson(xga[-1] * EXTRA_TIME_SHARE, size=n_sims)
+    penalties = rng.random(n_sims) < 0.5
+    extra_wins = (extra_for > extra_against) | ((extra_for == extra_against) & penalties)
+    return (aggregate > 0) | ((aggregate == 0) & extra_wins)
+
+
+def summarize_distribution(values, label):
+    """Transforme un tableau de simulations en distribution de probabilités"""
+    counts = pd.Series(values).value_counts(normalize=True).sort_index()
+    return pd.DataFrame({label: counts.index.astype(int), 'Probabilité': counts.values})
+
+
+def simulate_season(fixtures, n_sims=100_000, seed=None, workers=1,
+                    direct_points=DIRECT_QUALIFICATION_POINTS, playoff_points=PLAYOFF_QUALIFICATION_POINTS):
+    """Rejoue la saison à partir des xG : points en championnat, parcours et titre en Ligue des Champions"""
+    start = time.perf_counter()
+    xg = fixtures['xG'].to_numpy(dtype=float)
+    xga = fixtures['xGA'].to_numpy(dtype=float)
+    diff = simulate_goal_differences(xg, xga, n_sims, seed=seed, workers=workers)
+    wins = diff > 0
+    draws = diff == 0
+
+    # Probabilités victoire / nul / défaite par match
+    matches = fixtures[['Date', 'Comp', 'Round', 'Venue', 'Opponent', 'GF', 'GA', 'xG', 'xGA']].copy()
+    matches['P(V)'] = wins.mean(axis=1)
+    matches['P(N)'] = draws.mean(axis=1)
+    matches['P(D)'] = 1 - matches['P(V)'] - matches['P(N)']
+
+    def competition_points(mask):
+        return 3 * wins[mask].sum(axis=0) + draws[mask].sum(axis=0)
+
+    # Championnat
+    league_mask = (fixtures['Comp'] == LEAGUE_COMPETITION).to_numpy()
+    league_points = competition_points(league_mask)
+    actual_diff = (fixtures['GF'] - fixtures['GA'])[league_mask]
+    actual_league_points = int(3 * (actual_diff > 0).sum() + (actual_diff == 0).sum())
+
+    # Ligue des Champions : phase de ligue puis tableau final
+    ucl_mask = (fixtures['Comp'] == UCL_COMPETITION).to_numpy()
+    rounds = fixtures['Round'].to_numpy()
+    league_phase_mask = ucl_mask & (rounds == LEAGUE_PHASE_ROUND)
+    league_phase_points = competition_points(league_phase_mask)
+
+    direct = league_phase_points >= direct_points
+    alive = direct | (league_phase_points >= playoff_points)
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(workers + 1)[-1])
+    reach = [(ROUND_LABELS[LEAGUE_PHASE_ROUND], 1.0, float(alive.mean()))]
+
+    for round_name in KNOCKOUT_ROUNDS:
+        round_mask = ucl_mask & (rounds == round_name)
+        if not round_mask.any():
+            continue
+        won = resolve_tie(diff[round_mask], xg[round_mask], xga[round_mask], rng)
+        if round_name == 'Knockout phase play-offs':
+            # Les 8 premiers sont exemptés de barrages
+            reached = alive & ~direct
+            alive = direct | (reached & won)
+        else:
+            reached = alive
+            alive = alive & won
+        reach.append((ROUND_LABELS[round_name], float(reached.mean()), float(alive.mean())))
+
+    elapsed = time.perf_counter() - start
+    return {
+        'n_sims': n_sims,
+        'seed': seed,
+        'workers': workers,
+        'elapsed': elapsed,
+        'sims_per_second': n_sims / elapsed if elapsed > 0 else float('inf'),
+        'matches': matches,
+        'league_points': summarize_distribution(league_points, 'Points'),
+        'league_mean_points': float(league_points.mean()),
+        'league_actual_points': actual_league_points,
+        'league_p_at_least_actual': float((league_points >= actual_league_points).mean()),
+        'ucl_league_phase_points': summarize_distribution(league_phase_points, 'Points'),
+        'ucl_rounds': pd.DataFrame(reach, columns=['Tour', 'P(atteindre)', 'P(qualifié)']),
+        'ucl_title_odds': float(alive.mean()),
+        'ucl_direct_qualification': float(direct.mean())
+    }
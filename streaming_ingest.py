@@ -0,0 +1,258 @@
+"""Ingestion en flux des archives CSV volumineuses vers un magasin Parquet
+
+Les CSV sont lus par blocs de --chunksize lignes ; chaque bloc reçoit le même
+nettoyage que les chargeurs de data_loader.py (noms et postes sans espaces,
+classification des postes) ainsi que la conversion des colonnes numériques
+(séparateurs de milliers, #ERROR!), puis est écrit comme un groupe de lignes du
+fichier Parquet de la table. La mémoire maximale dépend de la taille des blocs et
+non de celle des fichiers.
+
+Le schéma de chaque table est fixé par un premier passage sur l'ensemble de ses
+fichiers, bloc par bloc : il porte l'union de leurs colonnes (un match UCL dont la
+feuille a une colonne de plus ne la perd pas), et une colonne est numérique si toutes
+ses valeurs renseignées,
+dans tout le fichier, s'y convertissent. Sinon elle reste en texte, valeurs intactes
+(scores de tirs au but « 1 (4) », ...). Le schéma ne dépend donc pas de --chunksize et
+aucune valeur n'est remplacée par une valeur manquante.
+
+Exemples :
+    python streaming_ingest.py --data-dir data --store /srv/psg_store
+    python streaming_ingest.py --data-dir /mnt/archives --store /srv/psg_store --chunksize 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_loader import classify_positions, get_detailed_position, get_player_position
+
+DEFAULT_CHUNKSIZE = 100_000
+UCL_DIR_NAME = 'PSG UCL Games'
+UCL_TABLE = 'ucl_matches'
+# Colonnes ajoutées à chaque match UCL (voir ingest_ucl_matches)
+UCL_EXTRA_FIELDS = [pa.field('Match', pa.large_string()), pa.field('Phase', pa.large_string()),
+                    pa.field('Ordre', pa.int64()), pa.field('Score', pa.large_string())]
+# Valeurs FBref traitées comme manquantes lors de la conversion numérique
+INVALID_NUMBERS = ['#ERROR!', '']
+
+
+def table_name(file_name):
+    """Nom de table dérivé du nom de fichier ('PSG Standard Stats.csv' -> 'psg_standard_stats')"""
+    stem = os.path.splitext(file_name)[0]
+    return ''.join(c if c.isalnum() else '_' for c in stem.lower()).strip('_')
+
+
+def _to_number(series):
+    text = series.astype('string').str.strip().str.replace(',', '', regex=False)
+    return pd.to_numeric(text.mask(text.isin(INVALID_NUMBERS)), errors='coerce')
+
+
+def _numeric_status(chunk):
+    """Colonnes ayant des valeurs renseignées et colonnes dont une valeur renseignée n'est pas numérique"""
+    present_columns, failed_columns = set(), set()
+    for col in chunk.columns:
+        if col in ('Player', 'Pos'):
+            continue
+        values = chunk[col]
+        present = values.notna() & ~values.astype('string').str.strip().isin(INVALID_NUMBERS)
+        if present.any():
+            present_columns.add(col)
+            if not _to_number(values)[present].notna().all():
+                failed_columns.add(col)
+    return present_columns, failed_columns
+
+
+def infer_columns(paths, chunksize=DEFAULT_CHUNKSIZE, skiprows=None):
+    """Union ordonnée des colonnes des fichiers et colonnes numériques dans tous leurs blocs"""
+    columns, present_columns, failed_columns = [], set(), set()
+    for path in paths:
+        for chunk in pd.read_csv(path, chunksize=chunksize, skiprows=skiprows, dtype=str, keep_default_na=True):
+            columns += [col for col in chunk.columns if col not in columns]
+            present, failed = _numeric_status(chunk)
+            present_columns |= present
+            failed_columns |= failed
+    return columns, [col for col in columns if col in present_columns and col not in failed_columns]
+
+
+def infer_numeric_columns(paths, chunksize=DEFAULT_CHUNKSIZE, skiprows=None):
+    """Colonnes dont toutes les valeurs renseignées, dans tous les blocs des fichiers, sont numériques"""
+    return infer_columns(paths, chunksize=chunksize, skiprows=skiprows)[1]
+
+
+def table_schema(columns, numeric_columns, extra_fields=()):
+    """Schéma Arrow d'une table : colonnes des CSV, colonnes ajoutées au nettoyage puis colonnes constantes"""
+    names = list(columns) + (['Position', 'Position_Detail'] if 'Pos' in columns else [])
+    return pa.schema([pa.field(name, pa.float64() if name in numeric_columns else pa.large_string()) for name in names]
+                     + list(extra_fields))
+
+
+def clean_chunk(chunk, numeric_columns):
+    """Nettoyage d'un bloc, identique à celui des chargeurs"""
+    if 'Player' in chunk.columns:
+        chunk['Player'] = chunk['Player'].str.strip()
+    if 'Pos' in chunk.columns:
+        chunk['Pos'] = chunk['Pos'].str.strip()
+        pos = chunk['Pos'].astype('category')
+        # Stockés en chaînes : Parquet les encode par dictionnaire, relus en catégories
+        chunk['Position'] = classify_positions(pos, get_player_position).astype(str)
+        chunk['Position_Detail'] = classify_positions(pos, get_detailed_position).astype(str)
+    for col in numeric_columns:
+        if col not in chunk.columns:
+            continue
+        chunk[col] = _to_number(chunk[col]).astype('float64')
+    return chunk
+
+
+def iter_clean_chunks(path, chunksize=DEFAULT_CHUNKSIZE, skiprows=None, numeric_columns=None, extra=None):
+    """Générateur de blocs nettoyés d'un CSV (colonnes numériques déduites de tout le fichier par défaut)"""
+    if numeric_columns is None:
+        numeric_columns = infer_numeric_columns([path], chunksize=chunksize, skiprows=skiprows)
+    reader = pd.read_csv(path, chunksize=chunksize, skiprows=skiprows, dtype=str, keep_default_na=True)
+    for chunk in reader:
+        chunk = clean_chunk(chunk, numeric_columns)
+        if extra:
+            chunk = chunk.assign(**extra)
+        yield chunk
+
+
+class TableWriter:
+    """Écrit les blocs d'une table dans un fichier Parquet
+
+    Le schéma est celui passé à la construction (voir table_schema) ou, à défaut, celui du
+    premier bloc. Un bloc portant une colonne hors du schéma lève une ValueError plutôt que
+    de perdre ses valeurs ; les colonnes absentes d'un bloc sont écrites comme manquantes.
+    """
+
+    def __init__(self, path, schema=None):
+        self.path = path
+        self.schema = schema
+        self.rows = 0
+        self.chunks = 0
+        self._writer = None
+        self._tmp_path = path + '.tmp'
+
+    def write(self, chunk):
+        if self.schema is None:
+            self.schema = pa.Table.from_pandas(chunk, preserve_index=False).schema.remove_metadata()
+        unexpected = [col for col in chunk.columns if col not in self.schema.names]
+        if unexpected:
+            raise ValueError(f"{self.path} : colonnes absentes du schéma de la table : {', '.join(map(str, unexpected))}")
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp_path, self.schema)
+        chunk = chunk.reindex(columns=self.schema.names)
+        table = pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+        self._writer.write_table(table.replace_schema_metadata(None))
+        self.rows += len(chunk)
+        self.chunks += 1
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            # Remplacement atomique : les lecteurs ne voient jamais une table partielle
+            os.replace(self._tmp_path, self.path)
+        return {'path': self.path, 'rows': self.rows, 'chunks': self.chunks}
+
+    def abort(self):
+        """Abandon après une erreur : le fichier temporaire est supprimé, la table précédente conservée"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        return False
+
+
+def ingest_csv(path, store_dir, table=None, chunksize=DEFAULT_CHUNKSIZE, skiprows=None):
+    """Ingère un CSV bloc par bloc dans la table Parquet correspondante"""
+    columns, numeric_columns = infer_columns([path], chunksize=chunksize, skiprows=skiprows)
+    with TableWriter(os.path.join(store_dir, f"{table or table_name(os.path.basename(path))}.parquet"),
+                     table_schema(columns, numeric_columns)) as writer:
+        for chunk in iter_clean_chunks(path, chunksize=chunksize, skiprows=skiprows, numeric_columns=numeric_columns):
+            writer.write(chunk)
+        return writer.close()
+
+
+def ingest_ucl_matches(ucl_dir, store_dir, chunksize=DEFAULT_CHUNKSIZE):
+    """Ingère tous les matchs UCL dans une seule table (en-tête sur deux lignes, colonne Match ajoutée)"""
+    from data_loader import UCL_MATCH_ORDER
+
+    files = sorted(file for file in os.listdir(ucl_dir) if file.endswith('.csv'))
+    # Union des colonnes de tous les matchs et colonnes numériques communes : un même schéma pour
+    # toute la table, sans perdre une colonne absente du premier fichier
+    columns, numeric_columns = infer_columns([os.path.join(ucl_dir, file) for file in files],
+                                             chunksize=chunksize, skiprows=1)
+    schema = table_schema(columns, numeric_columns, UCL_EXTRA_FIELDS)
+    extra_order = len(UCL_MATCH_ORDER)
+    with TableWriter(os.path.join(store_dir, f"{UCL_TABLE}.parquet"), schema) as writer:
+        for file in files:
+            match_name = file.replace('PSG UCL Games - ', '').replace('.csv', '')
+            if match_name in UCL_MATCH_ORDER:
+                match_info = UCL_MATCH_ORDER[match_name]
+            else:
+                extra_order += 1
+                match_info = {'phase': 'Autres matchs', 'ordre': extra_order, 'score': 'N/A'}
+            extra = {'Match': match_name, 'Phase': match_info['phase'], 'Ordre': match_info['ordre'],
+                     'Score': match_info['score']}
+            for chunk in iter_clean_chunks(os.path.join(ucl_dir, file), chunksize=chunksize, skiprows=1,
+                                           numeric_columns=numeric_columns, extra=extra):
+                writer.write(chunk)
+        return writer.close()
+
+
+def ingest_directory(data_dir, store_dir, chunksize=DEFAULT_CHUNKSIZE, log=print):
+    """Ingère tous les CSV d'un répertoire de données (matchs UCL inclus)"""
+    results = []
+    for file in sorted(os.listdir(data_dir)):
+        if file.endswith('.csv'):
+            start = time.perf_counter()
+            result = ingest_csv(os.path.join(data_dir, file), store_dir, chunksize=chunksize)
+            results.append(result)
+            log(f"  {os.path.basename(result['path']):<40} {result['rows']:>10} lignes  "
+                f"{result['chunks']:>5} blocs  {time.perf_counter() - start:7.2f} s")
+
+    ucl_dir = os.path.join(data_dir, UCL_DIR_NAME)
+    if os.path.isdir(ucl_dir):
+        start = time.perf_counter()
+        result = ingest_ucl_matches(ucl_dir, store_dir, chunksize=chunksize)
+        results.append(result)
+        log(f"  {os.path.basename(result['path']):<40} {result['rows']:>10} lignes  "
+            f"{result['chunks']:>5} blocs  {time.perf_counter() - start:7.2f} s")
+    return results
+
+
+def read_table(store_dir, table, columns=None):
+    """Relit une table du magasin (colonnes texte répétées en catégories)"""
+    path = os.path.join(store_dir, f"{table}.parquet")
+    text_columns = [name for name in ('Nation', 'Pos', 'Position', 'Position_Detail', 'Match', 'Phase', 'Score')
+                    if name in pq.read_schema(path).names and (columns is None or name in columns)]
+    return pq.read_table(path, columns=columns, read_dictionary=text_columns).to_pandas()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestion en flux des CSV vers un magasin Parquet")
+    parser.add_argument('--data-dir', default='data', help="Répertoire des CSV (défaut : data)")
+    parser.add_argument('--store', required=True, help="Répertoire du magasin Parquet")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"Lignes par bloc (défaut : {DEFAULT_CHUNKSIZE})")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = ingest_directory(args.data_dir, args.store, chunksize=args.chunksize)
+    print(f"{len(results)} tables, {sum(r['rows'] for r in results)} lignes en {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,261 @@
+import functools
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+from pandas.io.formats.style import Styler
+
+# ----------------------------
+# TÉLÉMÉTRIE DES VUES
+# ----------------------------
+# Nombre de mesures conservées dans le tampon circulaire (toutes sessions confondues)
+RING_SIZE = int(os.environ.get('PSG_TELEMETRY_RING_SIZE', '5000'))
+
+_state = {'enabled': os.environ.get('PSG_TELEMETRY', '0') == '1', 'installed': False}
+_buffer = deque(maxlen=RING_SIZE)
+# Totaux cumulés depuis le démarrage du processus, par (nom, type) : ils ne baissent jamais,
+# contrairement aux agrégats du tampon dont les plus anciennes mesures sont évincées
+_totals = {}
+_totals_lock = threading.Lock()
+TOTAL_COLUMNS = ['calls', 'total_s', 'cache_hits', 'cache_misses', 'rows', 'bytes', 'errors']
+_local = threading.local()
+_run_ids = itertools.count(1)
+
+
+def is_enabled():
+    """Indique si la télémétrie est active"""
+    return _state['enabled']
+
+
+def set_enabled(enabled, st_module=None):
+    """Active ou désactive la télémétrie (installe au besoin la mesure des octets envoyés)"""
+    _state['enabled'] = bool(enabled)
+    if enabled and st_module is not None:
+        install(st_module)
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def count_rows(result):
+    """Nombre de lignes d'un résultat (DataFrame, dictionnaire de DataFrames, ...)"""
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(count_rows(value) for value in result.values())
+    return 0
+
+
+@contextmanager
+def span(name, kind='view'):
+    """Mesure un bloc : durée, succès du cache, lignes traitées et octets envoyés"""
+    record = {
+        'run_id': getattr(_local, 'run_id', None),
+        'name': name,
+        'kind': kind,
+        'start': time.time(),
+        'duration_s': 0.0,
+        'cache': None,
+        'rows': 0,
+        'bytes': 0,
+        'error': None
+    }
+    stack = _stack()
+    stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record['error'] = type(e).__name__
+        raise
+    finally:
+        record['duration_s'] = time.perf_counter() - start
+        stack.pop()
+        # Les octets envoyés par une vue imbriquée remontent aussi à la vue parente
+        if stack:
+            stack[-1]['bytes'] += record['bytes']
+        _buffer.append(record)
+        _accumulate(record)
+
+
+def _accumulate(record):
+    """Ajoute une mesure terminée aux totaux cumulés"""
+    with _totals_lock:
+        totals = _totals.setdefault((record['name'], record['kind']), dict.fromkeys(TOTAL_COLUMNS, 0))
+        totals['calls'] += 1
+        totals['total_s'] += record['duration_s']
+        totals['cache_hits'] += record['cache'] == 'hit'
+        totals['cache_misses'] += record['cache'] == 'miss'
+        totals['rows'] += record['rows']
+        totals['bytes'] += record['bytes']
+        totals['errors'] += record['error'] is not None
+
+
+def instrument(name=None, kind='view'):
+    """Décorateur de mesure d'une vue ou d'un chargeur (sans effet lorsque la télémétrie est inactive)"""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state['enabled']:
+                return func(*args, **kwargs)
+            with span(label, kind) as record:
+                result = func(*args, **kwargs)
+                record['rows'] += count_rows(result)
+                if kind == 'loader' and record['cache'] is None:
+                    # Le corps mis en cache n'a pas été exécuté : résultat servi par st.cache_data
+                    record['cache'] = 'hit'
+                return result
+        return wrapper
+    return decorator
+
+
+def cache_miss(func):
+    """Marque la mesure en cours comme défaut de cache (à placer sous @st.cache_data)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _state['enabled']:
+            stack = _stack()
+            if stack:
+                stack[-1]['cache'] = 'miss'
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def record_bytes(size):
+    """Ajoute des octets envoyés au navigateur à la mesure en cours"""
+    stack = _stack()
+    if stack:
+        stack[-1]['bytes'] += size
+
+
+@contextmanager
+def rerun(name='rerun'):
+    """Regroupe les mesures d'une exécution complète du script Streamlit"""
+    if not _state['enabled']:
+        yield None
+        return
+    _local.run_id = next(_run_ids)
+    try:
+        with span(name, kind='rerun') as record:
+            yield record
+    finally:
+        _local.run_id = None
+
+
+def install(st_module):
+    """Enveloppe st.plotly_chart et st.dataframe pour mesurer la taille des éléments envoyés"""
+    if _state['installed']:
+        return
+    _state['installed'] = True
+    plotly_chart, dataframe = st_module.plotly_chart, st_module.dataframe
+
+    @functools.wraps(plotly_chart)
+    def measured_plotly_chart(figure_or_data, *args, **kwargs):
+        if _state['enabled'] and _stack():
+            record_bytes(len(figure_or_data.to_json()) if hasattr(figure_or_data, 'to_json') else 0)
+        return plotly_chart(figure_or_data, *args, **kwargs)
+
+    @functools.wraps(dataframe)
+    def measured_dataframe(data=None, *args, **kwargs):
+        # Un Styler est envoyé avec son DataFrame sous-jacent
+        frame = data.data if isinstance(data, Styler) else data
+        if _state['enabled'] and _stack() and isinstance(frame, pd.DataFrame):
+            record_bytes(int(frame.memory_usage(deep=True).sum()))
+            _stack()[-1]['rows'] += len(frame)
+        return dataframe(data, *args, **kwargs)
+
+    st_module.plotly_chart = measured_plotly_chart
+    st_module.dataframe = measured_dataframe
+
+
+# ----------------------------
+# CONSULTATION ET EXPORT
+# ----------------------------
+def records():
+    """Copie des mesures du tampon sous forme de DataFrame"""
+    return pd.DataFrame(list(_buffer), columns=['run_id', 'name', 'kind', 'start', 'duration_s',
+                                                'cache', 'rows', 'bytes', 'error'])
+
+
+def clear():
+    """Vide le tampon de mesures (les totaux cumulés sont conservés)"""
+    _buffer.clear()
+
+
+def totals():
+    """Totaux cumulés depuis le démarrage du processus, par vue / chargeur"""
+    with _totals_lock:
+        rows = [{'name': name, 'kind': kind, **values} for (name, kind), values in _totals.items()]
+    return pd.DataFrame(rows, columns=['name', 'kind'] + TOTAL_COLUMNS)
+
+
+def summary(df=None):
+    """Statistiques agrégées par vue / chargeur"""
+    df = records() if df is None else df
+    if df.empty:
+        return pd.DataFrame(columns=['name', 'kind', 'calls', 'p50_s', 'p95_s', 'max_s', 'total_s',
+                                     'cache_hits', 'cache_misses', 'rows', 'bytes', 'errors'])
+    grouped = df.groupby(['name', 'kind'])
+    result = grouped['duration_s'].agg(
+        calls='count',
+        p50_s='median',
+        p95_s=lambda s: s.quantile(0.95),
+        max_s='max',
+        total_s='sum'
+    )
+    result['cache_hits'] = grouped['cache'].agg(lambda s: int((s == 'hit').sum()))
+    result['cache_misses'] = grouped['cache'].agg(lambda s: int((s == 'miss').sum()))
+    result['rows'] = grouped['rows'].sum()
+    result['bytes'] = grouped['bytes'].sum()
+    result['errors'] = grouped['error'].agg(lambda s: int(s.notna().sum()))
+    return result.reset_index().sort_values('total_s', ascending=False, ignore_index=True)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_openmetrics(df=None):
+    """Exporte les mesures au format texte OpenMetrics : quantiles sur le tampon, compteurs cumulés"""
+    quantiles = summary(df).set_index(['name', 'kind'])
+    stats = totals()
+    lines = [
+        '# TYPE psg_render_duration_seconds summary',
+        '# UNIT psg_render_duration_seconds seconds',
+        '# HELP psg_render_duration_seconds Durée d\'exécution des vues et chargeurs (quantiles sur les '
+        'dernières mesures, somme et nombre depuis le démarrage).'
+    ]
+    for row in stats.itertuples(index=False):
+        labels = f'name="{_escape(row.name)}",kind="{_escape(row.kind)}"'
+        if (row.name, row.kind) in quantiles.index:
+            window = quantiles.loc[(row.name, row.kind)]
+            lines.append(f'psg_render_duration_seconds{{{labels},quantile="0.5"}} {window.p50_s:.6f}')
+            lines.append(f'psg_render_duration_seconds{{{labels},quantile="0.95"}} {window.p95_s:.6f}')
+        lines.append(f'psg_render_duration_seconds_sum{{{labels}}} {row.total_s:.6f}')
+        lines.append(f'psg_render_duration_seconds_count{{{labels}}} {row.calls}')
+
+    counters = [
+        ('psg_cache_hits', 'cache_hits', 'Résultats servis par st.cache_data.'),
+        ('psg_cache_misses', 'cache_misses', 'Résultats recalculés (défaut de cache).'),
+        ('psg_rows_processed', 'rows', 'Lignes chargées ou affichées.'),
+        ('psg_bytes_sent', 'bytes', 'Octets de figures et tableaux envoyés au navigateur.'),
+        ('psg_render_errors', 'errors', 'Exceptions levées.')
+    ]
+    for metric, column, help_text in counters:
+        lines.append(f'# TYPE {metric} counter')
+        lines.append(f'# HELP {metric} {help_text}')
+        for row in stats.itertuples(index=False):
+            labels = f'name="{_escape(row.name)}",kind="{_escape(row.kind)}"'
+            lines.append(f'{metric}_total{{{labels}}} {int(getattr(row, column))}')
+
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
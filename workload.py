@@ -0,0 +1,275 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from entity_resolution import PLAYER_ID_COLUMN
+from xg_modeling import to_numeric
+
+# ----------------------------
+# CHARGE DE TRAVAIL ET TEMPS DE JEU
+# ----------------------------
+# Temps de jeu (PSG Playing Time.csv) croisé avec le calendrier (PSG Scores & Fixtures.csv) :
+#   - minutes de chaque joueur à chaque match : observées en Ligue des Champions (feuilles
+#     de match, le k-ième match UCL du calendrier étant celui d'Ordre k), estimées ailleurs
+#     en répartissant uniformément les minutes restantes de la saison
+#   - charges glissantes : minutes sur ACUTE_DAYS jours (aiguë) et CHRONIC_DAYS jours
+#     (chronique, ramenée à la semaine), ratio aigu / chronique (ACWR)
+#   - congestion : jours de repos et nombre de matchs sur 7 et CONGESTION_DAYS jours
+#   - impact sur / hors du terrain : xG et xGA par 90 minutes avec et sans le joueur
+# Les séries sont calculées d'un bloc (sommes cumulées sur tout l'effectif) puis prolongées
+# match par match : un nouveau match ne met à jour que les sommes des fenêtres glissantes.
+# Elles ne contiennent que les minutes observées et, pour chaque match, le nombre de matchs
+# non observés de chaque fenêtre. L'estimation (minutes restantes / matchs non observés)
+# change à chaque nouveau match : elle est appliquée à la lecture (frames), ce qui laisse
+# le passé de la série intact. Les charges qui en dépendent sont marquées estimées.
+UCL_COMPETITION = 'Champions Lg'
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+# Fenêtre de congestion (au plus CHRONIC_DAYS : les ajouts incrémentaux s'appuient sur la fenêtre chronique)
+CONGESTION_DAYS = 14
+MATCH_MINUTES = 90
+# Minutes minimales pour l'impact sur / hors du terrain
+MIN_IMPACT_MINUTES = 450
+# Zone de charge usuelle du ratio aigu / chronique
+ACWR_RANGE = (0.8, 1.3)
+
+MATCH_COLUMNS = ['Date', 'Comp', 'Round', 'Opponent']
+CONGESTION_COLUMNS = ['Repos', 'Matchs_7j', f'Matchs_{CONGESTION_DAYS}j']
+
+
+def played_matches(fixtures):
+    """Matchs joués du calendrier, dans l'ordre chronologique"""
+    matches = fixtures[fixtures['Result'].notna()].copy()
+    matches['Date'] = pd.to_datetime(matches['Date'])
+    return matches.sort_values('Date', kind='stable').reset_index(drop=True)
+
+
+def match_minutes(matches, playing_time, timeseries):
+    """Minutes observées joueurs × matchs (Ligue des Champions, 0 ailleurs) et masque des matchs observés"""
+    players = playing_time[playing_time[PLAYER_ID_COLUMN] >= 0].drop_duplicates(PLAYER_ID_COLUMN)
+    players = players[[PLAYER_ID_COLUMN, 'Player']].reset_index(drop=True)
+
+    minutes = np.zeros((len(players), len(matches)))
+    observed = (matches['Comp'] == UCL_COMPETITION).to_numpy()
+    ucl_columns = np.flatnonzero(observed)
+    rows = timeseries.rows[timeseries.rows['Ordre'].between(1, len(ucl_columns))]
+    player_rows = pd.Index(players[PLAYER_ID_COLUMN]).get_indexer(rows[PLAYER_ID_COLUMN])
+    known = player_rows >= 0
+    # Absent d'une feuille de match UCL : 0 minute observée
+    minutes[player_rows[known], ucl_columns[rows['Ordre'].to_numpy()[known] - 1]] = rows['Min'].to_numpy()[known]
+    return players, minutes, observed
+
+
+def spread_minutes(playing_time, players, minutes, observed):
+    """Minutes estimées de chaque joueur par match non observé : reste de la saison réparti uniformément"""
+    season_minutes = to_numeric(playing_time.drop_duplicates(PLAYER_ID_COLUMN).set_index(PLAYER_ID_COLUMN)['Min'])
+    season_minutes = season_minutes.reindex(players[PLAYER_ID_COLUMN]).fillna(0).to_numpy(dtype=float)
+    n_estimated = int((~observed).sum())
+    if not n_estimated:
+        return np.zeros(len(players))
+    return np.clip(season_minutes - minutes.sum(axis=1), 0, None) / n_estimated
+
+
+def window_sums(days, values, window):
+    """Somme de chaque ligne sur les matchs des `window` derniers jours (bornes ]t - window, t]), à chaque match"""
+    cumulative = np.cumsum(values, axis=-1)
+    first = np.searchsorted(days, days - window, side='right')
+    before = np.where(first > 0, cumulative[..., np.maximum(first - 1, 0)], 0)
+    return cumulative - before
+
+
+def congestion(days):
+    """Jours de repos avant chaque match et nombre de matchs sur 7 et CONGESTION_DAYS jours"""
+    days = np.asarray(days)
+    ones = np.ones(len(days))
+    rest = np.diff(days.astype(float), prepend=np.nan)
+    return np.column_stack([rest, window_sums(days, ones, 7), window_sums(days, ones, CONGESTION_DAYS)])
+
+
+def acwr(acute, chronic):
+    """Ratio charge aiguë / charge chronique hebdomadaire (NaN sans charge chronique)"""
+    weekly = chronic * ACUTE_DAYS / CHRONIC_DAYS
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(weekly > 0, acute / weekly, np.nan)
+
+
+class WorkloadSeries:
+    """Charges glissantes de l'effectif et congestion du calendrier, prolongeables match par match"""
+
+    def __init__(self):
+        self._reset(pd.DataFrame(columns=[PLAYER_ID_COLUMN, 'Player']))
+
+    def _reset(self, players):
+        self.players = players.reset_index(drop=True)
+        self._matches = []
+        self._days = []
+        self._minutes = []
+        self._observed = []
+        self._acute = []
+        self._chronic = []
+        # Nombre de matchs non observés (minutes estimées à la lecture) dans chaque fenêtre
+        self._estimated = []
+        self._congestion = []
+        # Matchs encore dans les fenêtres glissantes : (jour, minutes observées de l'effectif, observé)
+        self._recent = deque()
+        self._chronic_sum = np.zeros(len(players))
+        self._origin = None
+        self._frames = None
+
+    def __len__(self):
+        return len(self._matches)
+
+    def _day(self, date):
+        if self._origin is None:
+            self._origin = pd.Timestamp(date)
+        return (pd.Timestamp(date) - self._origin).days
+
+    def append(self, match, minutes, observed):
+        """Ajoute un match : seules les fenêtres glissantes sont mises à jour, pas les matchs précédents"""
+        minutes = np.asarray(minutes, dtype=float)
+        observed = bool(observed)
+        day = self._day(match['Date'])
+        # Fenêtre chronique ]day - CHRONIC_DAYS, day] : entrée du match, sortie des matchs trop anciens
+        self._recent.append((day, minutes, observed))
+        self._chronic_sum = self._chronic_sum + minutes
+        while self._recent[0][0] <= day - CHRONIC_DAYS:
+            self._chronic_sum = self._chronic_sum - self._recent.popleft()[1]
+        # Fenêtres aiguë et de congestion incluses dans la chronique : quelques matchs au plus
+        recent_days = np.array([match_day for match_day, _, _ in self._recent])
+        recent_estimated = np.array([not match_observed for _, _, match_observed in self._recent])
+        acute = np.sum([values for match_day, values, _ in self._recent if match_day > day - ACUTE_DAYS], axis=0)
+
+        rest = day - self._days[-1] if self._days else np.nan
+        self._matches.append({column: match[column] for column in MATCH_COLUMNS})
+        self._days.append(day)
+        self._minutes.append(minutes)
+        self._observed.append(observed)
+        self._acute.append(acute)
+        self._chronic.append(self._chronic_sum.copy())
+        self._estimated.append([np.sum(recent_estimated & (recent_days > day - ACUTE_DAYS)), np.sum(recent_estimated)])
+        self._congestion.append([rest, np.sum(recent_days > day - 7), np.sum(recent_days > day - CONGESTION_DAYS)])
+        self._frames = None
+
+    def rebuild(self, matches, players, minutes, observed):
+        """Recalcule toutes les séries d'un bloc (sommes cumulées vectorisées sur l'effectif)"""
+        self._reset(players)
+        if not len(matches):
+            return
+        days = np.array([self._day(date) for date in matches['Date']])
+        observed = np.asarray(observed, dtype=bool)
+        acute = window_sums(days, minutes, ACUTE_DAYS)
+        chronic = window_sums(days, minutes, CHRONIC_DAYS)
+        estimated = (~observed).astype(float)
+        self._matches = matches[MATCH_COLUMNS].to_dict('records')
+        self._days = days.tolist()
+        self._minutes = list(minutes.T)
+        self._observed = observed.tolist()
+        self._acute = list(acute.T)
+        self._chronic = list(chronic.T)
+        self._estimated = np.column_stack([window_sums(days, estimated, ACUTE_DAYS),
+                                           window_sums(days, estimated, CHRONIC_DAYS)]).tolist()
+        self._congestion = congestion(days).tolist()
+        # État repris de la fin de la série pour les ajouts suivants
+        last = days[-1]
+        self._recent.extend((day, column, match_observed) for day, column, match_observed
+                            in zip(days, minutes.T, self._observed) if day > last - CHRONIC_DAYS)
+        self._chronic_sum = chronic[:, -1].copy()
+
+    def update(self, matches, players, minutes, observed):
+        """Aligne les séries sur le calendrier (minutes observées) : ajout des nouveaux matchs, recalcul si le passé a changé"""
+        known = len(self._matches)
+        if known == 0 or known > len(matches) or not self._same_prefix(matches, players, minutes[:, :known], observed):
+            self.rebuild(matches, players, minutes, observed)
+        else:
+            for j in range(known, len(matches)):
+                self.append(matches.iloc[j], minutes[:, j], observed[j])
+        return self
+
+    def _same_prefix(self, matches, players, minutes, observed):
+        known = len(self._days)
+        return (
+            players[PLAYER_ID_COLUMN].tolist() == self.players[PLAYER_ID_COLUMN].tolist()
+            and [self._day(date) for date in matches['Date'].iloc[:known]] == self._days
+            and list(np.asarray(observed[:known], dtype=bool)) == self._observed
+            and np.allclose(np.column_stack(self._minutes), minutes, rtol=0, atol=1e-9)
+        )
+
+    def frames(self, spread=None):
+        """Tableaux des charges (une ligne par joueur et par match) et de la congestion (une ligne par match)
+
+        spread : minutes estimées de chaque joueur par match non observé (spread_minutes), ajoutées
+        aux minutes et aux charges à la lecture ; ACWR_estimé marque les ratios qui en dépendent.
+        """
+        n_players, n_matches = len(self.players), len(self._matches)
+        if self._frames is None:
+            matches = pd.DataFrame(self._matches, columns=MATCH_COLUMNS)
+            schedule = pd.concat([matches, pd.DataFrame(self._congestion, columns=CONGESTION_COLUMNS)], axis=1)
+
+            def stacked(columns):
+                # Colonnes par match -> valeurs joueur par joueur, match par match
+                return np.column_stack(columns).ravel() if n_matches else np.array([])
+
+            identity = pd.concat([
+                self.players.loc[np.repeat(np.arange(n_players), n_matches)].reset_index(drop=True),
+                matches.loc[np.tile(np.arange(n_matches), n_players)].reset_index(drop=True)
+            ], axis=1)
+            observed = {'Min': stacked(self._minutes), 'Charge_aiguë': stacked(self._acute),
+                        'Charge_chronique': stacked(self._chronic)}
+            self._frames = {'identity': identity, 'observed': observed, 'congestion': schedule}
+
+        # Matchs non observés de chaque match et de ses fenêtres, répétés pour chaque joueur
+        estimated = np.asarray(self._estimated, dtype=float).reshape(n_matches, 2)
+        unobserved = np.tile(~np.asarray(self._observed, dtype=bool), n_players)
+        acute_estimated = np.tile(estimated[:, 0], n_players)
+        chronic_estimated = np.tile(estimated[:, 1], n_players)
+        per_match = np.repeat(np.zeros(n_players) if spread is None else np.asarray(spread, dtype=float), n_matches)
+
+        observed = self._frames['observed']
+        acute = observed['Charge_aiguë'] + per_match * acute_estimated
+        chronic = observed['Charge_chronique'] + per_match * chronic_estimated
+        loads = pd.concat([
+            self._frames['identity'],
+            pd.DataFrame({
+                'Min': observed['Min'] + per_match * unobserved,
+                'Observé': ~unobserved,
+                'Charge_aiguë': acute,
+                'Charge_chronique': chronic,
+                'ACWR': acwr(acute, chronic),
+                'ACWR_estimé': (per_match * chronic_estimated) > 0
+            })
+        ], axis=1)
+        return {'loads': loads, 'congestion': self._frames['congestion']}
+
+
+def on_off_impact(playing_time, matches, min_minutes=MIN_IMPACT_MINUTES):
+    """xG et xGA par 90 minutes avec le joueur sur le terrain et sans lui, écart net (toute l'équipe à la fois)"""
+    players = playing_time[playing_time[PLAYER_ID_COLUMN] >= 0].drop_duplicates(PLAYER_ID_COLUMN)
+    on_minutes = to_numeric(players['Min']).fillna(0).to_numpy(dtype=float)
+    on = players[['onxG', 'onxGA']].apply(to_numeric).fillna(0).to_numpy(dtype=float)
+    team = np.array([to_numeric(matches['xG']).sum(), to_numeric(matches['xGA']).sum()])
+    team_minutes = MATCH_MINUTES * len(matches)
+    off = team - on
+    off_minutes = np.clip(team_minutes - on_minutes, 0, None)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        on_90 = np.where(on_minutes[:, None] > 0, on * MATCH_MINUTES / on_minutes[:, None], np.nan)
+        off_90 = np.where(off_minutes[:, None] > 0, off * MATCH_MINUTES / off_minutes[:, None], np.nan)
+    impact = pd.DataFrame({
+        PLAYER_ID_COLUMN: players[PLAYER_ID_COLUMN].to_numpy(),
+        'Player': players['Player'].to_numpy(),
+        'Min': on_minutes,
+        'xG_sur/90': on_90[:, 0],
+        'xGA_sur/90': on_90[:, 1],
+        'xG_hors/90': off_90[:, 0],
+        'xGA_hors/90': off_90[:, 1]
+    })
+    impact['Impact_net/90'] = (impact['xG_sur/90'] - impact['xGA_sur/90']) - (impact['xG_hors/90'] - impact['xGA_hors/90'])
+    impact = impact[impact['Min'] >= min_minutes]
+    return impact.sort_values('Impact_net/90', ascending=False, ignore_index=True)
+
+
+def workload_inputs(fixtures, playing_time, timeseries):
+    """Matchs joués, effectif, minutes observées joueurs × matchs, masque des matchs observés et minutes estimées"""
+    matches = played_matches(fixtures)
+    players, minutes, observed = match_minutes(matches, playing_time, timeseries)
+    return matches, players, minutes, observed, spread_minutes(playing_time, players, minutes, observed)
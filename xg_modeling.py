@@ -0,0 +1,188 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+
+from entity_resolution import PLAYER_ID_COLUMN
+
+# ----------------------------
+# MODÉLISATION G - xG
+# ----------------------------
+# Budget d'éléments par bloc de bootstrap (joueurs x tirages x matchs)
+BOOTSTRAP_BLOCK_ELEMENTS = 5_000_000
+# Seuil en dessous duquel la sur-dispersion est considérée nulle
+MIN_DISPERSION = 1e-4
+
+
+def to_numeric(series):
+    """Convertit une colonne FBref en numérique (séparateurs de milliers, #ERROR!)"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    return pd.to_numeric(series.astype(str).str.replace(',', '', regex=False), errors='coerce')
+
+
+def prepare_finishing_data(standard):
+    """Prépare les buts, xG et minutes par joueur à partir des statistiques standard"""
+    # player_id (voir entity_resolution.py) sert de clé de jointure avec les matchs UCL
+    df = standard[[col for col in ['Player', 'player_id', 'Pos', 'Min', 'Gls', 'xG'] if col in standard.columns]].copy()
+    for col in ['Min', 'Gls', 'xG']:
+        df[col] = to_numeric(df[col])
+    # Le modèle n'a de sens que pour les joueurs avec un xG strictement positif
+    df = df[(df['xG'] > 0) & df['Gls'].notna() & (df['Min'] > 0)]
+    return df.reset_index(drop=True)
+
+
+def fit_squad_models(finishing):
+    """Ajuste les modèles de Poisson et binomial négatif Gls ~ offset(log xG) sur l'effectif"""
+    goals = finishing['Gls'].to_numpy(dtype=float)
+    offset = np.log(finishing['xG'].to_numpy(dtype=float))
+    exog = np.ones((len(goals), 1))
+
+    poisson_res = sm.GLM(goals, exog, family=sm.families.Poisson(), offset=offset).fit()
+    result = {
+        'n_players': len(goals),
+        'poisson_ratio': float(np.exp(poisson_res.params[0])),
+        'poisson_pvalue': float(poisson_res.pvalues[0]),
+        'poisson_aic': float(poisson_res.aic),
+        'negbin_ratio': float(np.exp(poisson_res.params[0])),
+        'negbin_pvalue': float(poisson_res.pvalues[0]),
+        'negbin_aic': float('nan'),
+        'alpha': 0.0
+    }
+
+    # Le binomial négatif peut ne pas converger sur de petits effectifs : on garde alors Poisson
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            negbin_res = sm.NegativeBinomial(goals, exog, offset=offset).fit(disp=0)
+            alpha = float(negbin_res.params[-1])
+            # Dispersion négligeable : le modèle de Poisson suffit
+            if np.isfinite(alpha) and alpha > MIN_DISPERSION and np.isfinite(negbin_res.pvalues[0]):
+                result.update({
+                    'negbin_ratio': float(np.exp(negbin_res.params[0])),
+                    'negbin_pvalue': float(negbin_res.pvalues[0]),
+                    'negbin_aic': float(negbin_res.aic),
+                    'alpha': alpha
+                })
+        except (np.linalg.LinAlgError, ValueError):
+            pass
+
+    return result
+
+
+def poisson_pvalues(goals, expected):
+    """p-valeurs bilatérales exactes de Poisson (vectorisées) pour Gls face à xG"""
+    lower = stats.poisson.cdf(goals, expected)
+    upper = stats.poisson.sf(goals - 1, expected)
+    return np.minimum(1.0, 2 * np.minimum(lower, upper))
+
+
+def negbin_pvalues(goals, expected, alpha):
+    """p-valeurs bilatérales binomiales négatives (vectorisées) avec la dispersion de l'effectif"""
+    if alpha <= 0:
+        return poisson_pvalues(goals, expected)
+    n = 1.0 / alpha
+    p = n / (n + expected)
+    lower = stats.nbinom.cdf(goals, n, p)
+    upper = stats.nbinom.sf(goals - 1, n, p)
+    return np.minimum(1.0, 2 * np.minimum(lower, upper))
+
+
+def bootstrap_g_minus_xg(player_matches, n_boot=2000, ci=0.95, seed=0):
+    """Intervalles bootstrap de G - xG cumulé par joueur à partir des matchs joués
+
+    Regroupement par identifiant quand les matchs en ont un : les variantes d'orthographe
+    d'un même joueur ne forment qu'une ligne (avec le nom de sa première apparition).
+    """
+    key = PLAYER_ID_COLUMN if PLAYER_ID_COLUMN in player_matches.columns else 'Player'
+    df = player_matches[list(dict.fromkeys([key, 'Player', 'Gls', 'xG']))].copy()
+    df['Gls'] = to_numeric(df['Gls'])
+    df['xG'] = to_numeric(df['xG'])
+    df = df.dropna(subset=[key, 'Gls', 'xG'])
+    if df.empty:
+        return pd.DataFrame(columns=list(dict.fromkeys([key, 'Player', 'Matches', 'G-xG', 'IC_bas', 'IC_haut'])))
+
+    codes, players = pd.factorize(df[key], sort=True)
+    diff = (df['Gls'] - df['xG']).to_numpy(dtype=float)
+
+    # Tri contigu par joueur : chaque joueur correspond à une tranche [offset, offset + count)
+    order = np.argsort(codes, kind='stable')
+    sorted_diff = diff[order]
+    counts = np.bincount(codes, minlength=len(players))
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    max_n = int(counts.max())
+
+    rng = np.random.default_rng(seed)
+    quantiles = [(1 - ci) / 2, 1 - (1 - ci) / 2]
+    bounds = np.empty((len(players), 2))
+    block = max(1, BOOTSTRAP_BLOCK_ELEMENTS // (n_boot * max_n))
+
+    for start in range(0, len(players), block):
+        stop = min(start + block, len(players))
+        block_counts = counts[start:stop]
+        # Indices tirés avec remise dans la tranche de chaque joueur, colonnes hors tranche masquées
+        draws = (rng.random((stop - start, n_boot, max_n)) * block_counts[:, None, None]).astype(np.int64)
+        idx = offsets[start:stop, None, None] + draws
+        mask = np.arange(max_n)[None, None, :] < block_counts[:, None, None]
+        totals = np.where(mask, sorted_diff[np.minimum(idx, len(sorted_diff) - 1)], 0.0).sum(axis=2)
+        bounds[start:stop] = np.quantile(totals, quantiles, axis=1).T
+
+    boot = pd.DataFrame({
+        key: players,
+        'Matches': counts,
+        'G-xG': np.bincount(codes, weights=diff, minlength=len(players)),
+        'IC_bas': bounds[:, 0],
+        'IC_haut': bounds[:, 1]
+    })
+    if key != 'Player':
+        names = df.drop_duplicates(key).set_index(key)['Player']
+        boot.insert(1, 'Player', boot[key].map(names).to_numpy())
+    return boot
+
+
+def build_significance_table(standard, player_matches=None, level=0.05, n_boot=2000, seed=0):
+    """Construit le tableau de significativité de la finition (G - xG) pour tout l'effectif"""
+    finishing = prepare_finishing_data(standard)
+    if finishing.empty:
+        return {'table': finishing, 'squad': None}
+
+    squad = fit_squad_models(finishing)
+    goals = finishing['Gls'].to_numpy(dtype=float)
+    expected = finishing['xG'].to_numpy(dtype=float)
+
+    # Intervalle exact (Garwood) sur l'espérance de buts compte tenu des buts observés
+    low = np.where(goals > 0, stats.gamma.ppf(level / 2, np.maximum(goals, 1)), 0.0)
+    high = stats.gamma.ppf(1 - level / 2, goals + 1)
+
+    table = finishing.assign(**{
+        'G-xG': goals - expected,
+        'Ratio': goals / expected,
+        'Ratio_bas': low / expected,
+        'Ratio_haut': high / expected,
+        'p_poisson': poisson_pvalues(goals, expected),
+        'p_negbin': negbin_pvalues(goals, expected, squad['alpha'])
+    })
+    table['Significatif'] = table['p_negbin'] < level
+    table['Tendance'] = np.where(
+        ~table['Significatif'], 'Conforme aux xG',
+        np.where(table['G-xG'] > 0, 'Sur-performance', 'Sous-performance')
+    )
+
+    if player_matches is not None and not player_matches.empty:
+        boot = bootstrap_g_minus_xg(player_matches, n_boot=n_boot, ci=1 - level, seed=seed)
+        boot = boot.rename(columns={
+            'Matches': 'UCL_Matches',
+            'G-xG': 'UCL_G-xG',
+            'IC_bas': 'UCL_IC_bas',
+            'IC_haut': 'UCL_IC_haut'
+        })
+        if PLAYER_ID_COLUMN in table.columns and PLAYER_ID_COLUMN in boot.columns:
+            # Jointure sur l'identifiant : nom repris de la table de l'effectif
+            table = table.merge(boot.drop(columns='Player'), on=PLAYER_ID_COLUMN, how='left')
+        else:
+            table = table.merge(boot.drop(columns=PLAYER_ID_COLUMN, errors='ignore'), on='Player', how='left')
+
+    table = table.sort_values('G-xG', ascending=False).reset_index(drop=True)
+    return {'table': table, 'squad': squad}